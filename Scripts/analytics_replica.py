@@ -0,0 +1,438 @@
+"""
+Analytics replica module
+Optional embedded SQLite copy of ordenes, funcionarios, festivos and sedes, kept in sync
+incrementally, so searches and dashboard aggregates run locally with SQL and real indexes
+"""
+
+import os
+import json
+import logging
+import sqlite3
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+import pandas as pd
+from utils import normalize_search_text, parse_date_series
+from orders_snapshot import get_sync_watermark
+from storage_backend import fetch_all_rows, fetch_order_numbers
+from instrumentation import record_sync
+
+logger = logging.getLogger(__name__)
+
+# The replica is disabled unless ANALYTICS_REPLICA_PATH points to a SQLite file
+REPLICA_PATH_ENV = 'ANALYTICS_REPLICA_PATH'
+
+# Seconds between two syncs of the background thread
+REPLICA_SYNC_INTERVAL_SECONDS = 60
+
+# Window re-read before each table watermark during an incremental sync
+REPLICA_SYNC_OVERLAP = timedelta(minutes=5)
+
+# Text fields matched by search_orders, as in the Supabase ilike filter
+SEARCH_TEXT_FIELDS = [
+    'sede', 'primer_nombre', 'primer_apellido', 'otros_nombres',
+    'segundo_apellido', 'radicado_memorando', 'id_rubro'
+]
+
+# Separator between search fields so a term never matches across two of them
+SEARCH_FIELD_SEPARATOR = '\x1f'
+
+# Date column used for the temporal analysis, as chosen by the dashboard
+ANALYSIS_DATE_FIELD = 'fecha_elaboracion'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ordenes (
+    numero_orden INTEGER PRIMARY KEY,
+    sede TEXT,
+    numero_identificacion INTEGER,
+    fecha_analisis TEXT,
+    valor_viaticos_orden REAL,
+    valor_gastos_orden REAL,
+    numero_dias REAL,
+    created_at TEXT,
+    updated_at TEXT,
+    busqueda TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ordenes_created_at_idx ON ordenes (created_at);
+CREATE INDEX IF NOT EXISTS ordenes_identificacion_idx ON ordenes (numero_identificacion);
+CREATE INDEX IF NOT EXISTS ordenes_analisis_idx ON ordenes (fecha_analisis, sede);
+
+CREATE TABLE IF NOT EXISTS funcionarios (
+    numero_identificacion INTEGER PRIMARY KEY,
+    primer_apellido TEXT,
+    updated_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS funcionarios_apellido_idx ON funcionarios (primer_apellido);
+
+CREATE TABLE IF NOT EXISTS festivos (
+    fecha TEXT PRIMARY KEY,
+    descripcion TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sedes (
+    codigo TEXT PRIMARY KEY,
+    nombre TEXT,
+    activa INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    tabla TEXT PRIMARY KEY,
+    watermark TEXT
+);
+"""
+
+# Dashboard cube straight from SQL: one row per year, month and sede with counts and sums
+CUBE_QUERY = """
+SELECT CAST(strftime('%Y', fecha_analisis) AS INTEGER) AS "Año",
+       CAST(strftime('%m', fecha_analisis) AS INTEGER) AS "Mes",
+       sede AS "Sede",
+       COUNT(numero_orden) AS "Cantidad_Registros",
+       SUM(COALESCE(valor_viaticos_orden, 0) + COALESCE(valor_gastos_orden, 0)) AS "Total_Comision",
+       SUM(COALESCE(valor_viaticos_orden, 0)) AS "Total_Viaticos",
+       SUM(COALESCE(valor_gastos_orden, 0)) AS "Total_Gastos",
+       SUM(COALESCE(numero_dias, 0)) AS "Total_Dias"
+FROM ordenes
+WHERE fecha_analisis IS NOT NULL
+GROUP BY 1, 2, 3
+"""
+
+
+def _to_float(value) -> Optional[float]:
+    """Numeric database value as float, None when empty or invalid"""
+    try:
+        return None if value is None or value == '' else float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value) -> Optional[int]:
+    """Numeric database value as int, None when empty or invalid"""
+    number = _to_float(value)
+    return None if number is None else int(number)
+
+
+class AnalyticsReplica:
+    """
+    Local SQLite replica of the Supabase tables used for reporting
+
+    Rows are stored as JSON next to the typed, indexed columns the queries filter and
+    group on, so search results keep exactly the shape returned by Supabase.
+    One connection is shared by all sessions of the process and guarded by a lock; syncs
+    run in a single background thread, never inside a user request.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._last_sync: Optional[float] = None
+        # Bumped on every write to ordenes, so cached aggregates know when they are stale
+        self._generation = 0
+        self._sync_thread: Optional[threading.Thread] = None
+        self._stop_sync = threading.Event()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    # --- Writes -------------------------------------------------------------
+
+    @staticmethod
+    def _order_rows(records: List[Dict]) -> List[tuple]:
+        """Column values of the ordenes table for a batch of Supabase rows"""
+        fechas = parse_date_series(pd.Series([record.get(ANALYSIS_DATE_FIELD) for record in records], dtype=object))
+        fechas = fechas.dt.strftime('%Y-%m-%d')
+
+        rows = []
+        for record, fecha in zip(records, fechas):
+            busqueda = SEARCH_FIELD_SEPARATOR.join(normalize_search_text(record.get(field)) for field in SEARCH_TEXT_FIELDS)
+            rows.append((
+                _to_int(record.get('numero_orden')),
+                record.get('sede'),
+                _to_int(record.get('numero_identificacion')),
+                None if pd.isna(fecha) else fecha,
+                _to_float(record.get('valor_viaticos_orden')),
+                _to_float(record.get('valor_gastos_orden')),
+                _to_float(record.get('numero_dias')),
+                record.get('created_at'),
+                record.get('updated_at') or record.get('created_at'),
+                busqueda,
+                json.dumps(record, ensure_ascii=False, default=str)
+            ))
+        return rows
+
+    def upsert_orders(self, records: List[Dict]) -> None:
+        """
+        Insert or replace orders (Supabase rows)
+
+        Args:
+            records: List of order dictionaries as returned by Supabase
+        """
+        records = [record for record in records if record.get('numero_orden') is not None]
+        if not records:
+            return
+
+        rows = self._order_rows(records)
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO ordenes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows
+            )
+            self._conn.commit()
+            self._generation += 1
+
+    def delete_orders(self, numeros_orden) -> None:
+        """Remove orders from the replica"""
+        with self._lock:
+            self._conn.executemany(
+                'DELETE FROM ordenes WHERE numero_orden = ?', [(int(numero),) for numero in numeros_orden]
+            )
+            self._conn.commit()
+            self._generation += 1
+
+    def _upsert_funcionarios(self, records: List[Dict]) -> None:
+        rows = [
+            (
+                _to_int(record.get('numero_identificacion')),
+                record.get('primer_apellido'),
+                record.get('updated_at') or record.get('created_at'),
+                json.dumps(record, ensure_ascii=False, default=str)
+            )
+            for record in records if record.get('numero_identificacion') is not None
+        ]
+        with self._lock:
+            self._conn.executemany('INSERT OR REPLACE INTO funcionarios VALUES (?, ?, ?, ?)', rows)
+            self._conn.commit()
+
+    def _replace_table(self, table: str, rows: List[tuple]) -> None:
+        """Replace the whole contents of a small lookup table"""
+        placeholders = ', '.join('?' for _ in rows[0]) if rows else ''
+        with self._lock:
+            self._conn.execute(f'DELETE FROM {table}')
+            if rows:
+                self._conn.executemany(f'INSERT OR REPLACE INTO {table} VALUES ({placeholders})', rows)
+            self._conn.commit()
+
+    # --- Sync ---------------------------------------------------------------
+
+    def _get_watermark(self, table: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute('SELECT watermark FROM sync_state WHERE tabla = ?', (table,)).fetchone()
+        return row[0] if row else None
+
+    def _set_watermark(self, table: str, watermark: Optional[str]) -> None:
+        if not watermark:
+            return
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO sync_state VALUES (?, ?)', (table, watermark))
+            self._conn.commit()
+
+    @staticmethod
+    def _since(watermark: str) -> str:
+        """Watermark minus the overlap window, as an ISO timestamp"""
+        return (pd.Timestamp(watermark) - REPLICA_SYNC_OVERLAP).isoformat()
+
+    def _changed_rows_query(self, client, table: str, key: str, watermark: Optional[str]):
+        """Rows of a table updated since the watermark (all rows on the first sync), in a total order for paging"""
+        query = client.table(table).select('*')
+        if watermark is not None:
+            query = query.gte('updated_at', self._since(watermark))
+        return query.order(key)
+
+    @staticmethod
+    def _advance(watermark: Optional[str], records: List[Dict]) -> Optional[str]:
+        """Largest of the current watermark and the timestamps of the fetched rows"""
+        latest = get_sync_watermark(records)
+        if watermark is None or latest is None:
+            return latest or watermark
+        return max(pd.Timestamp(watermark), pd.Timestamp(latest)).isoformat()
+
+    def sync(self, client) -> bool:
+        """
+        Bring the replica up to date with the database
+
+        ordenes and funcionarios are fetched incrementally by updated_at (deleted orders are
+        detected by comparing order numbers); festivos and sedes are small and copied whole.
+        Concurrent calls run one after the other.
+
+        Args:
+            client: Supabase client
+
+        Returns:
+            True if the sync succeeded
+        """
+        with self._sync_lock:
+            return self._sync(client)
+
+    def _sync(self, client) -> bool:
+        try:
+            watermark = self._get_watermark('ordenes')
+            changed = fetch_all_rows(lambda: self._changed_rows_query(client, 'ordenes', 'numero_orden', watermark))
+            self.upsert_orders(changed)
+
+            if watermark is not None:
+                existing = fetch_order_numbers(client)
+                if existing is None:
+                    logger.warning("Could not list every order number; replica deletions are left for the next sync")
+                else:
+                    with self._lock:
+                        stored = [row[0] for row in self._conn.execute('SELECT numero_orden FROM ordenes')]
+                    deleted = [numero for numero in stored if numero not in existing]
+                    if deleted:
+                        self.delete_orders(deleted)
+            self._set_watermark('ordenes', self._advance(watermark, changed))
+
+            watermark = self._get_watermark('funcionarios')
+            funcionarios = fetch_all_rows(
+                lambda: self._changed_rows_query(client, 'funcionarios', 'numero_identificacion', watermark)
+            )
+            self._upsert_funcionarios(funcionarios)
+            self._set_watermark('funcionarios', self._advance(watermark, funcionarios))
+
+            festivos = client.table('festivos').select('fecha', 'descripcion').execute().data
+            fechas = parse_date_series(pd.Series([row.get('fecha') for row in festivos], dtype=object))
+            self._replace_table('festivos', [
+                (fecha.strftime('%Y-%m-%d'), row.get('descripcion'))
+                for row, fecha in zip(festivos, fechas) if not pd.isna(fecha)
+            ])
+
+            sedes = client.table('sedes').select('codigo', 'nombre', 'activa').execute().data
+            self._replace_table('sedes', [
+                (row.get('codigo'), row.get('nombre'), int(bool(row.get('activa')))) for row in sedes
+            ])
+
+            self._last_sync = time.monotonic()
+            record_sync('analytics_replica', len(changed))
+            logger.info(f"Analytics replica synced: {len(changed)} changed orders")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Could not sync analytics replica: {str(e)}")
+            return False
+
+    def start_background_sync(self, client, interval_seconds: float = REPLICA_SYNC_INTERVAL_SECONDS) -> None:
+        """
+        Start the thread that syncs the replica now and then every interval_seconds (once per replica)
+
+        Args:
+            client: Supabase client used by the thread
+            interval_seconds: Pause between two syncs
+        """
+        with self._lock:
+            if self._sync_thread is not None:
+                return
+            self._sync_thread = threading.Thread(
+                target=self._sync_loop, args=(client, interval_seconds), name='analytics-replica-sync', daemon=True
+            )
+        self._sync_thread.start()
+
+    def _sync_loop(self, client, interval_seconds: float) -> None:
+        while True:
+            self.sync(client)
+            if self._stop_sync.wait(interval_seconds):
+                return
+
+    def stop_background_sync(self) -> None:
+        """Stop the sync thread after its current sync"""
+        self._stop_sync.set()
+        if self._sync_thread is not None:
+            self._sync_thread.join()
+
+    @property
+    def is_synced(self) -> bool:
+        """Whether a full sync has completed, so queries see every order"""
+        return self._last_sync is not None
+
+    @property
+    def version(self) -> tuple:
+        """(orders watermark, write generation): changes whenever the ordenes table does"""
+        return self._get_watermark('ordenes'), self._generation
+
+    # --- Queries ------------------------------------------------------------
+
+    def search_orders(self, search_term: str) -> List[Dict]:
+        """
+        Search orders like SupabaseDBManager.search_orders, newest first
+
+        Order and identification numbers must match exactly; the text fields match
+        as a substring, ignoring case and accents.
+
+        Returns:
+            List of order dictionaries with the same keys as the Supabase rows
+        """
+        term = str(search_term).strip()
+        pattern = normalize_search_text(term).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        number = _to_int(term) if term.isdigit() else None
+
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT data FROM ordenes
+                WHERE numero_orden = ? OR numero_identificacion = ?
+                   OR (? != '' AND busqueda LIKE '%' || ? || '%' ESCAPE '\\')
+                ORDER BY created_at DESC
+                """,
+                (number, number, pattern, pattern)
+            ).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def orders_cube(self) -> pd.DataFrame:
+        """
+        Year, month and sede aggregates of the orders for the dashboard cube
+
+        Returns:
+            DataFrame with 'Año', 'Mes', 'Sede', 'Cantidad_Registros' and the value sums
+        """
+        with self._lock:
+            return pd.read_sql_query(CUBE_QUERY, self._conn)
+
+
+_replica: Optional[AnalyticsReplica] = None
+_replica_lock = threading.Lock()
+
+
+def get_analytics_replica() -> Optional[AnalyticsReplica]:
+    """
+    Process-wide analytics replica
+
+    Returns:
+        The replica, or None when ANALYTICS_REPLICA_PATH is not set or the file cannot be opened
+    """
+    global _replica
+    path = os.getenv(REPLICA_PATH_ENV)
+    if not path:
+        return None
+
+    with _replica_lock:
+        if _replica is None or _replica.path != path:
+            try:
+                _replica = AnalyticsReplica(path)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not open analytics replica {path}: {str(e)}")
+                return None
+        return _replica
+
+
+def get_synced_replica(client) -> Optional[AnalyticsReplica]:
+    """
+    Analytics replica for queries, making sure its background sync is running
+
+    Args:
+        client: Supabase client the sync thread reads from
+
+    Returns:
+        The replica once it has completed a sync, or None (disabled or still loading)
+    """
+    replica = get_analytics_replica()
+    if replica is None:
+        return None
+    replica.start_background_sync(client)
+    return replica if replica.is_synced else None
@@ -1,16 +1,14 @@
 import streamlit as st
-from datetime import datetime, date
-import pandas as pd
 import os
 
-# Import tab modules using Supabase
-from tab_commission_form import render_commission_form_tab
-from tab_legalization_form import render_additional_form_tab
-from tab_edit_order import render_edit_order_tab
-from tab_dashboard import render_dashboard_tab
-from utils import initialize_session_state, get_colombian_datetime_now
-from data_manager import render_database_status, init_database_session
-from auth import initialize_auth_session, is_authenticated, render_login_page, render_user_info
+# Only the login page is imported eagerly. Tab modules and the modules that pull in
+# pandas, supabase, plotly and openpyxl are imported where they are first needed.
+from auth import get_current_user, initialize_auth_session, is_authenticated, render_login_page, render_user_info
+from rerun_profiler import run_profiled, set_rerun_tab
+from logging_config import configure_logging
+
+# Queue-based JSON logging, set up once per process (later reruns return immediately)
+configure_logging()
 
 # Page configuration
 st.set_page_config(
@@ -164,17 +162,24 @@ st.markdown("""
 
 
 @st.cache_data(ttl=30, show_spinner=False)
-def get_cached_database_status():
-    """Get cached Supabase connection status and data info"""
-    if st.session_state.get('database_connected') and st.session_state.get('excel_data') is not None:
-        record_count = len(st.session_state.excel_data)
+def get_cached_database_status(database_connected, record_count):
+    """
+    Get cached Supabase connection status and data info
+
+    Args:
+        database_connected: Whether this session is connected to Supabase
+        record_count: Number of orders loaded in this session, or None if not loaded yet
+    """
+    from utils import get_colombian_datetime_now
+
+    if database_connected and record_count is not None:
         return {
             'connected': True,
             'record_count': record_count,
             'last_update': get_colombian_datetime_now(),
             'db_type': 'Supabase Cloud Database'
         }
-    elif st.session_state.get('database_connected'):
+    elif database_connected:
         return {
             'connected': True,
             'loading': True,
@@ -184,6 +189,9 @@ def get_cached_database_status():
 
 
 def main():
+    # Count this browser session as active (shown in the performance panel)
+    record_current_session()
+
     # Initialize authentication session
     initialize_auth_session()
 
@@ -192,6 +200,8 @@ def main():
         render_login_page()
         return
 
+    from utils import initialize_session_state
+
     # Initialize session state
     initialize_session_state()
 
@@ -219,21 +229,27 @@ def main():
         default="📋 Órdenes de Comisión",
         label_visibility="collapsed",
     )
+    set_rerun_tab(tab)
 
     # Add some spacing after the segmented control
     st.markdown("<br>", unsafe_allow_html=True)
 
     # Show content based on segmented control selection
+    # (tab modules are imported on first selection, e.g. plotly loads with the dashboard)
     if tab == "📋 Órdenes de Comisión":
+        from tab_commission_form import render_commission_form_tab
         render_commission_form_tab()
 
     elif tab == "📝 Legalización":
+        from tab_legalization_form import render_additional_form_tab
         render_additional_form_tab()
 
     elif tab == "✏️ Editar Orden":
+        from tab_edit_order import render_edit_order_tab
         render_edit_order_tab()
 
     elif tab == "📊 Dashboard":
+        from tab_dashboard import render_dashboard_tab
         render_dashboard_tab()
 
     elif tab == "⚙️ Administración":
@@ -248,9 +264,21 @@ def main():
     """, unsafe_allow_html=True)
 
 
+def record_current_session():
+    """Record a rerun of the current browser session for the active session count"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    from instrumentation import record_session_activity
+
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        record_session_activity(ctx.session_id)
+
+
 def render_database_authentication():
     """Initialize Supabase database and show connection status"""
     if 'database_connected' not in st.session_state:
+        from data_manager import init_database_session
+
         with st.spinner("Conectando a Supabase..."):
             init_database_session()
 
@@ -258,7 +286,11 @@ def render_database_authentication():
 def render_cached_database_status():
     """Render Supabase connection status using cached data"""
     try:
-        cached_status = get_cached_database_status()
+        orders_df = st.session_state.get('excel_data')
+        cached_status = get_cached_database_status(
+            bool(st.session_state.get('database_connected')),
+            len(orders_df) if orders_df is not None else None
+        )
 
         if cached_status.get('connected') and not cached_status.get('loading'):
             st.markdown(f"""
@@ -272,7 +304,8 @@ def render_cached_database_status():
         elif cached_status.get('connected') and cached_status.get('loading'):
             st.markdown("""
             <div class="supabase-info">
-                🔄 <strong>Supabase Conectado</strong> - Cargando datos...
+                ✅ <strong>Supabase Conectado</strong> | 
+                📊 Los registros se cargan al abrir Dashboard o Administración
             </div>
             """, unsafe_allow_html=True)
         else:
@@ -291,12 +324,24 @@ def render_cached_database_status():
 
 def render_admin_tab():
     """Render administration tab for database management with Supabase"""
+    import pandas as pd
+    from datetime import date
+    from auth import is_admin
+    from data_manager import ensure_orders_loaded, reload_orders
+    from deadline_index import ALERT_PROXIMO, ALERT_VENCIDO
+    from orders_cache import get_deadline_index
+    from orders_schema import format_orders_for_display
+    from utils import get_colombian_datetime_now
+
     st.markdown('<h1 class="main-title">⚙️ Administración de Base de Datos</h1>', unsafe_allow_html=True)
 
     if 'database_manager' not in st.session_state:
         st.error("Base de datos no inicializada")
         return
 
+    # Orders are loaded on the first visit to a tab that needs them, not at login
+    ensure_orders_loaded()
+
     # Database information section
     st.markdown('<div class="section-title">📊 Información de la Base de Datos</div>', unsafe_allow_html=True)
 
@@ -320,11 +365,11 @@ def render_admin_tab():
         st.metric("Tipo BD", "Supabase")
 
     with col_info4:
-        # Orders with alerts
-        if st.session_state.excel_data is not None and 'Alerta' in st.session_state.excel_data.columns:
-            alerts_count = len(st.session_state.excel_data[
-                                   st.session_state.excel_data['Alerta'].isin(['Plazo Vencido', 'Plazo Próximo'])
-                               ])
+        # Orders with alerts as of today, from the same deadline index as the dashboard alert panel
+        if st.session_state.excel_data is not None and 'Fecha Límite Legalización' in st.session_state.excel_data.columns:
+            deadline_index = get_deadline_index(st.session_state.excel_data)
+            alert_counts = deadline_index.alert_counts(date.today(), st.session_state.database_manager.get_holidays())
+            alerts_count = alert_counts[ALERT_VENCIDO] + alert_counts[ALERT_PROXIMO]
         else:
             alerts_count = 0
         st.metric("Órdenes con Alertas", alerts_count)
@@ -419,9 +464,8 @@ def render_admin_tab():
     with col_refresh1:
         if st.button("🔄 Actualizar datos desde Supabase", key="refresh_data_btn", use_container_width=True):
             with st.spinner("Actualizando datos desde Supabase..."):
-                success, message = st.session_state.database_manager.refresh_data()
+                success, message = reload_orders()
                 if success:
-                    st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
                     st.success(message)
                     st.rerun()
                 else:
@@ -463,13 +507,6 @@ def render_admin_tab():
         st.write("**Tipo de BD:** Supabase (PostgreSQL)")
         st.write("**Conexión:** Nube")
         st.write("**Tablas:** ordenes, funcionarios, festivos, sedes")
-        st.write("**Ventajas Supabase:**")
-        st.write("• Acceso en tiempo real")
-        st.write("• Escalabilidad automática")
-        st.write("• Respaldos automáticos")
-        st.write("• API REST automática")
-        st.write("• Sincronización en tiempo real")
-        st.write("• Seguridad avanzada")
 
         # Show recent database operations
         st.write("**Campos Calculados Automáticamente:**")
@@ -482,6 +519,15 @@ def render_admin_tab():
 
     st.markdown("---")
 
+    # Live performance section
+    render_performance_panel()
+
+    if is_admin():
+        st.markdown("---")
+        render_profiler_panel()
+
+    st.markdown("---")
+
     # Recent activity section
     st.markdown('<div class="section-title">📈 Actividad Reciente</div>', unsafe_allow_html=True)
 
@@ -492,7 +538,7 @@ def render_admin_tab():
             'Fecha Límite Legalización', 'Alerta', 'Estado Legalización'
         ]
         available_columns = [col for col in display_columns if col in st.session_state.excel_data.columns]
-        recent_orders = st.session_state.excel_data[available_columns].tail(5)
+        recent_orders = format_orders_for_display(st.session_state.excel_data[available_columns].tail(5))
 
         st.write("**Últimas 5 Órdenes Registradas:**")
         st.dataframe(recent_orders, use_container_width=True, hide_index=True)
@@ -557,7 +603,6 @@ def render_admin_tab():
             st.write(f"• URL: {url_display}")
             st.write("• API Key: " + ("Configurada ✅" if os.getenv("SUPABASE_KEY") else "No configurada ❌"))
 
-        st.write("• Timeout: 30 segundos")
         st.write("• SSL: Habilitado")
 
     # Footer note
@@ -571,5 +616,170 @@ def render_admin_tab():
     """, unsafe_allow_html=True)
 
 
+def get_cached_frames_memory():
+    """
+    Memory held by cached data, in bytes, by origin
+
+    Returns:
+        Dictionary with the orders DataFrames alive in session state, the st.cache_data entries
+        (dashboard frames and cube) and the process-wide LRU caches
+    """
+    from streamlit.runtime.caching import get_data_cache_stats_provider
+    from cache_utils import get_all_cache_stats
+    from instrumentation import dataframe_memory
+
+    memory = {f"DataFrames {kind}": entry['bytes'] for kind, entry in dataframe_memory().items()}
+
+    stats = get_data_cache_stats_provider().get_stats()
+    if isinstance(stats, dict):
+        stats = [stat for group in stats.values() for stat in group]
+    for stat in stats:
+        name = f"st.cache_data {stat.cache_name.rsplit('.', 1)[-1]}"
+        memory[name] = memory.get(name, 0) + stat.byte_length
+
+    for name, cache_stats in get_all_cache_stats().items():
+        memory[f"LRU {name}"] = cache_stats['bytes']
+    return memory
+
+
+@st.fragment
+def render_performance_panel():
+    """Render live performance figures of this app process (refreshes on its own)"""
+    import pandas as pd
+    from datetime import datetime
+    from instrumentation import (
+        active_session_count, cache_hit_rates, last_syncs, latency_percentiles, metrics_enabled
+    )
+
+    col_title, col_refresh = st.columns([4, 1])
+    with col_title:
+        st.markdown('<div class="section-title">⚡ Rendimiento</div>', unsafe_allow_html=True)
+    with col_refresh:
+        st.button("🔄 Actualizar métricas", key="refresh_performance_panel", use_container_width=True)
+
+    if not metrics_enabled():
+        st.info("Las métricas están desactivadas (METRICS_ENABLED=0)")
+        return
+
+    # Cache hit rates
+    rates = cache_hit_rates()
+    col_cache1, col_cache2, col_cache3, col_sessions = st.columns(4)
+    for column, (cache, label) in zip(
+            [col_cache1, col_cache2, col_cache3],
+            [('holidays', "Caché Festivos"), ('orders', "Caché Órdenes"), ('search', "Caché Búsqueda")]):
+        with column:
+            entry = rates.get(cache)
+            if entry:
+                st.metric(label, f"{entry['hit_rate']:.0%}",
+                          help=f"{entry['hits']:.0f} aciertos, {entry['misses']:.0f} fallos")
+            else:
+                st.metric(label, "—", help="Sin consultas registradas")
+    with col_sessions:
+        st.metric("Sesiones Activas", active_session_count(), help="Sesiones con actividad en los últimos 15 minutos")
+
+    col_sync, col_memory = st.columns(2)
+
+    with col_sync:
+        st.write("**Última sincronización:**")
+        syncs = last_syncs()
+        if syncs:
+            for source, sync in syncs.items():
+                when = datetime.fromtimestamp(sync['timestamp']).strftime('%d/%m/%Y %H:%M:%S')
+                st.write(f"• {source}: {when} ({sync['rows']:,.0f} filas)")
+        else:
+            st.write("• Sin sincronizaciones en este proceso")
+
+    with col_memory:
+        memory = get_cached_frames_memory()
+        st.write(f"**Memoria en caché:** {sum(memory.values()) / 1024 / 1024:,.1f} MB")
+        for name, size in sorted(memory.items(), key=lambda item: item[1], reverse=True):
+            if size:
+                st.write(f"• {name}: {size / 1024 / 1024:,.1f} MB")
+
+    # Per-call latency percentiles
+    requests = latency_percentiles('viaticos_db_request_seconds')
+    methods = latency_percentiles('viaticos_method_seconds')
+
+    if requests:
+        st.write("**Consultas a la base de datos (ms):**")
+        st.dataframe(pd.DataFrame([{
+            'Tabla': row['table'], 'Operación': row['action'], 'Llamadas': row['calls'],
+            'p50': round(row['p50_ms'], 1), 'p95': round(row['p95_ms'], 1), 'p99': round(row['p99_ms'], 1),
+        } for row in requests]), use_container_width=True, hide_index=True)
+
+    if methods:
+        st.write("**Métodos de SupabaseDBManager (ms):**")
+        st.dataframe(pd.DataFrame([{
+            'Método': row['method'].split('.', 1)[-1], 'Llamadas': row['calls'],
+            'p50': round(row['p50_ms'], 1), 'p95': round(row['p95_ms'], 1), 'p99': round(row['p99_ms'], 1),
+            'Total': round(row['total_ms'], 1),
+        } for row in methods]), use_container_width=True, hide_index=True)
+
+    if not requests and not methods:
+        st.info("Aún no hay llamadas registradas en este proceso")
+
+
+def render_profiler_panel():
+    """Render the admin-only rerun profiler: arm it for the next reruns and download the profiles"""
+    import pandas as pd
+    from rerun_profiler import arm_profiler, armed_reruns, list_profiles
+
+    st.markdown('<div class="section-title">🔬 Perfilador de Recargas</div>', unsafe_allow_html=True)
+    st.write("Perfila las próximas recargas de la app en esta sesión y guarda, por pestaña, "
+             "las funciones con más tiempo acumulado y las pilas en formato flamegraph.")
+
+    col_arm1, col_arm2, col_arm3 = st.columns([2, 1, 1])
+
+    with col_arm1:
+        reruns = st.number_input("Recargas a perfilar", min_value=1, max_value=50, value=5, key="profiler_reruns")
+
+    with col_arm2:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("▶️ Activar perfilador", key="arm_profiler", use_container_width=True):
+            arm_profiler(st.session_state, reruns)
+
+    with col_arm3:
+        st.markdown("<br>", unsafe_allow_html=True)
+        if st.button("⏹️ Detener", key="disarm_profiler", use_container_width=True):
+            arm_profiler(st.session_state, 0)
+
+    pending = armed_reruns(st.session_state)
+    if pending:
+        st.info(f"⏳ Quedan {pending} recargas por perfilar")
+
+    profiles = list_profiles()
+    if not profiles:
+        st.write("No hay perfiles guardados")
+        return
+
+    st.write(f"**Perfiles guardados:** {len(profiles)}")
+    for i, profile in enumerate(profiles[:20]):
+        started = profile.get('started_at', '').replace('T', ' ')
+        with st.expander(f"{profile.get('tab')} · {started} · {profile.get('duration_s', 0) * 1000:,.0f} ms"):
+            top = profile.get('top_functions', [])
+            if top:
+                st.dataframe(pd.DataFrame([{
+                    'Función': row['function'],
+                    'Acumulado (ms)': round(row['cumulative_s'] * 1000, 1),
+                    'Propio (ms)': round(row['own_s'] * 1000, 1),
+                    '% Recarga': round(row['cumulative_share'] * 100, 1),
+                } for row in top[:15]]), use_container_width=True, hide_index=True)
+
+            col_download1, col_download2 = st.columns(2)
+            for column, path, label, mime in [
+                (col_download1, profile['json_path'], "⬇️ Funciones (JSON)", "application/json"),
+                (col_download2, profile['collapsed_path'], "⬇️ Pilas (flamegraph)", "text/plain"),
+            ]:
+                with column:
+                    try:
+                        with open(path, 'rb') as file:
+                            st.download_button(label, data=file.read(), file_name=os.path.basename(path),
+                                               mime=mime, key=f"profile_download_{i}_{mime}",
+                                               use_container_width=True)
+                    except OSError:
+                        st.write("Archivo no disponible")
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Runs under the sampling profiler only in the session of an admin who armed it
+    run_profiled(main, st.session_state, get_current_user)
\ No newline at end of file
@@ -60,6 +60,17 @@ def get_current_user() -> Optional[str]:
     return st.session_state.get('username')
 
 
+def is_admin() -> bool:
+    """Check if the logged-in user has role = "admin" in the secrets"""
+    if not is_authenticated():
+        return False
+    try:
+        user = st.secrets.get("users", {}).get(get_current_user(), {})
+        return user.get("role") == "admin"
+    except Exception:
+        return False
+
+
 def logout():
     """Logout the current user"""
     st.session_state.authenticated = False
@@ -0,0 +1,134 @@
+"""
+Cache utilities module
+Bounded, thread-safe LRU caches shared by every session of the app process
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """LRU cache bounded by number of entries and, optionally, by total size in bytes"""
+
+    def __init__(self, name: str, max_entries: int = 128, max_bytes: Optional[int] = None) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size_of(value: Any) -> int:
+        """Approximate size of a cached value in bytes"""
+        if isinstance(value, (bytes, bytearray, str)):
+            return len(value)
+        return sys.getsizeof(value)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value and mark it as most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries to stay within bounds"""
+        size = self._size_of(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            # Larger than the whole cache: serve it without keeping it
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+
+            while (len(self._entries) > self.max_entries or
+                   (self.max_bytes is not None and self._total_bytes > self.max_bytes)):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, building and storing it on a miss
+
+        Args:
+            key: Hashable cache key
+            factory: Function that builds the value (called without holding the lock)
+
+        Returns:
+            Cached or freshly built value
+        """
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_caches: Dict[str, LRUCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, max_entries: int = 128, max_bytes: Optional[int] = None) -> LRUCache:
+    """
+    Get the process-wide cache with the given name, creating it on first use
+
+    Args:
+        name: Cache name (also used in statistics)
+        max_entries: Maximum number of entries
+        max_bytes: Optional maximum total size of the cached values
+
+    Returns:
+        Shared LRUCache instance
+    """
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = LRUCache(name, max_entries=max_entries, max_bytes=max_bytes)
+        return _caches[name]
+
+
+def get_all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Statistics for every cache created in this process"""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
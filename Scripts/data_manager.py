@@ -1,23 +1,41 @@
 import os
 import logging
 import pandas as pd
-from datetime import datetime, date, timedelta
+from datetime import datetime, date, timedelta, timezone
 from typing import Dict, List, Optional, Tuple
 import streamlit as st
-from supabase import create_client, Client
-from utils import parse_date_for_database, format_colombian_date
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('data_manager.log'),
-        logging.StreamHandler()
-    ]
+from utils import (
+    parse_colombian_currency_series, parse_date_for_database, parse_date_for_database_series, parse_date_to_date
 )
+from orders_schema import (
+    REVERSE_COLUMN_MAPPING, orders_records_to_df, format_orders_for_display
+)
+from orders_cache import stamp_data_version, merge_orders, upsert_order_row, delete_order_row
+from orders_snapshot import load_orders_snapshot, save_orders_snapshot, get_sync_watermark
+from analytics_replica import get_analytics_replica, get_synced_replica
+from storage_backend import StorageClient, fetch_all_rows, fetch_order_numbers, get_local_client, get_storage_backend
+from instrumentation import (
+    instrument_client, instrument_methods, record_cache_lookup, record_sync, start_metrics_server, untimed
+)
+
+# Handlers are set up once at app start (see logging_config.configure_logging)
 logger = logging.getLogger(__name__)
 
+# Date columns of the Excel import sheet (database names)
+IMPORT_DATE_FIELDS = ['fecha_elaboracion', 'fecha_memorando', 'fecha_inicial', 'fecha_final', 'fecha_legalizacion']
+
+# Money columns of the Excel import sheet (database names)
+IMPORT_CURRENCY_FIELDS = ['valor_viaticos_diario', 'valor_viaticos_orden', 'valor_gastos_orden',
+                          'valor_viaticos_legalizado', 'valor_gastos_legalizado']
+
+# Window re-read before the snapshot watermark during an incremental catch-up
+SNAPSHOT_SYNC_OVERLAP = timedelta(minutes=5)
+
+
+def utc_timestamp() -> str:
+    """Current UTC time for updated_at, so incremental syncs see updated rows"""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat()
+
 
 def handle_supabase_error(error: Exception, operation: str = "database operation") -> Tuple[bool, str]:
     """
@@ -67,24 +85,37 @@ def handle_supabase_error(error: Exception, operation: str = "database operation
     return False, f"An error occurred during {operation}. Please try again or contact support if the problem persists."
 
 
+@instrument_methods
 class SupabaseDBManager:
-    def __init__(self, use_service_role: bool = False) -> None:
+    def __init__(self, use_service_role: bool = False, client: Optional[StorageClient] = None) -> None:
         """
         Initialize Supabase database manager
 
         Args:
             use_service_role: Whether to use service role key for admin operations
+            client: Storage client to use instead of the one selected by STORAGE_BACKEND
+                    (Supabase by default, or the local SQLite stand-in with STORAGE_BACKEND=sqlite)
         """
-        self.supabase_url: str = st.secrets["SUPABASE_URL"]
-
-        if use_service_role:
-            # Admin operations
-            self.supabase_key: str = st.secrets["SUPABASE_SERVICE_KEY"]
+        if client is not None:
+            self.client: StorageClient = client
+        elif get_storage_backend() == 'sqlite':
+            self.client = get_local_client()
         else:
-            # User operations with RLS
-            self.supabase_key: str = st.secrets["SUPABASE_ANON_KEY"]
+            from supabase import create_client
+
+            self.supabase_url: str = st.secrets["SUPABASE_URL"]
+
+            if use_service_role:
+                # Admin operations
+                self.supabase_key: str = st.secrets["SUPABASE_SERVICE_KEY"]
+            else:
+                # User operations with RLS
+                self.supabase_key: str = st.secrets["SUPABASE_ANON_KEY"]
+
+            self.client = create_client(self.supabase_url, self.supabase_key)
 
-        self.client: Client = create_client(self.supabase_url, self.supabase_key)
+        # Every table request is timed and sized (see instrumentation)
+        self.client = instrument_client(self.client)
 
         # Cache for holidays to reduce database queries
         self._holidays_cache: Optional[List[date]] = None
@@ -100,19 +131,18 @@ class SupabaseDBManager:
 
             for holiday in holidays_data:
                 try:
-                    holiday_date = holiday['fecha']
-                    if '-' in holiday_date:
-                        holidays.append(datetime.strptime(holiday_date, '%Y-%m-%d').date())
-                    else:
-                        holidays.append(datetime.strptime(holiday_date, '%d/%m/%Y').date())
-                except (ValueError, KeyError, TypeError):
+                    holiday_date = parse_date_to_date(holiday['fecha'])
+                except KeyError:
                     continue
+                if holiday_date is not None:
+                    holidays.append(holiday_date)
 
             return holidays
         except Exception as e:
             logger.warning(f"Could not fetch holidays from database: {str(e)}")
             return []
 
+    @untimed
     def _get_holidays_cached(self) -> List[date]:
         """Get holidays with caching mechanism"""
         now = datetime.now()
@@ -122,8 +152,11 @@ class SupabaseDBManager:
             self._cache_timestamp is not None and
             (now - self._cache_timestamp).total_seconds() < self._cache_ttl_seconds):
             logger.debug("Using cached holidays")
+            record_cache_lookup('holidays', hit=True)
             return self._holidays_cache
 
+        record_cache_lookup('holidays', hit=False)
+
         # Fetch from database and cache
         logger.info("Fetching holidays from database and caching")
         holidays = self._get_holidays_from_db()
@@ -132,19 +165,23 @@ class SupabaseDBManager:
 
         return holidays
 
+    @untimed
+    def get_holidays(self) -> List[date]:
+        """Get the holidays excluded from business days (cached)"""
+        return self._get_holidays_cached()
+
+    @untimed
     def calculate_business_days(self, start_date: str, end_date: str) -> int:
         """Calculate business days between two dates excluding holidays"""
         try:
             # Get holidays using cache (more efficient)
             holidays = self._get_holidays_cached()
 
-            # Convert string dates to datetime objects
-            if '/' in start_date:
-                start = datetime.strptime(start_date, '%d/%m/%Y').date()
-                end = datetime.strptime(end_date, '%d/%m/%Y').date()
-            else:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
-                end = datetime.strptime(end_date, '%Y-%m-%d').date()
+            # Convert string dates (ISO or DD/MM/YYYY, each on its own) to date objects
+            start = parse_date_to_date(start_date)
+            end = parse_date_to_date(end_date)
+            if start is None or end is None:
+                raise ValueError(f"unparseable date: {start_date if start is None else end_date}")
 
             business_days = 0
             current = start
@@ -160,6 +197,7 @@ class SupabaseDBManager:
             logger.error(f"Error calculating business days: {str(e)}")
             return 0
 
+    @untimed
     def calculate_workday(self, start_date: str, days: int) -> str:
         """Calculate workday (WORKDAY.INTL equivalent) excluding weekends and holidays"""
         try:
@@ -167,10 +205,9 @@ class SupabaseDBManager:
             holidays = self._get_holidays_cached()
 
             # Convert start date
-            if '/' in start_date:
-                start = datetime.strptime(start_date, '%d/%m/%Y').date()
-            else:
-                start = datetime.strptime(start_date, '%Y-%m-%d').date()
+            start = parse_date_to_date(start_date)
+            if start is None:
+                raise ValueError(f"unparseable date: {start_date}")
 
             current = start
             days_added = 0
@@ -186,6 +223,7 @@ class SupabaseDBManager:
             logger.error(f"Error calculating workday: {str(e)}")
             return ""
 
+    @untimed
     def calculate_formulated_fields(self, order_data: Dict) -> Dict:
         """Calculate the Excel formulated fields"""
         formulated = {}
@@ -234,8 +272,8 @@ class SupabaseDBManager:
             if fecha_legalizacion:
                 try:
                     if formulated['fecha_limite_legalizacion']:
-                        legalizacion_date = datetime.strptime(fecha_legalizacion, '%d/%m/%Y').date()
-                        limite_date = datetime.strptime(formulated['fecha_limite_legalizacion'], '%d/%m/%Y').date()
+                        legalizacion_date = parse_date_to_date(fecha_legalizacion)
+                        limite_date = parse_date_to_date(formulated['fecha_limite_legalizacion'])
                         formulated[
                             'estado_legalizacion'] = 'A tiempo' if legalizacion_date <= limite_date else 'Atrasado'
                     else:
@@ -246,7 +284,7 @@ class SupabaseDBManager:
                 try:
                     if formulated['fecha_limite_legalizacion']:
                         today = datetime.now().date()
-                        limite_date = datetime.strptime(formulated['fecha_limite_legalizacion'], '%d/%m/%Y').date()
+                        limite_date = parse_date_to_date(formulated['fecha_limite_legalizacion'])
                         formulated['estado_legalizacion'] = 'Atrasado' if today > limite_date else 'A tiempo'
                     else:
                         formulated['estado_legalizacion'] = 'A tiempo'
@@ -320,6 +358,35 @@ class SupabaseDBManager:
         except Exception as e:
             return False, f"Error guardando funcionario: {str(e)}"
 
+    def create_funcionario_if_missing(self, numero_identificacion: int, primer_nombre: str,
+                                      otros_nombres: str, primer_apellido: str,
+                                      segundo_apellido: str) -> bool:
+        """
+        Insert funcionario only if it does not exist yet, in a single request
+
+        Returns:
+            True if the funcionario was created, False if it already existed
+        """
+        funcionario_data = {
+            'numero_identificacion': numero_identificacion,
+            'primer_nombre': (primer_nombre or '').upper(),
+            'otros_nombres': (otros_nombres or '').upper(),
+            'primer_apellido': (primer_apellido or '').upper(),
+            'segundo_apellido': (segundo_apellido or '').upper()
+        }
+
+        try:
+            # ON CONFLICT DO NOTHING: only newly inserted rows come back in response.data
+            response = self.client.table('funcionarios').upsert(
+                funcionario_data, on_conflict='numero_identificacion', ignore_duplicates=True
+            ).execute()
+            return bool(response.data)
+
+        except Exception as e:
+            logger.warning(f"Could not save funcionario {numero_identificacion}: {str(e)}")
+            return False
+
+    @untimed
     def standardize_dates(self, date_fields: Dict) -> Dict:
         """
         Standardize date fields for database storage
@@ -329,8 +396,6 @@ class SupabaseDBManager:
         standardized = {}
         for field_name, date_value in date_fields.items():
             if date_value and str(date_value).strip():
-                # First convert to Colombian format for display, then to ISO for storage
-                colombian_format = format_colombian_date(date_value)
                 iso_format = parse_date_for_database(date_value)
                 # Store in ISO format for database, or None if parsing failed
                 standardized[field_name] = iso_format if iso_format else None
@@ -339,8 +404,19 @@ class SupabaseDBManager:
                 standardized[field_name] = None
         return standardized
 
-    def save_commission_order(self, commission_data: Dict) -> Tuple[bool, str]:
-        """Save commission order with automatic field calculations"""
+    def save_commission_order(self, commission_data: Dict,
+                              update_cache: bool = True) -> Tuple[bool, str, Optional[Dict]]:
+        """
+        Save commission order with automatic field calculations
+
+        Args:
+            commission_data: Order fields from the commission form
+            update_cache: Patch the session orders DataFrame with the inserted row
+
+        Returns:
+            Tuple of (success, message, result) where result holds the inserted row ('order')
+            and whether the funcionario was created ('funcionario_created'), or None on failure
+        """
         try:
             # Standardize all date fields to YYYY-MM-DD (ISO) format for database
             date_fields = {
@@ -356,16 +432,14 @@ class SupabaseDBManager:
             formulated_input.update(standardized_dates)
             formulated = self.calculate_formulated_fields(formulated_input)
 
-            # Check if funcionario exists, if not create it
-            funcionario_exists = self.get_funcionario(commission_data['numero_identificacion'])
-            if not funcionario_exists:
-                self.save_funcionario(
-                    commission_data['numero_identificacion'],
-                    commission_data['primer_nombre'],
-                    commission_data['otros_nombres'],
-                    commission_data['primer_apellido'],
-                    commission_data['segundo_apellido']
-                )
+            # Create funcionario if it does not exist yet
+            funcionario_created = self.create_funcionario_if_missing(
+                commission_data['numero_identificacion'],
+                commission_data['primer_nombre'],
+                commission_data['otros_nombres'],
+                commission_data['primer_apellido'],
+                commission_data['segundo_apellido']
+            )
 
             # Prepare order data with standardized dates
             # Convert empty strings to None for optional fields
@@ -401,23 +475,28 @@ class SupabaseDBManager:
                 'valor_orden_legalizado': formulated['valor_orden_legalizado']
             }
 
-            # Insert order
+            # Insert order; the response already carries the inserted row
             response = self.client.table('ordenes').insert(order_data).execute()
 
             if response.data:
-                return True, f"Orden #{commission_data['numero_orden']} guardada exitosamente"
+                if update_cache:
+                    upsert_order_row(response.data[0])
+                    self._replicate_order(response.data[0])
+                result = {'order': response.data[0], 'funcionario_created': funcionario_created}
+                return True, f"Orden #{commission_data['numero_orden']} guardada exitosamente", result
             else:
-                return False, "Error guardando orden"
+                return False, "Error guardando orden", None
 
         except Exception as e:
             error_msg = str(e)
             if 'duplicate key' in error_msg.lower() or 'unique constraint' in error_msg.lower():
-                return False, f"Ya existe una orden con el número {commission_data['numero_orden']}"
-            return False, f"Error guardando orden: {error_msg}"
+                return False, f"Ya existe una orden con el número {commission_data['numero_orden']}", None
+            return False, f"Error guardando orden: {error_msg}", None
 
     def search_orders(self, search_term: str) -> List[Dict]:
         """
         Search orders by various fields
+        Runs against the analytics replica when it is enabled and has completed a sync
 
         Args:
             search_term: Search term to match against order fields
@@ -425,6 +504,13 @@ class SupabaseDBManager:
         Returns:
             List of dictionaries containing matching orders
         """
+        # A search served by the local replica counts as a cache hit, one sent to Supabase as a miss
+        replica = get_synced_replica(self.client)
+        served_locally = replica is not None
+        record_cache_lookup('search', hit=served_locally)
+        if served_locally:
+            return replica.search_orders(search_term)
+
         try:
             # Use ilike for case-insensitive search across multiple fields
             response = self.client.table('ordenes').select('*').or_(
@@ -445,14 +531,20 @@ class SupabaseDBManager:
             logger.error(f"Error searching orders: {str(e)}")
             return []
 
-    def update_legalization(self, numero_orden: int, legalization_data: Dict) -> Tuple[bool, str]:
-        """Update legalization information for an order and recalculate formulated fields"""
+    def update_legalization(self, numero_orden: int, legalization_data: Dict) -> Tuple[bool, str, Optional[Dict]]:
+        """
+        Update legalization information for an order and recalculate formulated fields
+
+        Returns:
+            Tuple of (success, message, result) where result holds the updated row ('order'),
+            or None on failure
+        """
         try:
             # Get current order data
             response = self.client.table('ordenes').select('*').eq('numero_orden', numero_orden).execute()
 
             if not response.data:
-                return False, f"No se encontró la orden #{numero_orden}"
+                return False, f"No se encontró la orden #{numero_orden}", None
 
             current_order = response.data[0]
 
@@ -479,84 +571,76 @@ class SupabaseDBManager:
                 'valor_orden_legalizado': formulated['valor_orden_legalizado'],
                 'plazo_restante_legalizacion': formulated['plazo_restante_legalizacion'],
                 'alerta': formulated['alerta'],
-                'estado_legalizacion': formulated['estado_legalizacion']
+                'estado_legalizacion': formulated['estado_legalizacion'],
+                'updated_at': utc_timestamp()
             }
 
             # Update the order
             response = self.client.table('ordenes').update(update_data).eq('numero_orden', numero_orden).execute()
 
             if response.data:
-                return True, "Legalización actualizada exitosamente"
+                upsert_order_row(response.data[0])
+                self._replicate_order(response.data[0])
+                return True, "Legalización actualizada exitosamente", {'order': response.data[0]}
             else:
-                return False, "Error actualizando legalización"
+                return False, "Error actualizando legalización", None
 
         except Exception as e:
-            return False, f"Error actualizando legalización: {str(e)}"
+            return False, f"Error actualizando legalización: {str(e)}", None
 
-    def get_all_orders_df(self) -> pd.DataFrame:
+    def delete_order(self, numero_orden: int) -> Tuple[bool, str]:
         """
-        Get all orders as pandas DataFrame with proper column mapping and Colombian date formatting
+        Delete an order and remove it from the session orders DataFrame
 
         Returns:
-            DataFrame with all orders and properly formatted columns
+            Tuple of (success, message)
         """
         try:
-            response = self.client.table('ordenes').select('*').order('created_at', desc=True).execute()
+            self.client.table('ordenes').delete().eq('numero_orden', numero_orden).execute()
+            delete_order_row(numero_orden)
+            replica = get_analytics_replica()
+            if replica is not None:
+                replica.delete_orders([numero_orden])
+            return True, f"Orden #{numero_orden} eliminada"
 
-            if not response.data:
-                return pd.DataFrame()
+        except Exception as e:
+            return False, f"Error eliminando orden: {str(e)}"
 
-            df = pd.DataFrame(response.data)
-
-            # Column mapping to original Excel names
-            column_mapping = {
-                'numero_orden': 'Número de Orden',
-                'sede': 'Sede',
-                'fecha_elaboracion': 'Fecha de Elaboración',
-                'fecha_memorando': 'Fecha Memorando',
-                'radicado_memorando': 'Radicado del Memorando',
-                'rec': 'REC',
-                'id_rubro': 'ID del Rubro',
-                'fecha_inicial': 'Fecha Inicial',
-                'fecha_final': 'Fecha Final',
-                'numero_dias': 'Número de Días',
-                'valor_viaticos_diario': 'Valor Viáticos Diario',
-                'valor_viaticos_orden': 'Valor Viáticos Orden',
-                'valor_gastos_orden': 'Valor Gastos Orden',
-                'numero_identificacion': 'Número de Identificación',
-                'primer_nombre': 'Primer Nombre',
-                'otros_nombres': 'Otros Nombres',
-                'primer_apellido': 'Primer Apellido',
-                'segundo_apellido': 'Segundo Apellido',
-                'fecha_reintegro': 'Fecha Reintegro',
-                'fecha_limite_legalizacion': 'Fecha Límite Legalización',
-                'plazo_restante_legalizacion': 'Plazo Restante Legalización',
-                'alerta': 'Alerta',
-                'fecha_legalizacion': 'Fecha Legalización',
-                'estado_legalizacion': 'Estado Legalización',
-                'numero_legalizacion': 'Número Legalización',
-                'dias_legalizados': 'Dias Legalizados',
-                'valor_viaticos_legalizado': 'Valor Viaticos Legalizado',
-                'valor_gastos_legalizado': 'Valor Gastos Legalizado',
-                'valor_orden_legalizado': 'Valor Orden Legalizado'
-            }
+    def _replicate_order(self, order: Dict) -> None:
+        """Write-through: apply an inserted or updated order to the analytics replica, if enabled"""
+        replica = get_analytics_replica()
+        if replica is not None:
+            replica.upsert_orders([order])
 
-            # Rename columns to match original Excel
-            df = df.rename(columns=column_mapping)
+    def get_all_orders_df(self) -> pd.DataFrame:
+        """
+        Get all orders as pandas DataFrame with proper column mapping and typed columns
+        Dates are kept as datetime64; Colombian formatting is applied only when rendering
+        Starts from the on-disk snapshot when there is one and fetches only what changed since
+
+        Returns:
+            DataFrame with all orders using the original Excel column names
+        """
+        snapshot = load_orders_snapshot()
+        if snapshot is not None:
+            df = self._catch_up_orders(*snapshot)
+            if df is not None:
+                return df
 
-            # Convert date columns to Colombian format for display (DD/MM/YYYY)
-            date_columns = [
-                'Fecha de Elaboración', 'Fecha Memorando', 'Fecha Inicial', 'Fecha Final',
-                'Fecha Reintegro', 'Fecha Límite Legalización', 'Fecha Legalización'
-            ]
+        try:
+            # Paged: a single select stops at the server max-rows cap, and a truncated load
+            # saved as the snapshot would never be completed by later catch-ups
+            records = fetch_all_rows(
+                lambda: self.client.table('ordenes').select('*').order('created_at', desc=True).order('numero_orden')
+            )
 
-            for col in date_columns:
-                if col in df.columns:
-                    df[col] = df[col].apply(format_colombian_date)
+            if not records:
+                return pd.DataFrame()
 
-            # Remove metadata columns
-            metadata_columns = ['id', 'created_at', 'updated_at']
-            df = df.drop(columns=[col for col in metadata_columns if col in df.columns], errors='ignore')
+            # Typed frame: datetime64 dates, categorical labels and compact numeric columns
+            df = stamp_data_version(orders_records_to_df(records))
+            save_orders_snapshot(df, get_sync_watermark(records))
+            record_sync('orders', len(records))
 
             return df
 
@@ -564,6 +648,51 @@ class SupabaseDBManager:
             logger.error(f"Error getting orders DataFrame: {str(e)}")
             return pd.DataFrame()
 
+    def _catch_up_orders(self, df: pd.DataFrame, watermark: str) -> Optional[pd.DataFrame]:
+        """
+        Bring a snapshot of the orders up to date with the database
+
+        Args:
+            df: Typed orders DataFrame read from the snapshot
+            watermark: Largest updated_at the snapshot reflects
+
+        Returns:
+            Up-to-date DataFrame, or None if the catch-up failed and a full load is needed
+        """
+        try:
+            # Re-read a small window before the watermark so rows committed out of order are not missed
+            since = (pd.Timestamp(watermark) - SNAPSHOT_SYNC_OVERLAP).isoformat()
+            changed = fetch_all_rows(
+                lambda: self.client.table('ordenes').select('*').gte('updated_at', since)
+                .order('created_at', desc=True).order('numero_orden')
+            )
+
+            # Deletions leave no row behind, so compare the order numbers that still exist
+            existing_numbers = fetch_order_numbers(self.client)
+            if existing_numbers is None:
+                logger.warning("Could not list every order number; deleted orders are kept until the next catch-up")
+
+            merged = merge_orders(df, orders_records_to_df(changed)) if changed else df
+            keep = None
+            if existing_numbers is not None and len(merged):
+                keep = merged['Número de Orden'].isin(existing_numbers).to_numpy()
+            deleted = keep is not None and not keep.all()
+            if deleted:
+                merged = merged[keep].reset_index(drop=True)
+
+            merged = stamp_data_version(merged)
+            if changed or deleted:
+                new_watermark = max(pd.Timestamp(watermark), pd.Timestamp(get_sync_watermark(changed) or watermark))
+                save_orders_snapshot(merged, new_watermark.isoformat())
+
+            record_sync('orders', len(changed))
+            logger.info(f"Orders snapshot caught up: {len(changed)} changed rows, {len(merged)} orders")
+            return merged
+
+        except Exception as e:
+            logger.warning(f"Could not catch up orders snapshot, doing a full load: {str(e)}")
+            return None
+
     def get_order_by_number(self, numero_orden: int) -> Optional[Dict]:
         """Get specific order by number"""
         try:
@@ -589,8 +718,8 @@ class SupabaseDBManager:
         os.makedirs("Data", exist_ok=True)
 
         try:
-            # Get data with original column names
-            df_orders = self.get_all_orders_df()
+            # Get data with original column names and Colombian date format
+            df_orders = format_orders_for_display(self.get_all_orders_df())
 
             with pd.ExcelWriter(filename, engine='openpyxl') as writer:
                 # Export orders
@@ -630,85 +759,40 @@ class SupabaseDBManager:
         try:
             df = pd.read_excel(excel_file, sheet_name=sheet_name)
 
-            # Map original Excel columns to database columns
-            reverse_column_mapping = {
-                'Número de Orden': 'numero_orden',
-                'Sede': 'sede',
-                'Fecha de Elaboración': 'fecha_elaboracion',
-                'Fecha Memorando': 'fecha_memorando',
-                'Radicado del Memorando': 'radicado_memorando',
-                'REC': 'rec',
-                'ID del Rubro': 'id_rubro',
-                'Fecha Inicial': 'fecha_inicial',
-                'Fecha Final': 'fecha_final',
-                'Número de Días': 'numero_dias',
-                'Valor Viáticos Diario': 'valor_viaticos_diario',
-                'Valor Viáticos Orden': 'valor_viaticos_orden',
-                'Valor Gastos Orden': 'valor_gastos_orden',
-                'Número de Identificación': 'numero_identificacion',
-                'Primer Nombre': 'primer_nombre',
-                'Otros Nombres': 'otros_nombres',
-                'Primer Apellido': 'primer_apellido',
-                'Segundo Apellido': 'segundo_apellido',
-                'Fecha Reintegro': 'fecha_reintegro',
-                'Fecha Límite Legalización': 'fecha_limite_legalizacion',
-                'Plazo Restante Legalización': 'plazo_restante_legalizacion',
-                'Alerta': 'alerta',
-                'Fecha Legalización': 'fecha_legalizacion',
-                'Estado Legalización': 'estado_legalizacion',
-                'Número Legalización': 'numero_legalizacion',
-                'Dias Legalizados': 'dias_legalizados',
-                'Valor Viaticos Legalizado': 'valor_viaticos_legalizado',
-                'Valor Gastos Legalizado': 'valor_gastos_legalizado',
-                'Valor Orden Legalizado': 'valor_orden_legalizado'
-            }
-
             # Rename columns to database format
-            df = df.rename(columns=reverse_column_mapping)
+            df = df.rename(columns=REVERSE_COLUMN_MAPPING)
+
+            # Dates are standardized column-wise to ISO strings (None when empty or unparseable)
+            for field in IMPORT_DATE_FIELDS:
+                if field in df.columns:
+                    df[field] = parse_date_for_database_series(df[field])
+
+            # Money columns may come as text in Colombian format (1.234.567,89)
+            for field in IMPORT_CURRENCY_FIELDS:
+                if field in df.columns:
+                    df[field] = parse_colombian_currency_series(df[field])
+
+            def date_value(row, field):
+                value = row.get(field)
+                return value if isinstance(value, str) else None
 
             imported_count = 0
             errors = []
 
             for index, row in df.iterrows():
                 try:
-                    # Helper function to convert dates properly
-                    def convert_date_value(val):
-                        """Convert any date value (timestamp, string, number) to DD/MM/YYYY string"""
-                        if pd.isna(val) or val == '' or val == 0:
-                            return ''
-
-                        try:
-                            # If it's a pandas Timestamp or datetime
-                            if hasattr(val, 'strftime'):
-                                return val.strftime('%d/%m/%Y')
-                            # If it's a string
-                            elif isinstance(val, str):
-                                return val.strip() if val.strip() else ''
-                            # If it's a number (timestamp in milliseconds or seconds)
-                            elif isinstance(val, (int, float)):
-                                if val > 1e10:  # Likely milliseconds
-                                    dt = pd.Timestamp(val, unit='ms')
-                                else:  # Likely seconds
-                                    dt = pd.Timestamp(val, unit='s')
-                                return dt.strftime('%d/%m/%Y')
-                            else:
-                                str_val = str(val).strip()
-                                return str_val if str_val else ''
-                        except:
-                            return str(val).strip() if str(val).strip() else ''
-
                     # Prepare basic commission data (required fields)
                     commission_data = {
                         'numero_orden': int(row['numero_orden']),
                         'sede': str(row['sede']).upper() if pd.notna(row['sede']) else '',
-                        'fecha_elaboracion': convert_date_value(row['fecha_elaboracion']),
-                        'fecha_memorando': convert_date_value(row['fecha_memorando']),
+                        'fecha_elaboracion': date_value(row, 'fecha_elaboracion'),
+                        'fecha_memorando': date_value(row, 'fecha_memorando'),
                         'radicado_memorando': str(row.get('radicado_memorando', '')).strip().upper() if pd.notna(
                             row.get('radicado_memorando', '')) else '',
                         'rec': int(row['rec']) if pd.notna(row['rec']) else 0,
                         'id_rubro': str(row.get('id_rubro', '')).strip().upper() if pd.notna(row.get('id_rubro', '')) else '',
-                        'fecha_inicial': convert_date_value(row['fecha_inicial']),
-                        'fecha_final': convert_date_value(row['fecha_final']),
+                        'fecha_inicial': date_value(row, 'fecha_inicial'),
+                        'fecha_final': date_value(row, 'fecha_final'),
                         'numero_dias': int(row['numero_dias']) if pd.notna(row['numero_dias']) else 0,
                         'valor_viaticos_diario': float(row['valor_viaticos_diario']) if pd.notna(
                             row['valor_viaticos_diario']) else 0.0,
@@ -727,19 +811,9 @@ class SupabaseDBManager:
                             row.get('segundo_apellido', '')) else ''
                     }
 
-                    # Standardize dates before saving (this will convert to ISO format and handle empty values as None)
-                    date_fields = {
-                        'fecha_elaboracion': commission_data['fecha_elaboracion'],
-                        'fecha_memorando': commission_data['fecha_memorando'],
-                        'fecha_inicial': commission_data['fecha_inicial'],
-                        'fecha_final': commission_data['fecha_final']
-                    }
-                    standardized_dates = self.standardize_dates(date_fields)
-                    commission_data.update(standardized_dates)
-
                     # Add legalization data if present
                     legalization_fields = {
-                        'fecha_legalizacion': convert_date_value(row.get('fecha_legalizacion', '')),
+                        'fecha_legalizacion': date_value(row, 'fecha_legalizacion'),
                         'numero_legalizacion': int(row.get('numero_legalizacion', 0)) if pd.notna(
                             row.get('numero_legalizacion', 0)) and str(
                             row.get('numero_legalizacion', 0)) != '' else None,
@@ -753,12 +827,6 @@ class SupabaseDBManager:
                             row.get('valor_gastos_legalizado', 0)) != '' else None
                     }
 
-                    # Standardize legalization date if present (returns None for empty values)
-                    standardized_leg_date = self.standardize_dates({
-                        'fecha_legalizacion': legalization_fields['fecha_legalizacion']
-                    })
-                    legalization_fields['fecha_legalizacion'] = standardized_leg_date.get('fecha_legalizacion')
-
                     # Clean empty strings and zeros to None for optional fields
                     for key, value in legalization_fields.items():
                         if value == '' or value == 0:
@@ -773,7 +841,8 @@ class SupabaseDBManager:
                             commission_data[field] = None
 
                     # Save the commission order (this will calculate formulated fields automatically)
-                    success, message = self.save_commission_order(commission_data)
+                    # Bulk import: the caller reloads the full table once at the end
+                    success, message, _ = self.save_commission_order(commission_data, update_cache=False)
                     if success:
                         imported_count += 1
                     else:
@@ -821,7 +890,8 @@ class SupabaseDBManager:
                     'plazo_restante_legalizacion': formulated['plazo_restante_legalizacion'],
                     'alerta': formulated['alerta'],
                     'estado_legalizacion': formulated['estado_legalizacion'],
-                    'valor_orden_legalizado': formulated['valor_orden_legalizado']
+                    'valor_orden_legalizado': formulated['valor_orden_legalizado'],
+                    'updated_at': utc_timestamp()
                 }
                 updates_batch.append(update_data)
                 updated_count += 1
@@ -847,34 +917,62 @@ class SupabaseDBManager:
             logger.error(f"Error recalculando campos: {str(e)}")
             return False, f"Error recalculando campos: {str(e)}"
 
-    def refresh_data(self) -> Tuple[bool, str]:
-        """Refresh data from Supabase database"""
-        try:
-            # Get all orders from database
-            df = self.get_all_orders_df()
-
-            if df.empty:
-                return False, "No se pudieron cargar datos desde Supabase"
-
-            return True, f"✅ Datos actualizados: {len(df)} registros cargados"
-
-        except Exception as e:
-            return False, f"Error actualizando datos: {str(e)}"
-
 
 # Streamlit integration functions
 def init_database_session():
     """Initialize Supabase database in session state"""
+    # Metrics endpoint, only when METRICS_PORT is set (started once per process)
+    start_metrics_server()
+
     if 'database_manager' not in st.session_state:
         try:
             st.session_state.database_manager = SupabaseDBManager(use_service_role=True)
             st.session_state.database_connected = True
-            st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
+            # Orders are loaded on demand by the tabs that need them (see ensure_orders_loaded)
         except Exception as e:
             st.session_state.database_connected = False
             st.error(f"🔍 Debug Error: {str(e)}")
 
 
+def ensure_orders_loaded() -> Optional[pd.DataFrame]:
+    """
+    Load the orders DataFrame into session state the first time a tab needs it
+
+    Returns:
+        Orders DataFrame, or None if the database is not initialized
+    """
+    loaded = st.session_state.get('excel_data') is not None
+    if 'database_manager' in st.session_state:
+        record_cache_lookup('orders', hit=loaded)
+    if not loaded and 'database_manager' in st.session_state:
+        with st.spinner("Cargando datos desde Supabase..."):
+            st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
+    return st.session_state.get('excel_data')
+
+
+def reload_orders() -> Tuple[bool, str]:
+    """
+    Reload the orders DataFrame from Supabase into session state
+
+    Returns:
+        Tuple of (success, message)
+    """
+    if 'database_manager' not in st.session_state:
+        return False, "Database not initialized"
+
+    try:
+        df = st.session_state.database_manager.get_all_orders_df()
+
+        if df.empty:
+            return False, "No se pudieron cargar datos desde Supabase"
+
+        st.session_state.excel_data = df
+        return True, f"✅ Datos actualizados: {len(df)} registros cargados"
+
+    except Exception as e:
+        return False, f"Error actualizando datos: {str(e)}"
+
+
 def get_funcionario(numero_identificacion: str) -> Optional[Dict]:
     """Get funcionario from database"""
     if 'database_manager' not in st.session_state:
@@ -887,10 +985,10 @@ def get_funcionario(numero_identificacion: str) -> Optional[Dict]:
         return None
 
 
-def save_commission_order(commission_data: Dict) -> Tuple[bool, str]:
+def save_commission_order(commission_data: Dict) -> Tuple[bool, str, Optional[Dict]]:
     """Save commission to database"""
     if 'database_manager' not in st.session_state:
-        return False, "Database not initialized"
+        return False, "Database not initialized", None
 
     return st.session_state.database_manager.save_commission_order(commission_data)
 
@@ -903,10 +1001,10 @@ def search_orders(search_term: str) -> List[Dict]:
     return st.session_state.database_manager.search_orders(search_term)
 
 
-def update_legalization(numero_orden: int, legalization_data: Dict) -> Tuple[bool, str]:
+def update_legalization(numero_orden: int, legalization_data: Dict) -> Tuple[bool, str, Optional[Dict]]:
     """Update legalization in database"""
     if 'database_manager' not in st.session_state:
-        return False, "Database not initialized"
+        return False, "Database not initialized", None
 
     return st.session_state.database_manager.update_legalization(numero_orden, legalization_data)
 
@@ -5,13 +5,9 @@ from openpyxl.utils.dataframe import dataframe_to_rows
 import os
 import logging
 from datetime import datetime
-from utils import get_colombian_datetime_now
+from utils import get_colombian_datetime_now, parse_colombian_currency_series
+from logging_config import configure_logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
 # Get the directory where this script is located
@@ -70,12 +66,12 @@ def consolidate_excel_sheets(input_file, output_file=None):
             logger.info(f"🔄 Procesando hoja {i + 1}/{len(data_sheets)}: {sheet_name}")
 
             try:
-                # Leer la hoja actual
-                df = pd.read_excel(input_file, sheet_name=sheet_name)
+                # Leer la hoja actual sin encabezados (las filas de título van antes de los encabezados)
+                raw = pd.read_excel(excel_file, sheet_name=sheet_name, header=None)
 
                 # Buscar la fila de encabezados (usualmente contiene "IDENTIFICACIÓN" o "No DE IDENTIFICACIÓN")
                 header_row = None
-                for idx, row in df.iterrows():
+                for idx, row in raw.iterrows():
                     if any('IDENTIFICACIÓN' in str(cell).upper() for cell in row if pd.notna(cell)):
                         header_row = idx
                         break
@@ -84,8 +80,13 @@ def consolidate_excel_sheets(input_file, output_file=None):
                     logger.warning(f"⚠️  No se encontraron encabezados válidos en {sheet_name}, saltando...")
                     continue
 
-                # Releer la hoja usando la fila de encabezados correcta
-                df = pd.read_excel(input_file, sheet_name=sheet_name, header=header_row)
+                # Tomar los datos bajo la fila de encabezados (sin releer el archivo)
+                df = raw.iloc[header_row + 1:].reset_index(drop=True)
+                df.columns = [
+                    str(name).strip() if pd.notna(name) else f"Unnamed: {i}"
+                    for i, name in enumerate(raw.iloc[header_row])
+                ]
+                df = df.infer_objects()
 
                 # Limpiar el DataFrame
                 # Eliminar filas completamente vacías
@@ -139,9 +140,11 @@ def consolidate_excel_sheets(input_file, output_file=None):
         final_df = final_df.fillna('')
 
         # Convertir columnas numéricas apropiadamente
-        numeric_columns = ['REC', 'VIGENCIA', 'No. ORDEN', 'DIAS OC', 'VALOR VIÁTICO DIARIO',
-                           'VALOR VIATICOS ORDEN', 'GASTOS ORDEN', 'TOTAL GIRADO ORDEN',
-                           'DIAS LEG.', 'VIATICOS LEG.', 'GASTOS LEG.', 'TOTAL LEG.', 'TOTAL REINTEGRO']
+        numeric_columns = ['REC', 'VIGENCIA', 'No. ORDEN', 'DIAS OC', 'DIAS LEG.']
+
+        # Valores en pesos: pueden venir como texto en formato colombiano (1.234.567,89)
+        currency_columns = ['VALOR VIÁTICO DIARIO', 'VALOR VIATICOS ORDEN', 'GASTOS ORDEN', 'TOTAL GIRADO ORDEN',
+                            'VIATICOS LEG.', 'GASTOS LEG.', 'TOTAL LEG.', 'TOTAL REINTEGRO']
 
         for col in numeric_columns:
             if col in final_df.columns:
@@ -150,6 +153,10 @@ def consolidate_excel_sheets(input_file, output_file=None):
                 except (ValueError, TypeError):
                     continue
 
+        for col in currency_columns:
+            if col in final_df.columns:
+                final_df[col] = parse_colombian_currency_series(final_df[col])
+
         # Crear archivo Excel con formato profesional
         logger.info("📝 Creando archivo Excel con formato profesional...")
 
@@ -312,6 +319,7 @@ def create_summary_sheet(wb, df, sheet_names):
 # Función principal para ejecutar
 def main():
     """Función principal para ejecutar la consolidación"""
+    configure_logging()
 
     # Configurar el nombre del archivo usando rutas relativas al proyecto
     input_file = os.path.join(PROJECT_DIR, "Data", "02_REPORTE VIATICOS DT 2025.xlsx")
@@ -0,0 +1,172 @@
+"""
+Deadline index module
+Unlegalized orders kept sorted by legalization deadline for the alert panel
+"""
+
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+ALERT_VENCIDO = 'Plazo Vencido'
+ALERT_PROXIMO = 'Plazo Próximo'
+ALERT_SUFICIENTE = 'Tiempo Suficiente'
+
+# Days left (business days) at or below which a deadline is "próximo", as in calculate_formulated_fields
+PROXIMO_MAX_DAYS = 2
+
+# Columns kept per order to render the critical orders table without scanning the frame
+INDEX_COLUMNS = ['Número de Orden', 'Sede', 'Primer Nombre', 'Primer Apellido', 'Fecha Final', 'Fecha Límite Legalización']
+
+
+class DeadlineIndex:
+    """
+    Sorted (fecha límite, número de orden) keys of the orders that are not legalized yet
+
+    Alert counts and the most urgent orders are answered with two binary searches
+    plus the k returned entries. Adding or removing one order is a binary search plus
+    a list insert/delete, which shifts the later keys: O(n), but a single memmove
+    instead of rebuilding the index from the frame.
+    """
+
+    def __init__(self) -> None:
+        self._keys: List[Tuple[date, int]] = []
+        self._records: Dict[int, Dict] = {}
+        self.data_version: Optional[str] = None
+
+    @classmethod
+    def from_orders(cls, df: pd.DataFrame) -> 'DeadlineIndex':
+        """
+        Build the index from the typed orders DataFrame
+
+        Args:
+            df: Typed orders DataFrame (datetime64 date columns)
+
+        Returns:
+            DeadlineIndex with every unlegalized order that has a deadline
+        """
+        index = cls()
+        if df is None or df.empty or 'Fecha Límite Legalización' not in df.columns:
+            return index
+
+        pending = df[cls._pending_mask(df)]
+        pending = pending[[col for col in INDEX_COLUMNS if col in pending.columns]]
+        pending = pending.sort_values(['Fecha Límite Legalización', 'Número de Orden'])
+
+        records = pending.astype(object).where(pending.notna(), None).to_dict('records')
+        for record in records:
+            numero_orden = int(record['Número de Orden'])
+            record['Fecha Límite Legalización'] = record['Fecha Límite Legalización'].date()
+            index._keys.append((record['Fecha Límite Legalización'], numero_orden))
+            index._records[numero_orden] = record
+
+        return index
+
+    @staticmethod
+    def _pending_mask(df: pd.DataFrame) -> pd.Series:
+        """Rows with a deadline, an order number and no legalization date"""
+        mask = df['Fecha Límite Legalización'].notna() & df['Número de Orden'].notna()
+        if 'Fecha Legalización' in df.columns:
+            mask &= df['Fecha Legalización'].isna()
+        return mask
+
+    def remove(self, numero_orden: int) -> None:
+        """Remove an order from the index if present"""
+        record = self._records.pop(numero_orden, None)
+        if record is None:
+            return
+        key = (record['Fecha Límite Legalización'], numero_orden)
+        position = bisect_left(self._keys, key)
+        if position < len(self._keys) and self._keys[position] == key:
+            del self._keys[position]
+
+    def update_orders(self, rows: pd.DataFrame) -> None:
+        """
+        Apply inserted or updated orders: legalized orders leave the index, pending ones enter it
+
+        Args:
+            rows: Typed orders DataFrame with the changed rows
+        """
+        if rows.empty or 'Número de Orden' not in rows.columns:
+            return
+
+        for numero_orden in rows['Número de Orden'].dropna():
+            self.remove(int(numero_orden))
+
+        if 'Fecha Límite Legalización' not in rows.columns:
+            return
+
+        fresh = DeadlineIndex.from_orders(rows)
+        for key in fresh._keys:
+            insort(self._keys, key)
+        self._records.update(fresh._records)
+
+    @staticmethod
+    def _thresholds(today: date, holidays: Iterable[date]) -> Tuple[date, date]:
+        """
+        Deadlines before the first date are overdue, before the second one are close
+
+        A deadline is overdue once a business day has passed after it (plazo < 0), and
+        close while at most PROXIMO_MAX_DAYS business days remain after today.
+        """
+        holidays = np.array(list(holidays), dtype='datetime64[D]')
+        today_d = np.datetime64(today, 'D')
+        last_business_day = np.busday_offset(today_d, 0, roll='backward', holidays=holidays)
+        first_sufficient = np.busday_offset(today_d, PROXIMO_MAX_DAYS + 1, roll='backward', holidays=holidays)
+        return last_business_day.astype(date), first_sufficient.astype(date)
+
+    def alert_counts(self, today: date, holidays: Iterable[date] = ()) -> Dict[str, int]:
+        """
+        Count pending orders by alert level as of today
+
+        Returns:
+            Dictionary with the number of orders for each alert label
+        """
+        vencido_before, proximo_before = self._thresholds(today, holidays)
+        vencido = bisect_left(self._keys, (vencido_before, -1))
+        proximo = bisect_left(self._keys, (proximo_before, -1)) - vencido
+        return {
+            ALERT_VENCIDO: vencido,
+            ALERT_PROXIMO: proximo,
+            ALERT_SUFICIENTE: len(self._keys) - vencido - proximo
+        }
+
+    def critical_orders(self, today: date, holidays: Iterable[date] = (), limit: int = 100) -> pd.DataFrame:
+        """
+        Most urgent overdue or close orders, earliest deadline first
+
+        Args:
+            today: Reference date
+            holidays: Holidays excluded from business days
+            limit: Maximum number of orders returned
+
+        Returns:
+            DataFrame with the indexed columns plus live 'Plazo Restante Legalización' and 'Alerta'
+        """
+        holidays = list(holidays)
+        _, proximo_before = self._thresholds(today, holidays)
+        end = min(bisect_left(self._keys, (proximo_before, -1)), limit)
+        records = [dict(self._records[numero_orden]) for _, numero_orden in self._keys[:end]]
+
+        if not records:
+            return pd.DataFrame(columns=INDEX_COLUMNS + ['Plazo Restante Legalización', 'Alerta'])
+
+        critical = pd.DataFrame(records)
+        deadlines = critical['Fecha Límite Legalización'].to_numpy(dtype='datetime64[D]')
+        after_today = np.datetime64(today + timedelta(days=1), 'D')
+        after_deadline = deadlines + np.timedelta64(1, 'D')
+        holidays = np.array(holidays, dtype='datetime64[D]')
+        # Business days left after today, or minus the business days elapsed since the deadline
+        plazo = np.where(
+            after_deadline > after_today,
+            np.busday_count(after_today, np.maximum(after_deadline, after_today), holidays=holidays),
+            -np.busday_count(np.minimum(after_deadline, after_today), after_today, holidays=holidays)
+        )
+        critical['Fecha Límite Legalización'] = pd.to_datetime(critical['Fecha Límite Legalización'])
+        critical['Plazo Restante Legalización'] = plazo
+        critical['Alerta'] = np.where(plazo < 0, ALERT_VENCIDO, ALERT_PROXIMO)
+        return critical
+
+    def __len__(self) -> int:
+        return len(self._keys)
@@ -0,0 +1,76 @@
+"""
+Download service module
+Lazy, cached generation of the Excel reports offered by the dashboard
+"""
+
+from datetime import datetime
+from io import BytesIO
+import pandas as pd
+import streamlit as st
+from cache_utils import get_cache
+
+EXCEL_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Generated workbooks shared by all sessions, bounded by count and total size
+DOWNLOAD_CACHE = get_cache('excel_downloads', max_entries=64, max_bytes=64 * 1024 * 1024)
+
+
+def dataframe_to_excel_bytes(df: pd.DataFrame, sheet_name: str, index: bool = False) -> bytes:
+    """
+    Write a DataFrame to an in-memory Excel workbook
+
+    Args:
+        df: DataFrame to export
+        sheet_name: Name of the worksheet
+        index: Whether to write the DataFrame index
+
+    Returns:
+        Workbook contents
+    """
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        df.to_excel(writer, index=index, sheet_name=sheet_name)
+    return buffer.getvalue()
+
+
+def get_excel_report(report_key, build_frame, sheet_name: str, index: bool = False) -> bytes:
+    """
+    Get a report workbook, generating it only the first time its key is requested
+
+    Args:
+        report_key: Hashable key, e.g. (data version, filters, report name, options)
+        build_frame: Function returning the DataFrame to export
+        sheet_name: Name of the worksheet
+        index: Whether to write the DataFrame index
+
+    Returns:
+        Workbook contents
+    """
+    return DOWNLOAD_CACHE.get_or_create(
+        report_key,
+        lambda: dataframe_to_excel_bytes(build_frame(), sheet_name, index=index)
+    )
+
+
+def render_excel_download(label: str, report_key, build_frame, sheet_name: str,
+                          file_prefix: str, key: str, index: bool = False) -> None:
+    """
+    Render a download button whose workbook is generated when the user clicks it
+
+    Args:
+        label: Button label
+        report_key: Hashable cache key of the report
+        build_frame: Function returning the DataFrame to export
+        sheet_name: Name of the worksheet
+        file_prefix: Downloaded file name prefix (a timestamp is appended)
+        key: Widget key
+        index: Whether to write the DataFrame index
+    """
+    st.download_button(
+        label=label,
+        data=lambda: get_excel_report(report_key, build_frame, sheet_name, index=index),
+        file_name=f"{file_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+        mime=EXCEL_MIME,
+        key=key,
+        on_click="ignore"
+    )
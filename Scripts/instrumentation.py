@@ -0,0 +1,533 @@
+"""
+Instrumentation module
+In-process latency, row and payload histograms for SupabaseDBManager methods and database
+requests, exported as a JSON snapshot and as Prometheus text (optionally over HTTP)
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import functools
+import weakref
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# METRICS_ENABLED=0 turns every probe into a single flag check
+METRICS_ENABLED_ENV = 'METRICS_ENABLED'
+# METRICS_PORT=<port> serves /metrics (Prometheus text) and /metrics.json
+METRICS_PORT_ENV = 'METRICS_PORT'
+# Interface the endpoint binds to; it has no authentication, so it stays local unless overridden
+METRICS_HOST_ENV = 'METRICS_HOST'
+DEFAULT_METRICS_HOST = '127.0.0.1'
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROWS_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+BYTES_BUCKETS = (1_024, 10_240, 102_400, 1_048_576, 10_485_760, 104_857_600)
+
+# Recent observations kept per series to report percentiles
+RECENT_SAMPLES = 512
+
+# The payload size is estimated by serializing at most this many evenly spaced rows
+PAYLOAD_SAMPLE_ROWS = 8
+
+QUERY_ACTIONS = ('select', 'insert', 'upsert', 'update', 'delete')
+
+# Level of the structured record (operation, latency_ms, rows) logged for each database request;
+# failed requests are logged at WARNING or above
+LOG_OPERATIONS_LEVEL_ENV = 'LOG_OPERATIONS_LEVEL'
+
+_enabled = os.getenv(METRICS_ENABLED_ENV, '1').strip().lower() not in ('0', 'false', 'no', 'off')
+
+
+def _operation_log_level() -> int:
+    level = logging.getLevelName(os.getenv(LOG_OPERATIONS_LEVEL_ENV, 'INFO').strip().upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+OPERATION_LOG_LEVEL = _operation_log_level()
+
+
+def metrics_enabled() -> bool:
+    """Whether probes are recording"""
+    return _enabled
+
+
+def set_metrics_enabled(enabled: bool) -> None:
+    """Turn recording on or off at runtime"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+class Histogram:
+    """Cumulative-bucket histogram plus a window of recent values for percentiles"""
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.recent: Deque[float] = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.recent.append(value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Percentile (0-100) of the recent values, None when empty"""
+        if not self.recent:
+            return None
+        values = sorted(self.recent)
+        return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], self._cumulative())),
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+    def _cumulative(self) -> List[int]:
+        running, cumulative = 0, []
+        for count in self.bucket_counts:
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+
+# Metric name: (description, kind, buckets)
+METRICS = {
+    'viaticos_method_seconds': ("Wall time of SupabaseDBManager methods", 'histogram', SECONDS_BUCKETS),
+    'viaticos_db_request_seconds': ("Wall time of database requests", 'histogram', SECONDS_BUCKETS),
+    'viaticos_db_request_rows': ("Rows returned by database requests", 'histogram', ROWS_BUCKETS),
+    'viaticos_db_request_bytes': ("Estimated JSON size of the rows returned by database requests", 'histogram', BYTES_BUCKETS),
+    'viaticos_db_request_errors_total': ("Database requests that failed", 'counter', None),
+    'viaticos_method_errors_total': ("SupabaseDBManager methods that raised", 'counter', None),
+    'viaticos_cache_lookups_total': ("Cache lookups by cache and result (hit or miss)", 'counter', None),
+    'viaticos_sync_timestamp_seconds': ("Unix time of the last sync with the database", 'gauge', None),
+    'viaticos_sync_rows': ("Rows fetched by the last sync with the database", 'gauge', None),
+}
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled histograms and counters"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Any] = {}
+        self.started_at = time.time()
+
+    def _key(self, name: str, labels: Dict[str, str]) -> Tuple[str, Tuple[Tuple[str, str], ...]]:
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = self._series[key] = Histogram(METRICS[name][2])
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._series[key] = value
+
+    def values(self, name: str) -> Dict[Tuple[Tuple[str, str], ...], float]:
+        """Counter or gauge values of one metric by label set"""
+        with self._lock:
+            return {labels: value for (metric, labels), value in self._series.items() if metric == name}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+            self.started_at = time.time()
+
+    def histograms(self, name: str) -> Dict[Tuple[Tuple[str, str], ...], Histogram]:
+        """Histograms of one metric by label set"""
+        with self._lock:
+            return {labels: series for (metric, labels), series in self._series.items() if metric == name}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All series as plain data (JSON serializable)"""
+        with self._lock:
+            items = list(self._series.items())
+            series_dicts = [
+                (name, labels, value.to_dict() if isinstance(value, Histogram) else value)
+                for (name, labels), value in items
+            ]
+
+        metrics: Dict[str, List[Dict]] = {}
+        for name, labels, value in series_dicts:
+            metrics.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+        return {'enabled': _enabled, 'started_at': self.started_at, 'generated_at': time.time(), 'metrics': metrics}
+
+    def prometheus_text(self) -> str:
+        """All series in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        for name, series in sorted(snapshot['metrics'].items()):
+            description, kind, _ = METRICS[name]
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for entry in series:
+                labels = entry['labels']
+                if kind == 'histogram':
+                    for bound, count in entry['value']['buckets'].items():
+                        lines.append(f"{name}_bucket{_format_labels(dict(labels, le=bound))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {entry['value']['sum']}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {entry['value']['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {entry['value']}")
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    escaped = (f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for key, value in sorted(labels.items()))
+    return '{' + ','.join(escaped) + '}'
+
+
+REGISTRY = MetricsRegistry()
+
+
+def get_metrics_snapshot() -> Dict[str, Any]:
+    """JSON-serializable snapshot of every metric"""
+    return REGISTRY.snapshot()
+
+
+def get_metrics_json() -> str:
+    return json.dumps(get_metrics_snapshot(), indent=2, ensure_ascii=False)
+
+
+def get_prometheus_text() -> str:
+    return REGISTRY.prometheus_text()
+
+
+def latency_percentiles(metric: str = 'viaticos_db_request_seconds') -> List[Dict[str, Any]]:
+    """
+    Latency of each series of a seconds histogram, slowest p95 first
+
+    Returns:
+        One dictionary per label set with the call count, p50/p95/p99 and total (milliseconds)
+    """
+    rows = []
+    for labels, histogram in REGISTRY.histograms(metric).items():
+        row = dict(labels)
+        row['calls'] = histogram.count
+        for p in (50, 95, 99):
+            row[f'p{p}_ms'] = histogram.percentile(p) * 1000
+        row['total_ms'] = histogram.total * 1000
+        rows.append(row)
+    return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+
+# --- Caches, syncs, sessions and cached frames ----------------------------
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Count a hit or miss of one of the app caches (holidays, orders, search...)"""
+    if _enabled:
+        REGISTRY.increment('viaticos_cache_lookups_total', cache=cache, result='hit' if hit else 'miss')
+
+
+def cache_hit_rates() -> Dict[str, Dict[str, float]]:
+    """Hits, misses and hit rate of every cache with recorded lookups"""
+    rates: Dict[str, Dict[str, float]] = {}
+    for labels, count in REGISTRY.values('viaticos_cache_lookups_total').items():
+        labels = dict(labels)
+        entry = rates.setdefault(labels['cache'], {'hits': 0, 'misses': 0})
+        entry['hits' if labels['result'] == 'hit' else 'misses'] += count
+    for entry in rates.values():
+        lookups = entry['hits'] + entry['misses']
+        entry['hit_rate'] = entry['hits'] / lookups if lookups else 0.0
+    return rates
+
+
+def record_sync(source: str, rows: int) -> None:
+    """Record a completed sync with the database (full load or incremental catch-up)"""
+    if _enabled:
+        REGISTRY.set_gauge('viaticos_sync_timestamp_seconds', time.time(), source=source)
+        REGISTRY.set_gauge('viaticos_sync_rows', rows, source=source)
+
+
+def last_syncs() -> Dict[str, Dict[str, float]]:
+    """{source: {'timestamp': unix time, 'rows': rows fetched}} of the last sync of each source"""
+    rows = {dict(labels)['source']: value for labels, value in REGISTRY.values('viaticos_sync_rows').items()}
+    return {
+        dict(labels)['source']: {'timestamp': timestamp, 'rows': rows.get(dict(labels)['source'], 0)}
+        for labels, timestamp in REGISTRY.values('viaticos_sync_timestamp_seconds').items()
+    }
+
+
+# Sessions that reran within this window count as active
+ACTIVE_SESSION_WINDOW_SECONDS = 15 * 60
+
+_session_activity: Dict[str, float] = {}
+_session_lock = threading.Lock()
+
+
+def record_session_activity(session_id: str) -> None:
+    """Mark a browser session as active (called on every rerun)"""
+    now = time.time()
+    with _session_lock:
+        _session_activity[session_id] = now
+        if len(_session_activity) > 1000:
+            for stale in [sid for sid, seen in _session_activity.items() if now - seen > ACTIVE_SESSION_WINDOW_SECONDS]:
+                del _session_activity[stale]
+
+
+def active_session_count(window_seconds: float = ACTIVE_SESSION_WINDOW_SECONDS) -> int:
+    """Sessions that reran within the window"""
+    now = time.time()
+    with _session_lock:
+        return sum(1 for seen in _session_activity.values() if now - seen <= window_seconds)
+
+
+_tracked_frames: Dict[int, Tuple[str, weakref.ref]] = {}
+_frames_lock = threading.Lock()
+
+
+def track_dataframe(kind: str, df) -> None:
+    """
+    Count a cached DataFrame in dataframe_memory while it is alive
+
+    Args:
+        kind: Label the memory is reported under (e.g. 'orders', 'dashboard')
+        df: DataFrame held by session state or a cache; None is ignored
+    """
+    if df is None or not _enabled:
+        return
+    key = id(df)
+
+    def forget(_ref, key=key):
+        with _frames_lock:
+            _tracked_frames.pop(key, None)
+
+    with _frames_lock:
+        _tracked_frames[key] = (kind, weakref.ref(df, forget))
+
+
+def dataframe_memory() -> Dict[str, Dict[str, int]]:
+    """{kind: {'frames': n, 'bytes': deep memory usage}} of the tracked DataFrames still alive"""
+    with _frames_lock:
+        frames = [(kind, ref()) for kind, ref in _tracked_frames.values()]
+
+    memory: Dict[str, Dict[str, int]] = {}
+    for kind, df in frames:
+        if df is None:
+            continue
+        entry = memory.setdefault(kind, {'frames': 0, 'bytes': 0})
+        entry['frames'] += 1
+        entry['bytes'] += int(df.memory_usage(deep=True).sum())
+    return memory
+
+
+# --- Manager methods ----------------------------------------------------
+
+# Set by @untimed on methods that instrument_methods must leave alone
+UNTIMED_ATTR = '_instrumentation_untimed'
+
+
+def untimed(method: Callable) -> Callable:
+    """
+    Keep a method out of instrument_methods
+
+    For pure helpers called once per row (business-day math, formulated fields): they do
+    no I/O, and timing them would take the registry lock on every call.
+    """
+    setattr(method, UNTIMED_ATTR, True)
+    return method
+
+
+def instrument_methods(cls):
+    """
+    Class decorator: time every method defined on the class (viaticos_method_seconds{method})
+
+    Static and class methods, dunder methods and methods marked @untimed are left untouched.
+    """
+    for name, attribute in list(vars(cls).items()):
+        if name.startswith('__') or not callable(attribute) or isinstance(attribute, (staticmethod, classmethod)):
+            continue
+        if getattr(attribute, UNTIMED_ATTR, False):
+            continue
+        setattr(cls, name, _timed_method(f"{cls.__name__}.{name}", attribute))
+    return cls
+
+
+def _timed_method(label: str, method: Callable) -> Callable:
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return method(*args, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            REGISTRY.increment('viaticos_method_errors_total', method=label)
+            raise
+        finally:
+            REGISTRY.observe('viaticos_method_seconds', time.perf_counter() - start, method=label)
+
+    return wrapper
+
+
+# --- Database requests ----------------------------------------------------
+
+class InstrumentedQuery:
+    """Proxy of a query builder that times execute()"""
+
+    def __init__(self, builder, table: str, action: str = 'select') -> None:
+        self._builder = builder
+        self._table = table
+        self._action = action
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._builder, name)
+        if not callable(attribute):
+            return attribute
+
+        action = name if name in QUERY_ACTIONS else self._action
+
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            if hasattr(result, 'execute'):
+                return InstrumentedQuery(result, self._table, action)
+            return result
+
+        return call
+
+    def execute(self):
+        start = time.perf_counter()
+        try:
+            response = self._builder.execute()
+        except Exception:
+            self._record(time.perf_counter() - start, None, failed=True)
+            raise
+
+        self._record(time.perf_counter() - start, getattr(response, 'data', None))
+        return response
+
+    def _record(self, seconds: float, data, failed: bool = False) -> None:
+        labels = {'table': self._table, 'action': self._action}
+        REGISTRY.observe('viaticos_db_request_seconds', seconds, **labels)
+        rows = data if isinstance(data, list) else ([] if data is None else [data])
+        level = max(OPERATION_LOG_LEVEL, logging.WARNING) if failed else OPERATION_LOG_LEVEL
+        if logger.isEnabledFor(level):
+            logger.log(level, f"{self._table}.{self._action} {'failed' if failed else 'done'}", extra={
+                'operation': f"{self._table}.{self._action}",
+                'latency_ms': round(seconds * 1000, 3),
+                'rows': None if failed else len(rows),
+            })
+        if failed:
+            REGISTRY.increment('viaticos_db_request_errors_total', **labels)
+            return
+        REGISTRY.observe('viaticos_db_request_rows', len(rows), **labels)
+        REGISTRY.observe('viaticos_db_request_bytes', _payload_bytes(rows), **labels)
+
+
+def _payload_bytes(rows: List) -> float:
+    """JSON size of the rows, extrapolated from a few evenly spaced rows"""
+    if not rows:
+        return 2.0
+    sample = rows[::-(-len(rows) // PAYLOAD_SAMPLE_ROWS)]
+    return len(json.dumps(sample, default=str)) * len(rows) / len(sample)
+
+
+class InstrumentedClient:
+    """Storage client whose table queries are measured while metrics are enabled"""
+
+    def __init__(self, client) -> None:
+        self.wrapped = client
+
+    def table(self, name: str):
+        builder = self.wrapped.table(name)
+        if not _enabled:
+            return builder
+        return InstrumentedQuery(builder, name)
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
+
+
+def instrument_client(client) -> InstrumentedClient:
+    """Wrap a storage client (Supabase or local) so its requests are measured"""
+    if isinstance(client, InstrumentedClient):
+        return client
+    return InstrumentedClient(client)
+
+
+# --- Export endpoint ----------------------------------------------------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') == '/metrics':
+            body, content_type = get_prometheus_text(), 'text/plain; version=0.0.4; charset=utf-8'
+        elif self.path.rstrip('/') == '/metrics.json':
+            body, content_type = get_metrics_json(), 'application/json; charset=utf-8'
+        else:
+            self.send_error(404)
+            return
+
+        payload = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(f"metrics endpoint: {format % args}")
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    """
+    Serve /metrics and /metrics.json from a daemon thread (once per process)
+
+    Args:
+        port: Port to listen on; defaults to METRICS_PORT (no server when unset)
+        host: Interface to bind; defaults to METRICS_HOST or 127.0.0.1 (the endpoint has no authentication)
+
+    Returns:
+        The running server, or None when no port is configured or it could not be bound
+    """
+    global _server
+    if port is None:
+        port_value = os.getenv(METRICS_PORT_ENV)
+        if not port_value:
+            return None
+        port = int(port_value)
+    host = host or os.getenv(METRICS_HOST_ENV) or DEFAULT_METRICS_HOST
+
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                logger.warning(f"Could not start metrics endpoint on port {port}: {str(e)}")
+                return None
+            threading.Thread(target=_server.serve_forever, name='metrics-endpoint', daemon=True).start()
+            logger.info(f"Metrics endpoint listening on {host}:{port}")
+        return _server
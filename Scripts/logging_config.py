@@ -0,0 +1,124 @@
+"""
+Logging configuration module
+Non-blocking logging for the app process: records are handed to a queue and written by a
+background listener to a size-rotated file of JSON lines (plus a plain console stream)
+"""
+
+import os
+import json
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+from typing import Optional
+
+DEFAULT_LOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'logs', 'viaticos.log')
+
+# Size-based rotation: LOG_MAX_BYTES per file, LOG_BACKUP_COUNT rotated files kept
+DEFAULT_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Structured fields taken from `extra={...}` when present
+STRUCTURED_FIELDS = ('operation', 'latency_ms', 'rows', 'session_id')
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the structured fields of the record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class SessionContextFilter(logging.Filter):
+    """Stamp records with the Streamlit session id of the thread that logs them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, 'session_id', None) is None:
+            try:
+                from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+                ctx = get_script_run_ctx(suppress_warning=True)
+                record.session_id = ctx.session_id if ctx is not None else None
+            except Exception:
+                record.session_id = None
+        return True
+
+
+def configure_logging(level: Optional[str] = None, log_path: Optional[str] = None) -> None:
+    """
+    Route the root logger through a queue to a rotating JSON file and the console (once per process)
+
+    Args:
+        level: Root level name; defaults to LOG_LEVEL or INFO
+        log_path: Log file; defaults to LOG_PATH or logs/viaticos.log at the project root
+                  (an empty LOG_PATH logs to the console only)
+    """
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        handlers = []
+
+        console = logging.StreamHandler()
+        console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+        handlers.append(console)
+
+        path = log_path if log_path is not None else os.getenv('LOG_PATH', DEFAULT_LOG_PATH)
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                file_handler = logging.handlers.RotatingFileHandler(
+                    path,
+                    maxBytes=int(os.getenv('LOG_MAX_BYTES', DEFAULT_LOG_MAX_BYTES)),
+                    backupCount=int(os.getenv('LOG_BACKUP_COUNT', DEFAULT_LOG_BACKUP_COUNT)),
+                    encoding='utf-8',
+                )
+                file_handler.setFormatter(JsonFormatter())
+                handlers.append(file_handler)
+            except OSError as e:
+                console.handle(logging.makeLogRecord({
+                    'name': __name__, 'levelno': logging.WARNING, 'levelname': 'WARNING',
+                    'msg': f"Could not open log file {path}, logging to the console only: {str(e)}",
+                }))
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.addFilter(SessionContextFilter())
+
+        root = logging.getLogger()
+        root.setLevel((level or os.getenv('LOG_LEVEL', 'INFO')).upper())
+        for handler in list(root.handlers):
+            if isinstance(handler, logging.handlers.QueueHandler):
+                root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_stop_listener)
+
+
+def _stop_listener() -> None:
+    """Flush the records still queued (at interpreter exit)"""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
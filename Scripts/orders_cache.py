@@ -0,0 +1,272 @@
+"""
+Orders cache module
+Data version tracking and write-through updates for the orders DataFrame kept in session state
+"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+import streamlit as st
+from orders_schema import orders_records_to_df
+from deadline_index import DeadlineIndex
+from instrumentation import track_dataframe
+
+DATA_VERSION_ATTR = 'data_version'
+
+# Wrapping sum of the row hashes behind the data version, kept so that single-row writes
+# can update the version without hashing the whole frame again
+ROW_HASH_SUM_ATTR = 'row_hash_sum'
+ROW_HASH_MODULUS = 2 ** 64
+
+
+def _row_hashes(df: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _few_row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Row hashes of a few rows, without hashing the unused categories of categorical columns"""
+    categorical = [col for col, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    if categorical:
+        # Categoricals hash by value, so dropping unused categories leaves the hashes unchanged
+        df = df.assign(**{col: df[col].cat.remove_unused_categories() for col in categorical})
+    return _row_hashes(df)
+
+
+def _hash_sum(row_hashes: np.ndarray) -> int:
+    # uint64 sums wrap around, i.e. they are taken modulo ROW_HASH_MODULUS
+    return int(row_hashes.sum(dtype=np.uint64))
+
+
+def _format_data_version(rows: int, hash_sum: int) -> str:
+    return f"{rows}-{hash_sum:016x}" if rows else "empty"
+
+
+def compute_data_version(df: pd.DataFrame) -> str:
+    """
+    Compute a content fingerprint for an orders DataFrame
+
+    Args:
+        df: Orders DataFrame
+
+    Returns:
+        String that changes whenever rows are added, removed or changed (row order is not part of it)
+    """
+    if df is None or df.empty:
+        return "empty"
+
+    return _format_data_version(len(df), _hash_sum(_row_hashes(df)))
+
+
+def _set_data_version(df: pd.DataFrame, hash_sum: int) -> pd.DataFrame:
+    df.attrs[ROW_HASH_SUM_ATTR] = hash_sum % ROW_HASH_MODULUS
+    df.attrs[DATA_VERSION_ATTR] = _format_data_version(len(df), df.attrs[ROW_HASH_SUM_ATTR])
+    track_dataframe('orders', df)
+    return df
+
+
+def stamp_data_version(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the data version of a freshly loaded frame and store it in its attrs
+
+    Args:
+        df: Orders DataFrame
+
+    Returns:
+        The same DataFrame, stamped with its data version
+    """
+    return _set_data_version(df, _hash_sum(_row_hashes(df)) if not df.empty else 0)
+
+
+def _get_row_hash_sum(df: pd.DataFrame) -> int:
+    """Row hash sum of a stamped frame, stamping it first if needed"""
+    if ROW_HASH_SUM_ATTR not in df.attrs or DATA_VERSION_ATTR not in df.attrs:
+        stamp_data_version(df)
+    return df.attrs[ROW_HASH_SUM_ATTR]
+
+
+def get_data_version(df: pd.DataFrame) -> str:
+    """
+    Get the data version of the orders DataFrame, computing it on first use
+
+    Args:
+        df: Orders DataFrame (the one stored in st.session_state.excel_data)
+
+    Returns:
+        Data version string, identical across sessions holding the same data
+    """
+    if df is None:
+        return "none"
+
+    version = df.attrs.get(DATA_VERSION_ATTR)
+    if version is None:
+        version = stamp_data_version(df).attrs[DATA_VERSION_ATTR]
+    return version
+
+
+def _align_row_to_frame(row_df: pd.DataFrame, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Give a typed one-row frame the exact columns and dtypes of the cached frame
+
+    Args:
+        row_df: Typed DataFrame with the new row
+        df: Cached orders DataFrame
+
+    Returns:
+        Tuple of (cached frame with any new categories added, aligned row frame)
+    """
+    row_df = row_df.reindex(columns=df.columns)
+
+    for col in df.columns:
+        dtype = df[col].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            new_values = row_df[col].dropna()
+            missing = [value for value in new_values.unique() if value not in dtype.categories]
+            if missing:
+                df[col] = df[col].cat.add_categories(missing)
+                dtype = df[col].dtype
+        try:
+            row_df[col] = row_df[col].astype(dtype)
+        except (ValueError, TypeError):
+            continue
+
+    return df, row_df
+
+
+def upsert_order(df: pd.DataFrame, row_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Insert or replace one order in an orders DataFrame without reloading the table
+    The data version is updated from the hashes of the old and new row only
+
+    Args:
+        df: Cached orders DataFrame (newest orders first)
+        row_df: Typed one-row DataFrame built with orders_records_to_df
+
+    Returns:
+        The same DataFrame with the order replaced in place, or a new one with the order prepended
+    """
+    if df is None or df.empty:
+        return stamp_data_version(row_df)
+
+    hash_sum = _get_row_hash_sum(df)
+    df, row_df = _align_row_to_frame(row_df, df)
+    new_hash = _hash_sum(_few_row_hashes(row_df))
+    matches = (df['Número de Orden'] == row_df['Número de Orden'].iloc[0]).fillna(False).to_numpy().nonzero()[0]
+
+    if len(matches):
+        position = matches[0]
+        old_hash = _hash_sum(_few_row_hashes(df.iloc[[position]]))
+        for col_position, col in enumerate(df.columns):
+            df.iloc[position, col_position] = row_df[col].iloc[0]
+        return _set_data_version(df, hash_sum - old_hash + new_hash)
+
+    updated = pd.concat([row_df, df], ignore_index=True)
+    return _set_data_version(updated, hash_sum + new_hash)
+
+
+def merge_orders(df: pd.DataFrame, rows_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Apply a batch of inserted or updated orders to an orders DataFrame
+
+    Args:
+        df: Cached orders DataFrame (newest orders first)
+        rows_df: Typed DataFrame with the changed orders, newest first
+
+    Returns:
+        New DataFrame with known orders replaced in place and new orders prepended
+    """
+    if rows_df.empty:
+        return df
+    if df is None or df.empty:
+        return stamp_data_version(rows_df.reset_index(drop=True))
+
+    df, rows_df = _align_row_to_frame(rows_df, df)
+    positions = pd.Index(df['Número de Orden']).get_indexer(rows_df['Número de Orden'])
+    existing = positions >= 0
+
+    updated = df.copy()
+    if existing.any():
+        for col in updated.columns:
+            values = updated[col].copy()
+            values.iloc[positions[existing]] = rows_df.loc[existing, col].to_numpy()
+            updated[col] = values
+
+    updated = pd.concat([rows_df[~existing], updated], ignore_index=True)
+    return stamp_data_version(updated)
+
+
+def delete_order(df: pd.DataFrame, numero_orden: int) -> pd.DataFrame:
+    """
+    Remove one order from an orders DataFrame without reloading the table
+
+    Args:
+        df: Cached orders DataFrame
+        numero_orden: Number of the order to remove
+
+    Returns:
+        New DataFrame without the order (its data version is updated without rehashing)
+    """
+    if df is None or df.empty:
+        return df
+
+    keep = (df['Número de Orden'] != numero_orden).fillna(True).to_numpy()
+    if keep.all():
+        return df
+
+    hash_sum = _get_row_hash_sum(df) - _hash_sum(_few_row_hashes(df[~keep]))
+    return _set_data_version(df[keep].reset_index(drop=True), hash_sum)
+
+
+def get_deadline_index(df: pd.DataFrame) -> DeadlineIndex:
+    """
+    Get the deadline index of the session orders DataFrame, rebuilding it only when the data version changes
+
+    Args:
+        df: Orders DataFrame (the one stored in st.session_state.excel_data)
+
+    Returns:
+        DeadlineIndex matching the DataFrame
+    """
+    version = get_data_version(df)
+    index = st.session_state.get('deadline_index')
+
+    if index is None or index.data_version != version:
+        index = DeadlineIndex.from_orders(df)
+        index.data_version = version
+        st.session_state.deadline_index = index
+
+    return index
+
+
+def _current_deadline_index() -> Optional[DeadlineIndex]:
+    """Session deadline index if it still matches the session orders DataFrame, else None"""
+    index = st.session_state.get('deadline_index')
+    if index is not None and index.data_version == get_data_version(st.session_state.excel_data):
+        return index
+    return None
+
+
+def upsert_order_row(order: Dict) -> None:
+    """Write-through: apply an inserted or updated order to the session orders cache and deadline index"""
+    if st.session_state.get('excel_data') is None:
+        return
+
+    row_df = orders_records_to_df([order])
+    index = _current_deadline_index()
+    st.session_state.excel_data = upsert_order(st.session_state.excel_data, row_df)
+
+    if index is not None:
+        index.update_orders(row_df)
+        index.data_version = get_data_version(st.session_state.excel_data)
+
+
+def delete_order_row(numero_orden: int) -> None:
+    """Write-through: remove a deleted order from the session orders cache and deadline index"""
+    if st.session_state.get('excel_data') is None:
+        return
+
+    index = _current_deadline_index()
+    st.session_state.excel_data = delete_order(st.session_state.excel_data, numero_orden)
+
+    if index is not None:
+        index.remove(numero_orden)
+        index.data_version = get_data_version(st.session_state.excel_data)
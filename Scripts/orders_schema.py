@@ -0,0 +1,147 @@
+"""
+Orders schema module
+Column names and compact dtypes for the orders DataFrame kept in session state
+"""
+
+import pandas as pd
+from utils import parse_date_series
+
+# Database columns mapped to the original Excel column names
+ORDERS_COLUMN_MAPPING = {
+    'numero_orden': 'Número de Orden',
+    'sede': 'Sede',
+    'fecha_elaboracion': 'Fecha de Elaboración',
+    'fecha_memorando': 'Fecha Memorando',
+    'radicado_memorando': 'Radicado del Memorando',
+    'rec': 'REC',
+    'id_rubro': 'ID del Rubro',
+    'fecha_inicial': 'Fecha Inicial',
+    'fecha_final': 'Fecha Final',
+    'numero_dias': 'Número de Días',
+    'valor_viaticos_diario': 'Valor Viáticos Diario',
+    'valor_viaticos_orden': 'Valor Viáticos Orden',
+    'valor_gastos_orden': 'Valor Gastos Orden',
+    'numero_identificacion': 'Número de Identificación',
+    'primer_nombre': 'Primer Nombre',
+    'otros_nombres': 'Otros Nombres',
+    'primer_apellido': 'Primer Apellido',
+    'segundo_apellido': 'Segundo Apellido',
+    'fecha_reintegro': 'Fecha Reintegro',
+    'fecha_limite_legalizacion': 'Fecha Límite Legalización',
+    'plazo_restante_legalizacion': 'Plazo Restante Legalización',
+    'alerta': 'Alerta',
+    'fecha_legalizacion': 'Fecha Legalización',
+    'estado_legalizacion': 'Estado Legalización',
+    'numero_legalizacion': 'Número Legalización',
+    'dias_legalizados': 'Dias Legalizados',
+    'valor_viaticos_legalizado': 'Valor Viaticos Legalizado',
+    'valor_gastos_legalizado': 'Valor Gastos Legalizado',
+    'valor_orden_legalizado': 'Valor Orden Legalizado'
+}
+
+# Original Excel column names mapped back to database columns
+REVERSE_COLUMN_MAPPING = {excel: db for db, excel in ORDERS_COLUMN_MAPPING.items()}
+
+METADATA_COLUMNS = ['id', 'created_at', 'updated_at']
+
+DATE_COLUMNS = [
+    'Fecha de Elaboración', 'Fecha Memorando', 'Fecha Inicial', 'Fecha Final',
+    'Fecha Reintegro', 'Fecha Límite Legalización', 'Fecha Legalización'
+]
+
+# Low-cardinality columns stored as categoricals
+CATEGORY_COLUMNS = ['Sede', 'REC', 'Alerta', 'Estado Legalización']
+
+# Nullable integer columns, sized to their value ranges
+INTEGER_COLUMNS = {
+    'Número de Orden': 'Int32',
+    'Número de Días': 'Int16',
+    'Número de Identificación': 'Int64',
+    'Plazo Restante Legalización': 'Int16',
+    'Número Legalización': 'Int32',
+    'Dias Legalizados': 'Int16'
+}
+
+# Currency columns keep float64 precision so cents survive values in the hundreds of millions
+FLOAT_COLUMNS = {
+    'Valor Viáticos Diario': 'float64',
+    'Valor Viáticos Orden': 'float64',
+    'Valor Gastos Orden': 'float64',
+    'Valor Viaticos Legalizado': 'Float64',
+    'Valor Gastos Legalizado': 'Float64',
+    'Valor Orden Legalizado': 'Float64'
+}
+
+
+def apply_orders_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert an orders DataFrame (Excel column names) to its compact typed representation
+
+    Args:
+        df: DataFrame with orders using the original Excel column names
+
+    Returns:
+        DataFrame with datetime64 dates, categorical labels and sized numeric columns
+    """
+    typed = df.copy()
+
+    for col in DATE_COLUMNS:
+        if col in typed.columns:
+            # Fixed resolution so frames from any source (Supabase, snapshot) hash identically
+            typed[col] = parse_date_series(typed[col]).astype('datetime64[ns]')
+
+    for col in CATEGORY_COLUMNS:
+        if col in typed.columns:
+            values = typed[col]
+            if col == 'REC':
+                values = pd.to_numeric(values, errors='coerce').astype('Int32')
+            else:
+                values = values.replace('', None)
+            typed[col] = values.astype('category')
+
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in typed.columns:
+            values = pd.to_numeric(typed[col], errors='coerce')
+            # Values with decimals cannot be stored in integer columns
+            typed[col] = values.round().astype(dtype)
+
+    for col, dtype in FLOAT_COLUMNS.items():
+        if col in typed.columns:
+            typed[col] = pd.to_numeric(typed[col], errors='coerce').astype(dtype)
+
+    return typed
+
+
+def orders_records_to_df(records) -> pd.DataFrame:
+    """
+    Build the typed orders DataFrame from database rows
+
+    Args:
+        records: List of order dictionaries as returned by Supabase
+
+    Returns:
+        Typed DataFrame with the original Excel column names and without metadata columns
+    """
+    df = pd.DataFrame(records)
+    df = df.rename(columns=ORDERS_COLUMN_MAPPING)
+    df = df.drop(columns=[col for col in METADATA_COLUMNS if col in df.columns], errors='ignore')
+    return apply_orders_schema(df)
+
+
+def format_orders_for_display(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Display adapter: format the typed date columns in Colombian format (DD/MM/YYYY)
+
+    Args:
+        df: Typed orders DataFrame (or a slice of it)
+
+    Returns:
+        Copy of the DataFrame with date columns as strings, ready to render or export
+    """
+    display_df = df.copy()
+
+    for col in DATE_COLUMNS:
+        if col in display_df.columns and pd.api.types.is_datetime64_any_dtype(display_df[col]):
+            display_df[col] = display_df[col].dt.strftime('%d/%m/%Y').fillna('')
+
+    return display_df
@@ -0,0 +1,107 @@
+"""
+Orders snapshot module
+On-disk Parquet copy of the typed orders DataFrame with its sync watermark, for warm restarts
+"""
+
+import os
+import logging
+import tempfile
+from typing import Optional, Tuple
+import pandas as pd
+from orders_schema import apply_orders_schema
+
+logger = logging.getLogger(__name__)
+
+# Set ORDERS_SNAPSHOT_PATH to an empty string to disable the snapshot
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'orders_snapshot.parquet')
+
+WATERMARK_METADATA_KEY = b'orders_sync_watermark'
+
+
+def get_snapshot_path() -> Optional[str]:
+    """Snapshot file path, or None when snapshots are disabled"""
+    path = os.getenv('ORDERS_SNAPSHOT_PATH', DEFAULT_SNAPSHOT_PATH)
+    return path or None
+
+
+def load_orders_snapshot() -> Optional[Tuple[pd.DataFrame, str]]:
+    """
+    Read the orders snapshot (memory-mapped) written by a previous run
+
+    Returns:
+        Tuple of (typed orders DataFrame, sync watermark) or None if there is no usable snapshot
+    """
+    path = get_snapshot_path()
+    if path is None or not os.path.exists(path):
+        return None
+
+    try:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(path, memory_map=True)
+        watermark = (table.schema.metadata or {}).get(WATERMARK_METADATA_KEY)
+        if not watermark:
+            return None
+
+        # Parquet does not keep every pandas dtype (e.g. categorical REC), so re-apply the schema
+        return apply_orders_schema(table.to_pandas()), watermark.decode('utf-8')
+
+    except Exception as e:
+        logger.warning(f"Could not read orders snapshot {path}: {str(e)}")
+        return None
+
+
+def save_orders_snapshot(df: pd.DataFrame, watermark: Optional[str]) -> None:
+    """
+    Write the orders snapshot atomically (readers never see a partial file)
+
+    Args:
+        df: Typed orders DataFrame
+        watermark: Largest updated_at of the rows the DataFrame reflects
+    """
+    path = get_snapshot_path()
+    if path is None or not watermark or df is None:
+        return
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[WATERMARK_METADATA_KEY] = watermark.encode('utf-8')
+        table = table.replace_schema_metadata(metadata)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Sessions are threads of one process, so each write needs its own temp file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=os.path.basename(path) + '.', suffix='.tmp')
+        os.close(fd)
+        try:
+            pq.write_table(table, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    except Exception as e:
+        logger.warning(f"Could not write orders snapshot {path}: {str(e)}")
+
+
+def get_sync_watermark(records) -> Optional[str]:
+    """
+    Largest updated_at (or created_at) among database rows
+
+    Args:
+        records: List of order dictionaries as returned by Supabase
+
+    Returns:
+        ISO timestamp string, or None if no row carries a timestamp
+    """
+    timestamps = [
+        record.get('updated_at') or record.get('created_at')
+        for record in records
+        if record.get('updated_at') or record.get('created_at')
+    ]
+    if not timestamps:
+        return None
+    return max(pd.to_datetime(timestamps, format='ISO8601')).isoformat()
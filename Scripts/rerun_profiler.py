@@ -0,0 +1,235 @@
+"""
+Rerun profiler module
+Opt-in sampling profiler for the next N reruns of the app script in the session that armed it.
+Each profiled rerun is saved under the name of the tab it rendered, as a table of top cumulative functions (JSON) and as
+collapsed stacks that flamegraph.pl and speedscope read directly
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, MutableMapping, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'profiles')
+
+# Interval between stack samples of the profiled rerun
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Functions kept in the top cumulative table
+TOP_FUNCTIONS = 40
+
+# Profiles kept on disk; the oldest are deleted beyond this
+MAX_SAVED_PROFILES = 200
+
+# Session state key holding the reruns still to be profiled in that session
+ARMED_RERUNS_KEY = 'profiler_armed_reruns'
+
+_current = threading.local()
+
+
+def get_profiles_dir() -> str:
+    """Directory the profiles are saved to (RERUN_PROFILES_PATH overrides the default)"""
+    return os.getenv('RERUN_PROFILES_PATH') or DEFAULT_PROFILES_DIR
+
+
+def arm_profiler(session_state: MutableMapping, reruns: int) -> None:
+    """
+    Profile the next `reruns` reruns of one session (0 disarms)
+
+    Args:
+        session_state: State of the session to profile (st.session_state); other sessions are never profiled
+        reruns: Number of reruns
+    """
+    session_state[ARMED_RERUNS_KEY] = max(0, int(reruns))
+
+
+def armed_reruns(session_state: MutableMapping) -> int:
+    """Reruns of the session still to be profiled"""
+    return session_state.get(ARMED_RERUNS_KEY, 0)
+
+
+def _take_armed_rerun(session_state: MutableMapping) -> bool:
+    # Reruns of one session run one after the other, so the counter needs no lock
+    remaining = armed_reruns(session_state)
+    if remaining <= 0:
+        return False
+    session_state[ARMED_RERUNS_KEY] = remaining - 1
+    return True
+
+
+def set_rerun_tab(tab: Optional[str]) -> None:
+    """Name the tab rendered by the current rerun, used to file its profile"""
+    profile = getattr(_current, 'profile', None)
+    if profile is not None:
+        profile.tab = tab
+
+
+class StackSampler:
+    """Samples the stack of one thread from a background thread"""
+
+    def __init__(self, thread_id: int, root_code, interval: float = SAMPLE_INTERVAL_SECONDS) -> None:
+        self.thread_id = thread_id
+        self.root_code = root_code
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.tab: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rerun-profiler', daemon=True)
+
+    def start(self) -> None:
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            # Walk up to the profiled call only, leaving out the Streamlit script runner
+            while frame is not None and frame.f_code is not self.root_code:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> str:
+        """Samples in the collapsed stack format: 'root;child;leaf count' per line"""
+        return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[Dict]:
+        """Functions by cumulative (inclusive) time, estimated from the share of samples"""
+        total = sum(self.stacks.values())
+        if not total:
+            return []
+
+        seconds_per_sample = self.duration / total
+        cumulative, own = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            for function in set(stack):
+                cumulative[function] += count
+            own[stack[-1]] += count
+
+        return [
+            {
+                'function': function,
+                'cumulative_s': count * seconds_per_sample,
+                'own_s': own[function] * seconds_per_sample,
+                'cumulative_share': count / total,
+            }
+            for function, count in cumulative.most_common(limit)
+        ]
+
+
+def _slug(text: str) -> str:
+    return re.sub(r'[^0-9A-Za-zÁÉÍÓÚÑáéíóúñ]+', '_', text).strip('_') or 'sin_pestana'
+
+
+def save_profile(sampler: StackSampler, user: Optional[str] = None) -> Optional[str]:
+    """
+    Write the profile of one rerun to <profiles dir>/<tab>/<timestamp>.json and .collapsed
+
+    Returns:
+        Base path of the written files (without extension), or None if they could not be written
+    """
+    tab = sampler.tab or 'Inicio de sesión'
+    directory = os.path.join(get_profiles_dir(), _slug(tab))
+    base = os.path.join(directory, sampler.started_at.strftime('%Y%m%d_%H%M%S_%f'))
+
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(f"{base}.collapsed", 'w', encoding='utf-8') as f:
+            f.write(sampler.collapsed())
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'tab': tab,
+                'user': user,
+                'started_at': sampler.started_at.isoformat(timespec='milliseconds'),
+                'duration_s': sampler.duration,
+                'samples': sum(sampler.stacks.values()),
+                'sample_interval_s': sampler.interval,
+                'top_functions': sampler.top_functions(),
+            }, f, indent=2, ensure_ascii=False)
+        _prune_profiles()
+        return base
+    except OSError as e:
+        logger.warning(f"Could not save rerun profile: {str(e)}")
+        return None
+
+
+def list_profiles() -> List[Dict]:
+    """Saved profiles, newest first, with their metadata and file paths"""
+    profiles = []
+    directory = get_profiles_dir()
+    if not os.path.isdir(directory):
+        return profiles
+
+    for tab_dir in os.scandir(directory):
+        if not tab_dir.is_dir():
+            continue
+        for entry in os.scandir(tab_dir.path):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path, encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            meta['json_path'] = entry.path
+            meta['collapsed_path'] = entry.path[:-len('.json')] + '.collapsed'
+            profiles.append(meta)
+
+    return sorted(profiles, key=lambda meta: meta.get('started_at', ''), reverse=True)
+
+
+def _prune_profiles() -> None:
+    for meta in list_profiles()[MAX_SAVED_PROFILES:]:
+        for path in (meta['json_path'], meta['collapsed_path']):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _call_profiled(function: Callable[[], None]) -> None:
+    # The sampler stops walking the stack at this frame
+    function()
+
+
+def run_profiled(main: Callable[[], None], session_state: MutableMapping,
+                 user_getter: Callable[[], Optional[str]] = lambda: None) -> None:
+    """
+    Run the app script entry point, under the profiler when this session armed a rerun
+
+    Args:
+        main: Entry point of the rerun
+        session_state: State of the current session (st.session_state)
+        user_getter: Returns the user of the session, recorded with the profile
+    """
+    if not _take_armed_rerun(session_state):
+        main()
+        return
+
+    sampler = StackSampler(threading.get_ident(), _call_profiled.__code__)
+    _current.profile = sampler
+    sampler.start()
+    try:
+        # st.rerun() and st.stop() end the script with an exception; the profile is kept anyway
+        _call_profiled(main)
+    finally:
+        sampler.stop()
+        _current.profile = None
+        save_profile(sampler, user_getter())
@@ -0,0 +1,439 @@
+"""
+Storage backend module
+Table operations used by SupabaseDBManager and a local SQLite stand-in for Supabase,
+for offline development and deterministic benchmarks and load tests
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Protocol, Set, Tuple
+
+# STORAGE_BACKEND selects the backend: 'supabase' (default) or 'sqlite'
+STORAGE_BACKEND_ENV = 'STORAGE_BACKEND'
+LOCAL_STORAGE_PATH_ENV = 'LOCAL_STORAGE_PATH'
+DEFAULT_LOCAL_STORAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'local_storage.sqlite')
+
+# Unique key of each table, as in the Supabase schema (used by upsert and to reject duplicates)
+UNIQUE_KEYS = {
+    'ordenes': 'numero_orden',
+    'funcionarios': 'numero_identificacion',
+    'festivos': 'fecha',
+    'sedes': 'codigo',
+}
+
+# Columns filled by the database: created_at on insert, updated_at on insert and update
+TIMESTAMP_COLUMNS = ('created_at', 'updated_at')
+
+# Rows requested per page when reading a whole table; Supabase caps every response at
+# its max-rows setting (1000 by default), so larger reads must be paged
+PAGE_SIZE = 1000
+
+
+class StorageTable(Protocol):
+    """Query builder of one table (subset of the supabase-py builder used by the app)"""
+
+    def select(self, *columns: str, count: Optional[str] = None) -> 'StorageTable': ...
+    def insert(self, data) -> 'StorageTable': ...
+    def upsert(self, data, on_conflict: Optional[str] = None, ignore_duplicates: bool = False) -> 'StorageTable': ...
+    def update(self, data: Dict) -> 'StorageTable': ...
+    def delete(self) -> 'StorageTable': ...
+    def eq(self, column: str, value) -> 'StorageTable': ...
+    def gte(self, column: str, value) -> 'StorageTable': ...
+    def or_(self, filters: str) -> 'StorageTable': ...
+    def order(self, column: str, desc: bool = False) -> 'StorageTable': ...
+    def range(self, start: int, end: int) -> 'StorageTable': ...
+    def execute(self): ...
+
+
+class StorageClient(Protocol):
+    """Storage backend: supabase.Client or LocalStorageClient"""
+
+    def table(self, name: str) -> StorageTable: ...
+
+
+class StorageError(Exception):
+    """Error raised by the local backend, worded like the PostgREST error for the same case"""
+
+
+class LocalResponse:
+    """Result of execute(), with the rows in .data like the Supabase response"""
+
+    def __init__(self, data: List[Dict], count: Optional[int] = None) -> None:
+        self.data = data
+        self.count = len(data) if count is None else count
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+
+def _normalize_timestamp(value):
+    """Timestamps as UTC ISO strings with microseconds, as timestamptz columns return them"""
+    if not isinstance(value, str) or not value:
+        return value
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return value
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+def _parse_filter_value(value: str):
+    """Value of a PostgREST filter string, as a number when it looks like one"""
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            continue
+    return value
+
+
+class LocalQuery:
+    """
+    SQLite implementation of the Supabase query builder for one table
+
+    Rows are stored as JSON documents; filters and ordering use json_extract, and the
+    table's unique key has a unique index, so duplicates fail as they do in Postgres.
+    """
+
+    def __init__(self, client: 'LocalStorageClient', table: str) -> None:
+        self._client = client
+        self._table = table
+        self._action = 'select'
+        self._columns: Tuple[str, ...] = ('*',)
+        self._payload: Any = None
+        self._on_conflict: Optional[str] = None
+        self._ignore_duplicates = False
+        self._where: List[str] = []
+        self._params: List[Any] = []
+        self._order: List[str] = []
+        self._limit: Optional[int] = None
+        self._offset = 0
+        self._count: Optional[str] = None
+
+    @staticmethod
+    def _field(column: str) -> str:
+        return f"json_extract(data, '$.{column}')"
+
+    def _value(self, column: str, value):
+        return _normalize_timestamp(value) if column in TIMESTAMP_COLUMNS else value
+
+    # --- Builder ------------------------------------------------------------
+
+    def select(self, *columns: str, count: Optional[str] = None) -> 'LocalQuery':
+        self._columns = columns or ('*',)
+        self._count = count
+        return self
+
+    def insert(self, data) -> 'LocalQuery':
+        self._action, self._payload = 'insert', data
+        return self
+
+    def upsert(self, data, on_conflict: Optional[str] = None, ignore_duplicates: bool = False) -> 'LocalQuery':
+        self._action, self._payload = 'upsert', data
+        self._on_conflict = on_conflict
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, data: Dict) -> 'LocalQuery':
+        self._action, self._payload = 'update', data
+        return self
+
+    def delete(self) -> 'LocalQuery':
+        self._action = 'delete'
+        return self
+
+    def eq(self, column: str, value) -> 'LocalQuery':
+        self._where.append(f"{self._field(column)} = ?")
+        self._params.append(self._value(column, value))
+        return self
+
+    def gte(self, column: str, value) -> 'LocalQuery':
+        self._where.append(f"{self._field(column)} >= ?")
+        self._params.append(self._value(column, value))
+        return self
+
+    def lte(self, column: str, value) -> 'LocalQuery':
+        self._where.append(f"{self._field(column)} <= ?")
+        self._params.append(self._value(column, value))
+        return self
+
+    def or_(self, filters: str) -> 'LocalQuery':
+        """PostgREST 'column.operator.value,...' filters joined with OR (eq, neq, gte, lte, like, ilike)"""
+        operators = {'eq': '=', 'neq': '!=', 'gte': '>=', 'lte': '<=', 'like': 'LIKE', 'ilike': 'LIKE'}
+        clauses = []
+        for condition in filters.split(','):
+            column, operator, value = condition.strip().split('.', 2)
+            if operator not in operators:
+                raise StorageError(f"Unsupported filter operator: {operator}")
+            if operator in ('like', 'ilike'):
+                clauses.append(f"{self._field(column)} LIKE ?")
+                self._params.append(value.replace('*', '%'))
+            else:
+                clauses.append(f"{self._field(column)} {operators[operator]} ?")
+                self._params.append(self._value(column, _parse_filter_value(value)))
+        self._where.append('(' + ' OR '.join(clauses) + ')')
+        return self
+
+    def order(self, column: str, desc: bool = False) -> 'LocalQuery':
+        # Postgres puts NULLs last in ascending order and first in descending order
+        direction = 'DESC' if desc else 'ASC'
+        self._order.append(f"({self._field(column)} IS NULL) {direction}, {self._field(column)} {direction}")
+        return self
+
+    def limit(self, count: int) -> 'LocalQuery':
+        self._limit = count
+        return self
+
+    def range(self, start: int, end: int) -> 'LocalQuery':
+        """Rows start to end, both included, as in PostgREST"""
+        self._offset = start
+        self._limit = max(0, end - start + 1)
+        return self
+
+    # --- Execution ----------------------------------------------------------
+
+    def _project(self, row: Dict) -> Dict:
+        if '*' in self._columns:
+            return row
+        return {column: row.get(column) for column in self._columns}
+
+    def _where_sql(self) -> str:
+        return ' WHERE ' + ' AND '.join(self._where) if self._where else ''
+
+    def _select_rows(self, conn: sqlite3.Connection, paged: bool = False) -> List[Tuple[int, Dict]]:
+        sql = f'SELECT id, data FROM "{self._table}"' + self._where_sql()
+        sql += ' ORDER BY ' + ', '.join(self._order + ['id'])
+        if paged:
+            # Like PostgREST, a read never returns more than the server max-rows
+            limit = self._limit
+            if self._client.max_rows is not None:
+                limit = self._client.max_rows if limit is None else min(limit, self._client.max_rows)
+            if limit is not None or self._offset:
+                sql += f' LIMIT {-1 if limit is None else int(limit)} OFFSET {int(self._offset)}'
+        elif self._limit is not None:
+            sql += f' LIMIT {int(self._limit)}'
+        return [(row_id, json.loads(data)) for row_id, data in conn.execute(sql, self._params)]
+
+    def _count_rows(self, conn: sqlite3.Connection) -> int:
+        sql = f'SELECT COUNT(*) FROM "{self._table}"' + self._where_sql()
+        return conn.execute(sql, self._params).fetchone()[0]
+
+    def _insert_row(self, conn: sqlite3.Connection, row: Dict) -> Dict:
+        now = _utc_now()
+        row = {key: self._value(key, value) for key, value in row.items()}
+        row.setdefault('created_at', now)
+        row.setdefault('updated_at', now)
+        cursor = conn.execute(f'INSERT INTO "{self._table}" (data) VALUES (?)', (json.dumps(row, default=str),))
+        row.setdefault('id', cursor.lastrowid)
+        conn.execute(f'UPDATE "{self._table}" SET data = ? WHERE id = ?', (json.dumps(row, default=str), cursor.lastrowid))
+        return row
+
+    def _write_row(self, conn: sqlite3.Connection, row_id: int, row: Dict) -> None:
+        conn.execute(f'UPDATE "{self._table}" SET data = ? WHERE id = ?', (json.dumps(row, default=str), row_id))
+
+    def _run(self, conn: sqlite3.Connection) -> List[Dict]:
+        rows = self._payload if isinstance(self._payload, list) else [self._payload]
+
+        if self._action == 'select':
+            return [self._project(row) for _, row in self._select_rows(conn, paged=True)]
+
+        if self._action == 'insert':
+            return [self._insert_row(conn, row) for row in rows]
+
+        if self._action == 'upsert':
+            key = self._on_conflict or UNIQUE_KEYS.get(self._table, 'id')
+            result = []
+            for row in rows:
+                existing = conn.execute(
+                    f'SELECT id, data FROM "{self._table}" WHERE {self._field(key)} = ?', (row.get(key),)
+                ).fetchone()
+                if existing is None:
+                    result.append(self._insert_row(conn, row))
+                elif not self._ignore_duplicates:
+                    merged = json.loads(existing[1])
+                    merged.update({column: self._value(column, value) for column, value in row.items()})
+                    merged['updated_at'] = _normalize_timestamp(row.get('updated_at')) or _utc_now()
+                    self._write_row(conn, existing[0], merged)
+                    result.append(merged)
+            return result
+
+        if self._action == 'update':
+            result = []
+            for row_id, row in self._select_rows(conn):
+                row.update({column: self._value(column, value) for column, value in self._payload.items()})
+                row['updated_at'] = _normalize_timestamp(self._payload.get('updated_at')) or _utc_now()
+                self._write_row(conn, row_id, row)
+                result.append(row)
+            return result
+
+        if self._action == 'delete':
+            result = self._select_rows(conn)
+            conn.executemany(f'DELETE FROM "{self._table}" WHERE id = ?', [(row_id,) for row_id, _ in result])
+            return [row for _, row in result]
+
+        raise StorageError(f"Unsupported action: {self._action}")
+
+    def execute(self) -> LocalResponse:
+        self._client.record_call(self._table, self._action)
+        with self._client.transaction() as conn:
+            try:
+                data = self._run(conn)
+                count = self._count_rows(conn) if self._action == 'select' and self._count else None
+                return LocalResponse(data, count)
+            except sqlite3.IntegrityError as e:
+                key = UNIQUE_KEYS.get(self._table, 'id')
+                raise StorageError(
+                    f'duplicate key value violates unique constraint "{self._table}_{key}_key": {str(e)}'
+                ) from e
+
+
+class LocalStorageClient:
+    """Local SQLite database with the table API of the Supabase client"""
+
+    def __init__(self, path: str = ':memory:', max_rows: Optional[int] = None) -> None:
+        """
+        Args:
+            path: SQLite file, or ':memory:' for a throwaway database
+            max_rows: Cap on the rows of each read, like the Supabase max-rows setting (None: no cap)
+        """
+        self.path = path
+        self.max_rows = max_rows
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._tables = set()
+        self.call_counts: Counter = Counter()
+
+    def record_call(self, table: str, action: str) -> None:
+        """Count one request (one Supabase round trip) by table and action"""
+        with self._lock:
+            self.call_counts[(table, action)] += 1
+
+    def total_calls(self) -> int:
+        """Number of requests served so far"""
+        with self._lock:
+            return sum(self.call_counts.values())
+
+    def _ensure_table(self, name: str) -> None:
+        if name in self._tables:
+            return
+        with self._lock:
+            self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)')
+            key = UNIQUE_KEYS.get(name)
+            if key:
+                self._conn.execute(
+                    f'CREATE UNIQUE INDEX IF NOT EXISTS "{name}_{key}_key" ON "{name}" (json_extract(data, \'$.{key}\'))'
+                )
+            if name == 'ordenes':
+                for column in TIMESTAMP_COLUMNS:
+                    self._conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "ordenes_{column}_idx" ON ordenes (json_extract(data, \'$.{column}\'))'
+                    )
+            self._conn.commit()
+            self._tables.add(name)
+
+    def table(self, name: str) -> LocalQuery:
+        self._ensure_table(name)
+        return LocalQuery(self, name)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Lock the connection and commit (or roll back) the statements of one request"""
+        with self._lock:
+            try:
+                yield self._conn
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+
+def fetch_all_rows(build_query: Callable[[], StorageTable], page_size: int = PAGE_SIZE) -> List[Dict]:
+    """
+    Read every row of a query page by page with .range(), until a page comes back empty
+
+    Args:
+        build_query: Returns a new query with its filters and an ordering that is total
+                     (ending with a unique column), so pages neither overlap nor skip rows
+        page_size: Rows requested per page
+
+    Returns:
+        List of all the rows
+    """
+    rows: List[Dict] = []
+    while True:
+        # A short page may just be the server max-rows cap, so only an empty page ends the read
+        page = build_query().range(len(rows), len(rows) + page_size - 1).execute().data or []
+        if not page:
+            return rows
+        rows.extend(page)
+
+
+def fetch_order_numbers(client: StorageClient, page_size: int = PAGE_SIZE) -> Optional[Set[int]]:
+    """
+    Number of every order in the database, to find orders deleted since a snapshot
+
+    The listing is paged and checked against an exact count, so a truncated read is never
+    mistaken for deleted orders.
+
+    Args:
+        client: Storage client
+        page_size: Rows requested per page
+
+    Returns:
+        Set of numero_orden, or None when the listing is empty or shorter than the count
+        (callers must then skip pruning)
+    """
+    numbers: Set[int] = set()
+    fetched = 0
+    total: Optional[int] = None
+    while True:
+        query = client.table('ordenes').select('numero_orden', count='exact' if total is None else None)
+        response = query.order('numero_orden').range(fetched, fetched + page_size - 1).execute()
+        if total is None:
+            total = response.count
+        page = response.data or []
+        if not page:
+            break
+        fetched += len(page)
+        numbers.update(row['numero_orden'] for row in page)
+
+    if not numbers or total is None or fetched < total:
+        return None
+    return numbers
+
+
+_local_clients: Dict[str, LocalStorageClient] = {}
+_local_clients_lock = threading.Lock()
+
+
+def get_local_client(path: Optional[str] = None) -> LocalStorageClient:
+    """
+    Process-wide local client for a database file, so every session sees the same data
+
+    Args:
+        path: SQLite file (':memory:' for a throwaway database); defaults to LOCAL_STORAGE_PATH
+
+    Returns:
+        Shared LocalStorageClient
+    """
+    path = path or os.getenv(LOCAL_STORAGE_PATH_ENV) or DEFAULT_LOCAL_STORAGE_PATH
+    with _local_clients_lock:
+        if path not in _local_clients:
+            _local_clients[path] = LocalStorageClient(path)
+        return _local_clients[path]
+
+
+def get_storage_backend() -> str:
+    """Configured backend name ('supabase' or 'sqlite')"""
+    return os.getenv(STORAGE_BACKEND_ENV, 'supabase').strip().lower() or 'supabase'
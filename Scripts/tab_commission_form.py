@@ -3,7 +3,7 @@ from datetime import datetime, date
 import pandas as pd
 from utils import get_sede_options
 from data_manager import (
-    init_database_session, get_funcionario, save_commission_order
+    init_database_session, get_funcionario, save_commission_order, reload_orders
 )
 
 
@@ -21,9 +21,8 @@ def render_commission_form_tab():
     with col_refresh2:
         if st.button("🔄 Actualizar datos desde Supabase", key="refresh_commission_form", use_container_width=True):
             with st.spinner("Actualizando datos desde Supabase..."):
-                success, message = st.session_state.database_manager.refresh_data()
+                success, message = reload_orders()
                 if success:
-                    st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
                     st.success(message)
                     st.rerun()
                 else:
@@ -98,8 +97,6 @@ def render_success_message():
             keys_to_delete = [k for k in st.session_state.keys() if k.startswith('form_')]
             for key in keys_to_delete:
                 del st.session_state[key]
-            # Refresh data
-            st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
             st.rerun()
 
     st.markdown('</div>', unsafe_allow_html=True)
@@ -401,19 +398,16 @@ def process_form_submission(num_orden, sede, fecha_elaboracion, radicado, fecha_
             }
 
             # Save to Supabase
-            save_success, save_message = save_commission_order(commission_data)
+            save_success, save_message, save_result = save_commission_order(commission_data)
 
             if save_success:
-                # Get calculated fields from the saved order
-                saved_order = st.session_state.database_manager.get_order_by_number(num_orden)
-
-                # Update session state DataFrame for display purposes
-                st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
+                # Saved row (with calculated fields) comes back from the insert itself
+                # (the session orders DataFrame was already patched with it)
+                saved_order = save_result['order']
 
                 # Check if funcionario was new
                 funcionario_saved_message = ""
-                existing_funcionario = get_funcionario(num_identificacion.strip())
-                if existing_funcionario:
+                if save_result['funcionario_created']:
                     funcionario_saved_message = f"✅ Funcionario guardado en Supabase para futuras comisiones."
 
                 # Set success state
@@ -2,9 +2,37 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime
-from io import BytesIO
-from utils import format_currency
+import plotly.io as pio
+from datetime import date
+from utils import format_currency, format_currency_series, normalize_search_text, normalize_search_text_series, parse_date_series
+from orders_schema import format_orders_for_display
+from orders_cache import get_data_version, get_deadline_index
+from data_manager import ensure_orders_loaded, reload_orders
+from cache_utils import get_cache
+from download_service import render_excel_download
+from analytics_replica import get_synced_replica
+
+# Normalized full name used by the funcionario search
+SEARCH_NAME_COLUMN = 'Nombre_Busqueda'
+NAME_COLUMNS = ['Primer Nombre', 'Otros Nombres', 'Primer Apellido', 'Segundo Apellido']
+
+# Aggregated cube: group keys and the summed measure for each source column
+CUBE_KEYS = ['Año', 'Mes', 'Trimestre', 'Sede']
+CUBE_SOURCE_COLUMNS = {
+    'Total_Comision': 'Total_Comision',
+    'Total_Viaticos': 'Valor Viáticos Orden',
+    'Total_Gastos': 'Valor Gastos Orden',
+    'Total_Dias': 'Número de Días'
+}
+
+# Maximum number of rows shown in the critical orders table
+CRITICAL_ORDERS_LIMIT = 100
+
+# Serialized Plotly figures shared by all sessions, keyed by (view, chart, options)
+FIGURE_CACHE = get_cache('dashboard_figures', max_entries=64)
+
+# Cube roll-ups that also feed tables, keyed like the figures (read-only once cached)
+ROLLUP_CACHE = get_cache('dashboard_rollups', max_entries=64)
 
 def render_dashboard_tab():
     """Render the dashboard with data analytics"""
@@ -15,9 +43,8 @@ def render_dashboard_tab():
     with col_refresh2:
         if st.button("🔄 Actualizar datos desde Supabase", key="refresh_dashboard", use_container_width=True):
             with st.spinner("Actualizando datos desde Supabase..."):
-                success, message = st.session_state.database_manager.refresh_data()
+                success, message = reload_orders()
                 if success:
-                    st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
                     st.success(message)
                     st.rerun()
                 else:
@@ -25,30 +52,40 @@ def render_dashboard_tab():
 
     st.markdown("---")
 
-    if st.session_state.excel_data is None:
+    # Orders are loaded on the first visit to the dashboard, not at login
+    if ensure_orders_loaded() is None:
         render_no_data_message()
         return
 
-    df = st.session_state.excel_data.copy()
-    
-    # Process dates and prepare data
-    df_processed = process_data_for_dashboard(df)
+    # Process dates and prepare data (cached per data version, shared across sessions)
+    data_version = get_data_version(st.session_state.excel_data)
+    df_processed, notices = get_processed_data(data_version, st.session_state.excel_data)
+    render_processing_notices(notices)
     
     if df_processed is None or len(df_processed) == 0:
         st.warning("⚠️ No se pudieron procesar las fechas en los datos.")
         return
     
+    # Aggregated cube (cached per data and replica version); charts and summaries slice it
+    replica = get_synced_replica(st.session_state.database_manager.client)
+    replica_version = replica.version if replica is not None else None
+    cube = get_dashboard_cube(data_version, replica_version, df_processed, replica)
+    
     # Filters section
-    df_filtered = render_filters_section(df_processed)
+    df_filtered, cube_filtered, filter_state = render_filters_section(df_processed, cube)
+    view_key = (data_version, replica_version) + filter_state
 
     st.markdown("---")
     
     # Alert dashboard section
-    if st.session_state.excel_data is not None and 'Alerta' in st.session_state.excel_data.columns:
+    if st.session_state.excel_data is not None and 'Fecha Límite Legalización' in st.session_state.excel_data.columns:
         st.markdown('<div class="section-title">🚨 Panel de Alertas de Legalización</div>', unsafe_allow_html=True)
         
-        # Alert summary
-        alert_counts = st.session_state.excel_data['Alerta'].value_counts()
+        # Alert summary as of today, from the deadline index of pending orders
+        deadline_index = get_deadline_index(st.session_state.excel_data)
+        holidays = st.session_state.database_manager.get_holidays()
+        today = date.today()
+        alert_counts = deadline_index.alert_counts(today, holidays)
         
         col_alert1, col_alert2, col_alert3 = st.columns(3)
         
@@ -79,32 +116,33 @@ def render_dashboard_tab():
             </div>
             """, unsafe_allow_html=True)
         
-        # Show critical orders
-        critical_orders = st.session_state.excel_data[
-            st.session_state.excel_data['Alerta'].isin(['Plazo Vencido', 'Plazo Próximo'])
-        ]
+        # Show critical orders (earliest deadline first)
+        critical_count = plazo_vencido + plazo_proximo
         
-        if len(critical_orders) > 0:
-            with st.expander(f"⚠️ Órdenes que Requieren Atención ({len(critical_orders)})", expanded=False):
+        if critical_count > 0:
+            with st.expander(f"⚠️ Órdenes que Requieren Atención ({critical_count})", expanded=False):
+                critical_orders = deadline_index.critical_orders(today, holidays, limit=CRITICAL_ORDERS_LIMIT)
                 display_columns = [
                     'Número de Orden', 'Sede', 'Primer Nombre', 'Primer Apellido',
                     'Fecha Final', 'Fecha Límite Legalización', 'Plazo Restante Legalización', 'Alerta'
                 ]
                 available_columns = [col for col in display_columns if col in critical_orders.columns]
+                if critical_count > len(critical_orders):
+                    st.caption(f"Mostrando las {len(critical_orders)} órdenes más urgentes")
                 st.dataframe(
-                    critical_orders[available_columns].sort_values('Plazo Restante Legalización', na_position='last'),
+                    format_orders_for_display(critical_orders[available_columns]),
                     use_container_width=True,
                     hide_index=True
                 )
 
     # Overview metrics
-    render_overview_metrics(df_filtered)
+    render_overview_metrics(df_filtered, cube_filtered)
     
     # Charts section
-    render_charts_section(df_filtered)
+    render_charts_section(cube_filtered, view_key)
     
     # Data tables section
-    render_data_tables(df_filtered)
+    render_data_tables(df_filtered, cube_filtered, view_key)
 
 def render_no_data_message():
     """Render message when no data is available"""
@@ -126,8 +164,40 @@ def render_no_data_message():
         - 📅 Tendencias temporales
         """)
 
-def process_data_for_dashboard(df):
-    """Process data for dashboard analysis"""
+@st.cache_resource(max_entries=4, show_spinner=False)
+def get_processed_data(data_version, _df):
+    """
+    Process the orders data once per data version; widget reruns only re-filter
+    
+    The processed frame is shared by every session without copying, so callers must
+    treat it as read-only (filtering returns new frames).
+    
+    Returns:
+        Tuple of (processed DataFrame or None, tuple of (level, message) notices)
+    """
+    notices = []
+    return process_data_for_dashboard(_df, notices), tuple(notices)
+
+def render_processing_notices(notices):
+    """Show the messages produced while processing, on every rerun"""
+    for level, message in notices:
+        getattr(st, level)(message)
+
+def notify(notices, level, message):
+    """Collect a message for later display, or show it now when no list is given"""
+    if notices is None:
+        getattr(st, level)(message)
+    else:
+        notices.append((level, message))
+
+def process_data_for_dashboard(df, notices=None):
+    """
+    Process data for dashboard analysis
+    
+    Args:
+        df: Orders DataFrame
+        notices: Optional list that receives (level, message) tuples instead of showing them
+    """
     try:
         df_processed = df.copy()
         
@@ -144,39 +214,16 @@ def process_data_for_dashboard(df):
                 available_date_columns.append(col)
         
         if not available_date_columns:
-            st.warning("No se encontraron columnas de fecha válidas en los datos.")
+            notify(notices, 'warning', "No se encontraron columnas de fecha válidas en los datos.")
             return None
         
         # Use the first available date column, preferring 'Fecha de Registro'
         date_column = 'Fecha de Registro' if 'Fecha de Registro' in available_date_columns else available_date_columns[0]
         
-        st.info(f"📅 Usando columna de fecha: **{date_column}** para el análisis temporal")
+        notify(notices, 'info', f"📅 Usando columna de fecha: **{date_column}** para el análisis temporal")
         
-        # Convert date column to datetime
-        try:
-            # Try different date formats
-            date_formats = ['%d/%m/%Y %H:%M:%S', '%d/%m/%Y', '%Y-%m-%d', '%m/%d/%Y']
-            
-            for fmt in date_formats:
-                try:
-                    df_processed['Fecha_Analisis'] = pd.to_datetime(
-                        df_processed[date_column], 
-                        format=fmt, 
-                        errors='raise'
-                    )
-                    break
-                except (ValueError, TypeError):
-                    continue
-            else:
-                # If no format works, try pandas automatic parsing
-                df_processed['Fecha_Analisis'] = pd.to_datetime(
-                    df_processed[date_column], 
-                    errors='coerce',
-                    dayfirst=True  # Assume day comes first (DD/MM/YYYY)
-                )
-        except Exception as e:
-            st.error(f"Error al procesar fechas: {str(e)}")
-            return None
+        # Dates arrive as datetime64 from the typed orders frame; other inputs are parsed once
+        df_processed['Fecha_Analisis'] = parse_date_series(df_processed[date_column])
         
         # Remove rows with invalid dates
         original_len = len(df_processed)
@@ -184,11 +231,11 @@ def process_data_for_dashboard(df):
         processed_len = len(df_processed)
         
         if processed_len == 0:
-            st.warning("No se pudieron procesar ninguna fecha válida.")
+            notify(notices, 'warning', "No se pudieron procesar ninguna fecha válida.")
             return None
         
         if processed_len < original_len:
-            st.warning(f"Se procesaron {processed_len} de {original_len} registros (algunos registros tenían fechas inválidas)")
+            notify(notices, 'warning', f"Se procesaron {processed_len} de {original_len} registros (algunos registros tenían fechas inválidas)")
         
         # Extract year and month
         df_processed['Año'] = df_processed['Fecha_Analisis'].dt.year
@@ -225,21 +272,115 @@ def process_data_for_dashboard(df):
             if col in df_processed.columns:
                 df_processed[col] = pd.to_numeric(df_processed[col], errors='coerce').fillna(0)
         
+        # Precompute the normalized full name once so searches scan unique names only
+        name_columns = [col for col in NAME_COLUMNS if col in df_processed.columns]
+        if name_columns:
+            name_parts = [df_processed[col].fillna('').astype(str) for col in name_columns]
+            full_name = name_parts[0].str.cat(name_parts[1:], sep=' ')
+            df_processed[SEARCH_NAME_COLUMN] = normalize_search_text_series(full_name).astype('category')
+        
         return df_processed
         
     except Exception as e:
-        st.error(f"Error procesando datos: {str(e)}")
+        notify(notices, 'error', f"Error procesando datos: {str(e)}")
         return None
 
-def render_filters_section(df):
-    """Render filters and return filtered dataframe"""
+@st.cache_data(max_entries=4, show_spinner=False)
+def get_dashboard_cube(data_version, replica_version, _df_processed, _replica):
+    """
+    Build the aggregated cube once per data version and analytics replica version
+    
+    With a synced replica the cube is a SQL GROUP BY. It is used only when it counts the
+    same orders as the processed frame behind the row-level views (filtered table,
+    funcionarios count, detail tables), so the KPIs and the tables of a page agree;
+    otherwise the cube is aggregated in pandas.
+    """
+    if _replica is not None:
+        replica_cube = _replica.orders_cube()
+        if int(replica_cube['Cantidad_Registros'].sum()) == len(_df_processed):
+            return build_cube_from_replica(replica_cube)
+    return build_dashboard_cube(_df_processed)
+
+def build_dashboard_cube(df):
+    """
+    Pre-aggregate the processed data by year, month, quarter and sede
+    
+    Args:
+        df: Processed dashboard DataFrame
+    
+    Returns:
+        DataFrame with one row per group, record counts and value sums.
+        Means are derived from sums and counts after slicing (see aggregate_cube).
+    """
+    df = df.copy()
+    for col in CUBE_SOURCE_COLUMNS.values():
+        if col not in df.columns:
+            df[col] = 0
+    
+    cube = df.groupby(CUBE_KEYS, observed=True, dropna=False).agg(
+        Cantidad_Registros=('Número de Orden', 'count'),
+        **{measure: (col, 'sum') for measure, col in CUBE_SOURCE_COLUMNS.items()}
+    ).reset_index()
+    
+    return add_cube_period_labels(cube)
+
+def build_cube_from_replica(replica_cube):
+    """
+    Give the SQL aggregates of the analytics replica the shape of build_dashboard_cube
+    
+    Args:
+        replica_cube: DataFrame from AnalyticsReplica.orders_cube (year, month and sede groups)
+    
+    Returns:
+        Cube with the same keys, measures and labels as build_dashboard_cube
+    """
+    cube = replica_cube.copy()
+    months = pd.to_datetime(pd.DataFrame({'year': cube['Año'], 'month': cube['Mes'], 'day': 1}))
+    cube.insert(2, 'Trimestre', months.dt.to_period('Q'))
+    return add_cube_period_labels(cube)
+
+def add_cube_period_labels(cube):
+    """Period labels for display, derived once per group instead of once per order"""
+    cube['Año_Mes'] = pd.to_datetime(pd.DataFrame({'year': cube['Año'], 'month': cube['Mes'], 'day': 1})).dt.to_period('M')
+    cube['Mes_Año_Display'] = cube['Año_Mes'].dt.strftime('%b %Y')
+    cube['Trimestre_Str'] = cube['Trimestre'].astype(str)
+    
+    return cube
+
+def aggregate_cube(cube, by):
+    """
+    Roll up a cube slice to the requested keys, adding means derived from sums
+    
+    Args:
+        cube: Cube (or filtered slice of it)
+        by: List of key columns to group by
+    
+    Returns:
+        DataFrame sorted by the keys with sums, counts and means
+    """
+    measures = ['Cantidad_Registros'] + list(CUBE_SOURCE_COLUMNS.keys())
+    rolled = cube.groupby(by, observed=True)[measures].sum().reset_index()
+    
+    counts = rolled['Cantidad_Registros'].where(rolled['Cantidad_Registros'] > 0)
+    rolled['Promedio_Comision'] = (rolled['Total_Comision'] / counts).fillna(0)
+    rolled['Promedio_Viaticos'] = (rolled['Total_Viaticos'] / counts).fillna(0)
+    rolled['Promedio_Gastos'] = (rolled['Total_Gastos'] / counts).fillna(0)
+    rolled['Promedio_Dias'] = (rolled['Total_Dias'] / counts).fillna(0)
+    
+    return rolled.sort_values(by)
+
+def render_filters_section(df, cube):
+    """
+    Render filters and return the filtered dataframe, the cube slice and the filter state
+    The filter state is a hashable (years, months, sedes) tuple used in cache keys
+    """
     st.markdown('<div class="section-title">🔧 Filtros</div>', unsafe_allow_html=True)
     
     col_filter1, col_filter2, col_filter3 = st.columns(3)
     
     with col_filter1:
         # Year filter
-        available_years = sorted(df['Año'].unique())
+        available_years = sorted(cube['Año'].unique())
         selected_years = st.multiselect(
             "Filtrar por Año:",
             available_years,
@@ -254,7 +395,7 @@ def render_filters_section(df):
             5: 'Mayo', 6: 'Junio', 7: 'Julio', 8: 'Agosto',
             9: 'Septiembre', 10: 'Octubre', 11: 'Noviembre', 12: 'Diciembre'
         }
-        available_months = sorted(df['Mes'].unique())
+        available_months = sorted(cube['Mes'].unique())
         selected_months = st.multiselect(
             "Filtrar por Mes:",
             available_months,
@@ -266,7 +407,7 @@ def render_filters_section(df):
     with col_filter3:
         # Sede filter
         if 'Sede' in df.columns:
-            available_sedes = sorted(df['Sede'].dropna().unique())
+            available_sedes = sorted(cube['Sede'].dropna().unique())
             selected_sedes = st.multiselect(
                 "Filtrar por Sede:",
                 available_sedes,
@@ -276,31 +417,40 @@ def render_filters_section(df):
         else:
             selected_sedes = []
     
-    # Apply filters
-    df_filtered = df.copy()
+    # Apply the same filters to the rows and to the cube
+    df_filtered = df[build_filter_mask(df, selected_years, selected_months, selected_sedes)]
+    cube_filtered = cube[build_filter_mask(cube, selected_years, selected_months, selected_sedes)]
+    
+    # Show filter results
+    st.info(f"📊 Mostrando {int(cube_filtered['Cantidad_Registros'].sum())} registros de {len(df)} totales")
+    
+    filter_state = (tuple(sorted(selected_years)), tuple(sorted(selected_months)), tuple(sorted(selected_sedes)))
+    
+    return df_filtered, cube_filtered, filter_state
+
+def build_filter_mask(df, selected_years, selected_months, selected_sedes):
+    """Combine the year, month and sede filters into a single boolean mask"""
+    mask = pd.Series(True, index=df.index)
     
     if selected_years:
-        df_filtered = df_filtered[df_filtered['Año'].isin(selected_years)]
+        mask &= df['Año'].isin(selected_years)
     
     if selected_months:
-        df_filtered = df_filtered[df_filtered['Mes'].isin(selected_months)]
+        mask &= df['Mes'].isin(selected_months)
     
     if selected_sedes and 'Sede' in df.columns:
-        df_filtered = df_filtered[df_filtered['Sede'].isin(selected_sedes)]
+        mask &= df['Sede'].isin(selected_sedes)
     
-    # Show filter results
-    st.info(f"📊 Mostrando {len(df_filtered)} registros de {len(df)} totales")
-    
-    return df_filtered
+    return mask
 
-def render_overview_metrics(df):
+def render_overview_metrics(df, cube):
     """Render overview metrics cards"""
     st.markdown('<div class="section-title">📈 Métricas Generales</div>', unsafe_allow_html=True)
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        total_records = len(df)
+        total_records = int(cube['Cantidad_Registros'].sum())
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-value">{total_records:,}</div>
@@ -318,7 +468,7 @@ def render_overview_metrics(df):
         """, unsafe_allow_html=True)
     
     with col3:
-        total_viaticos = df['Valor Viáticos Orden'].sum() if 'Valor Viáticos Orden' in df.columns else 0
+        total_viaticos = cube['Total_Viaticos'].sum()
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-value">${format_currency(total_viaticos)}</div>
@@ -327,7 +477,8 @@ def render_overview_metrics(df):
         """, unsafe_allow_html=True)
     
     with col4:
-        avg_days = df['Número de Días'].mean() if 'Número de Días' in df.columns else 0
+        total_count = cube['Cantidad_Registros'].sum()
+        avg_days = cube['Total_Dias'].sum() / total_count if total_count else 0
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-value">{avg_days:.1f}</div>
@@ -337,106 +488,189 @@ def render_overview_metrics(df):
     
     st.markdown("<br>", unsafe_allow_html=True)
 
-def render_charts_section(df):
-    """Render charts section"""
+def get_cached_figure(view_key, chart_key, build_figure):
+    """
+    Get a chart from the shared figure cache, building and serializing it on a miss
+
+    Args:
+        view_key: (data version, replica version, years, months, sedes) of the current dashboard view
+        chart_key: Tuple identifying the chart and its options
+        build_figure: Function that builds the Plotly figure
+
+    Returns:
+        Plotly figure
+    """
+    fig_json = FIGURE_CACHE.get_or_create((view_key, chart_key), lambda: build_figure().to_json())
+    return pio.from_json(fig_json)
+
+def get_period_keys(period_type):
+    """Return the cube keys and the x-axis column for a "Mensual"/"Trimestral" period"""
+    if period_type == "Mensual":
+        return ['Año_Mes', 'Mes_Año_Display'], 'Mes_Año_Display'
+    return ['Trimestre', 'Trimestre_Str'], 'Trimestre_Str'
+
+def render_charts_section(cube, view_key):
+    """
+    Render charts section
+    Each chart is a fragment: its own widgets rerun only that chart, not the whole dashboard
+    """
     # Temporal Analysis
-    render_temporal_analysis(df)
+    render_temporal_analysis(cube, view_key)
     
     # Monthly/Quarterly Line Chart
-    render_period_line_chart(df)
+    render_period_line_chart(cube, view_key)
     
     # Monthly/Quarterly Stacked Bar Chart by Sede
-    render_period_stacked_bar_chart_by_sede(df)
+    render_period_stacked_bar_chart_by_sede(cube, view_key)
 
-def render_temporal_analysis(df):
+def get_monthly_rollup(cube):
+    """Roll up the cube by month (already sorted by period)"""
+    df_monthly_temp = aggregate_cube(cube, ['Año_Mes', 'Mes_Año_Display'])
+    return df_monthly_temp.rename(columns={'Mes_Año_Display': 'Mes_Display'})
+
+def build_monthly_registrations_figure(df_monthly_temp):
+    """Build the monthly registrations line chart"""
+    fig_monthly = px.line(
+        df_monthly_temp, 
+        x='Mes_Display', 
+        y='Cantidad_Registros',
+        title="Registros Mensuales",
+        markers=True,
+        color_discrete_sequence=["#1f77b4"]
+    )
+    fig_monthly.update_traces(
+        hovertemplate='<b>%{x}</b><br>Registros: %{y}<extra></extra>'
+    )
+    fig_monthly.update_layout(
+        height=400,
+        xaxis_title="Mes",
+        xaxis={'categoryorder': 'array', 'categoryarray': df_monthly_temp['Mes_Display'].tolist()}
+    )
+    return fig_monthly
+
+def build_monthly_values_figure(df_monthly_temp):
+    """Build the monthly commission values line chart"""
+    fig_monthly_values = px.line(
+        df_monthly_temp, 
+        x='Mes_Display', 
+        y='Total_Comision',
+        title="Valor Total Mensual de Comisiones",
+        markers=True,
+        color_discrete_sequence=["#2ca02c"]
+    )
+    fig_monthly_values.update_traces(
+        hovertemplate='<b>%{x}</b><br>Total: $%{y:,.2f}<extra></extra>'
+    )
+    fig_monthly_values.update_layout(
+        height=400,
+        xaxis_title="Mes",
+        xaxis={'categoryorder': 'array', 'categoryarray': df_monthly_temp['Mes_Display'].tolist()}
+    )
+    return fig_monthly_values
+
+@st.fragment
+def render_temporal_analysis(cube, view_key):
     """Render updated temporal analysis with proper month display"""
     st.markdown('<div class="section-title">📅 Análisis Temporal Actualizado</div>', unsafe_allow_html=True)
     
     try:
-        # Group by month for temporal analysis
-        df_monthly_temp = df.groupby(['Año_Mes', 'Mes_Año_Display']).agg({
-            'Número de Orden': 'count',
-            'Total_Comision': 'sum',
-            'Valor Viáticos Orden': 'sum',
-            'Valor Gastos Orden': 'sum'
-        }).reset_index()
-        
-        # Sort by the period to ensure proper ordering
-        df_monthly_temp = df_monthly_temp.sort_values('Año_Mes')
-        df_monthly_temp.columns = ['Año_Mes', 'Mes_Display', 'Cantidad_Registros', 'Total_Comision', 'Total_Viaticos', 'Total_Gastos']
-        
         col_temp1, col_temp2 = st.columns(2)
         
         with col_temp1:
             # Monthly registrations with proper month display
-            fig_monthly = px.line(
-                df_monthly_temp, 
-                x='Mes_Display', 
-                y='Cantidad_Registros',
-                title="Registros Mensuales",
-                markers=True,
-                color_discrete_sequence=["#1f77b4"]
-            )
-            fig_monthly.update_traces(
-                hovertemplate='<b>%{x}</b><br>Registros: %{y}<extra></extra>'
-            )
-            fig_monthly.update_layout(
-                height=400,
-                xaxis_title="Mes",
-                xaxis={'categoryorder': 'array', 'categoryarray': df_monthly_temp['Mes_Display'].tolist()}
+            fig_monthly = get_cached_figure(
+                view_key, ('monthly_registrations',),
+                lambda: build_monthly_registrations_figure(get_monthly_rollup(cube))
             )
             st.plotly_chart(fig_monthly, use_container_width=True)
             
             # Download button for monthly registrations
-            if st.button("📥 Descargar Datos Registros Mensuales", key="download_monthly_reg"):
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    df_monthly_temp[['Mes_Display', 'Cantidad_Registros']].to_excel(writer, index=False, sheet_name='Registros_Mensuales')
-                buffer.seek(0)
-                st.download_button(
-                    label="💾 Descargar Excel",
-                    data=buffer.getvalue(),
-                    file_name=f"registros_mensuales_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            render_excel_download(
+                "📥 Descargar Datos Registros Mensuales",
+                view_key + ('monthly_registrations',),
+                lambda: get_monthly_rollup(cube)[['Mes_Display', 'Cantidad_Registros']],
+                sheet_name='Registros_Mensuales',
+                file_prefix="registros_mensuales",
+                key="download_monthly_reg"
+            )
         
         with col_temp2:
             # Monthly commission values with proper month display
-            fig_monthly_values = px.line(
-                df_monthly_temp, 
-                x='Mes_Display', 
-                y='Total_Comision',
-                title="Valor Total Mensual de Comisiones",
-                markers=True,
-                color_discrete_sequence=["#2ca02c"]
-            )
-            fig_monthly_values.update_traces(
-                hovertemplate='<b>%{x}</b><br>Total: $%{y:,.2f}<extra></extra>'
-            )
-            fig_monthly_values.update_layout(
-                height=400,
-                xaxis_title="Mes",
-                xaxis={'categoryorder': 'array', 'categoryarray': df_monthly_temp['Mes_Display'].tolist()}
+            fig_monthly_values = get_cached_figure(
+                view_key, ('monthly_values',),
+                lambda: build_monthly_values_figure(get_monthly_rollup(cube))
             )
             st.plotly_chart(fig_monthly_values, use_container_width=True)
             
             # Download button for monthly values
-            if st.button("📥 Descargar Datos Valores Mensuales", key="download_monthly_val"):
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    df_monthly_temp[['Mes_Display', 'Total_Comision', 'Total_Viaticos', 'Total_Gastos']].to_excel(writer, index=False, sheet_name='Valores_Mensuales')
-                buffer.seek(0)
-                st.download_button(
-                    label="💾 Descargar Excel",
-                    data=buffer.getvalue(),
-                    file_name=f"valores_mensuales_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            render_excel_download(
+                "📥 Descargar Datos Valores Mensuales",
+                view_key + ('monthly_values',),
+                lambda: get_monthly_rollup(cube)[['Mes_Display', 'Total_Comision', 'Total_Viaticos', 'Total_Gastos']],
+                sheet_name='Valores_Mensuales',
+                file_prefix="valores_mensuales",
+                key="download_monthly_val"
+            )
         
     except Exception as e:
         st.warning(f"No se pudo generar análisis temporal: {str(e)}")
 
-def render_period_line_chart(df):
+def get_period_rollup(cube, period_type):
+    """Roll up the cube by period with the three value totals"""
+    period_keys, _ = get_period_keys(period_type)
+    return aggregate_cube(cube, period_keys)[period_keys + ['Total_Comision', 'Total_Viaticos', 'Total_Gastos']]
+
+def build_period_line_figure(df_period, period_type):
+    """Build the period line chart with commissions, viáticos and gastos"""
+    _, x_col = get_period_keys(period_type)
+    x_order = df_period[x_col].tolist()
+    
+    # Create line chart with multiple lines
+    fig_period_lines = go.Figure()
+    
+    # Add line for total commissions
+    fig_period_lines.add_trace(go.Scatter(
+        x=df_period[x_col],
+        y=df_period['Total_Comision'],
+        mode='lines+markers',
+        name='Total Comisiones',
+        line=dict(color='#1f77b4', width=3),
+        hovertemplate='<b>%{x}</b><br>Total Comisiones: $%{y:,.2f}<extra></extra>'
+    ))
+    
+    # Add line for viaticos
+    fig_period_lines.add_trace(go.Scatter(
+        x=df_period[x_col],
+        y=df_period['Total_Viaticos'],
+        mode='lines+markers',
+        name='Viáticos',
+        line=dict(color='#2ca02c', width=3),
+        hovertemplate='<b>%{x}</b><br>Viáticos: $%{y:,.2f}<extra></extra>'
+    ))
+    
+    # Add line for gastos
+    fig_period_lines.add_trace(go.Scatter(
+        x=df_period[x_col],
+        y=df_period['Total_Gastos'],
+        mode='lines+markers',
+        name='Gastos',
+        line=dict(color='#ff7f0e', width=3),
+        hovertemplate='<b>%{x}</b><br>Gastos: $%{y:,.2f}<extra></extra>'
+    ))
+    
+    period_label = "Mes" if period_type == "Mensual" else "Trimestre"
+    fig_period_lines.update_layout(
+        title=f"Evolución {period_type} de Valores",
+        xaxis_title=period_label,
+        yaxis_title="Valor (COP)",
+        height=500,
+        hovermode='x unified',
+        xaxis={'categoryorder': 'array', 'categoryarray': x_order}
+    )
+    return fig_period_lines
+
+@st.fragment
+def render_period_line_chart(cube, view_key):
     """Render period line chart with monthly/quarterly option and proper display"""
     st.markdown('<div class="section-title">📈 Tendencia Temporal - Valores</div>', unsafe_allow_html=True)
     
@@ -448,88 +682,59 @@ def render_period_line_chart(df):
     )
     
     try:
-        # Group by period
-        if period_type == "Mensual":
-            df_period = df.groupby(['Año_Mes', 'Mes_Año_Display']).agg({
-                'Total_Comision': 'sum',
-                'Valor Viáticos Orden': 'sum',
-                'Valor Gastos Orden': 'sum'
-            }).reset_index()
-            df_period = df_period.sort_values('Año_Mes')
-            x_col = 'Mes_Año_Display'
-            x_order = df_period['Mes_Año_Display'].tolist()
-        else:  # Trimestral
-            df_period = df.groupby(['Trimestre', 'Trimestre_Str']).agg({
-                'Total_Comision': 'sum',
-                'Valor Viáticos Orden': 'sum',
-                'Valor Gastos Orden': 'sum'
-            }).reset_index()
-            df_period = df_period.sort_values('Trimestre')
-            x_col = 'Trimestre_Str'
-            x_order = df_period['Trimestre_Str'].tolist()
-        
-        # Create line chart with multiple lines
-        fig_period_lines = go.Figure()
-        
-        # Add line for total commissions
-        fig_period_lines.add_trace(go.Scatter(
-            x=df_period[x_col],
-            y=df_period['Total_Comision'],
-            mode='lines+markers',
-            name='Total Comisiones',
-            line=dict(color='#1f77b4', width=3),
-            hovertemplate='<b>%{x}</b><br>Total Comisiones: $%{y:,.2f}<extra></extra>'
-        ))
-        
-        # Add line for viaticos
-        fig_period_lines.add_trace(go.Scatter(
-            x=df_period[x_col],
-            y=df_period['Valor Viáticos Orden'],
-            mode='lines+markers',
-            name='Viáticos',
-            line=dict(color='#2ca02c', width=3),
-            hovertemplate='<b>%{x}</b><br>Viáticos: $%{y:,.2f}<extra></extra>'
-        ))
-        
-        # Add line for gastos
-        fig_period_lines.add_trace(go.Scatter(
-            x=df_period[x_col],
-            y=df_period['Valor Gastos Orden'],
-            mode='lines+markers',
-            name='Gastos',
-            line=dict(color='#ff7f0e', width=3),
-            hovertemplate='<b>%{x}</b><br>Gastos: $%{y:,.2f}<extra></extra>'
-        ))
-        
-        period_label = "Mes" if period_type == "Mensual" else "Trimestre"
-        fig_period_lines.update_layout(
-            title=f"Evolución {period_type} de Valores",
-            xaxis_title=period_label,
-            yaxis_title="Valor (COP)",
-            height=500,
-            hovermode='x unified',
-            xaxis={'categoryorder': 'array', 'categoryarray': x_order}
+        fig_period_lines = get_cached_figure(
+            view_key, ('period_lines', period_type),
+            lambda: build_period_line_figure(get_period_rollup(cube, period_type), period_type)
         )
-        
         st.plotly_chart(fig_period_lines, use_container_width=True)
         
         # Download button for period line chart data
-        if st.button(f"📥 Descargar Datos Tendencia {period_type}", key=f"download_line_{period_type.lower()}"):
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                df_period.to_excel(writer, index=False, sheet_name=f'Tendencia_{period_type}')
-            buffer.seek(0)
-            st.download_button(
-                label="💾 Descargar Excel",
-                data=buffer.getvalue(),
-                file_name=f"tendencia_{period_type.lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        render_excel_download(
+            f"📥 Descargar Datos Tendencia {period_type}",
+            view_key + ('period_lines', period_type),
+            lambda: get_period_rollup(cube, period_type),
+            sheet_name=f'Tendencia_{period_type}',
+            file_prefix=f"tendencia_{period_type.lower()}",
+            key=f"download_line_{period_type.lower()}"
+        )
         
     except Exception as e:
         st.warning(f"No se pudo generar gráfico de líneas: {str(e)}")
 
-def render_period_stacked_bar_chart_by_sede(df):
+def build_period_sede_figure(df_period_sede, period_type, chart_value_type, value_column):
+    """Build the stacked bar chart of one value by period and sede"""
+    _, x_col = get_period_keys(period_type)
+    x_order = df_period_sede[x_col].unique().tolist()
+    
+    # Create stacked bar chart
+    fig_stacked_sede = px.bar(
+        df_period_sede,
+        x=x_col,
+        y=value_column,
+        color='Sede',
+        title=f"Distribución {period_type} por Sede - {chart_value_type} (Barras Apiladas)",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    
+    # Update to stacked bars
+    fig_stacked_sede.update_layout(barmode='stack')
+    
+    fig_stacked_sede.update_traces(
+        hovertemplate='<b>%{fullData.name}</b><br>%{x}<br>Valor: $%{y:,.2f}<extra></extra>'
+    )
+    
+    period_label = "Mes" if period_type == "Mensual" else "Trimestre"
+    fig_stacked_sede.update_layout(
+        height=600,
+        xaxis_title=period_label,
+        yaxis_title=f"Valor {chart_value_type} (COP)",
+        legend_title="Sede",
+        xaxis={'categoryorder': 'array', 'categoryarray': x_order}
+    )
+    return fig_stacked_sede
+
+@st.fragment
+def render_period_stacked_bar_chart_by_sede(cube, view_key):
     """Render stacked bar chart by sede and period with proper display"""
     st.markdown('<div class="section-title">📊 Análisis Temporal por Sede</div>', unsafe_allow_html=True)
     
@@ -552,75 +757,43 @@ def render_period_stacked_bar_chart_by_sede(df):
         )
     
     try:
-        # Map selection to column
+        # Map selection to cube measure
         value_column_map = {
             "Total Comisiones": "Total_Comision",
-            "Solo Viáticos": "Valor Viáticos Orden",
-            "Solo Gastos": "Valor Gastos Orden"
+            "Solo Viáticos": "Total_Viaticos",
+            "Solo Gastos": "Total_Gastos"
         }
         value_column = value_column_map[chart_value_type]
+        period_keys, x_col = get_period_keys(period_type)
+        chart_key = ('period_sede', period_type, chart_value_type)
+        
+        # Roll up the cube by period and sede only when this view is not cached yet
+        def get_period_sede_rollup():
+            return ROLLUP_CACHE.get_or_create(
+                (view_key, chart_key),
+                lambda: aggregate_cube(cube, period_keys + ['Sede'])[period_keys + ['Sede', value_column]]
+            )
         
-        # Group by period and sede
-        if period_type == "Mensual":
-            df_period_sede = df.groupby(['Año_Mes', 'Mes_Año_Display', 'Sede']).agg({
-                value_column: 'sum'
-            }).reset_index()
-            df_period_sede = df_period_sede.sort_values('Año_Mes')
-            x_col = 'Mes_Año_Display'
-            x_order = df_period_sede['Mes_Año_Display'].unique().tolist()
-        else:  # Trimestral
-            df_period_sede = df.groupby(['Trimestre', 'Trimestre_Str', 'Sede']).agg({
-                value_column: 'sum'
-            }).reset_index()
-            df_period_sede = df_period_sede.sort_values('Trimestre')
-            x_col = 'Trimestre_Str'
-            x_order = df_period_sede['Trimestre_Str'].unique().tolist()
-        
-        # Create stacked bar chart
-        fig_stacked_sede = px.bar(
-            df_period_sede,
-            x=x_col,
-            y=value_column,
-            color='Sede',
-            title=f"Distribución {period_type} por Sede - {chart_value_type} (Barras Apiladas)",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        
-        # Update to stacked bars
-        fig_stacked_sede.update_layout(barmode='stack')
-        
-        fig_stacked_sede.update_traces(
-            hovertemplate='<b>%{fullData.name}</b><br>%{x}<br>Valor: $%{y:,.2f}<extra></extra>'
-        )
-        
-        period_label = "Mes" if period_type == "Mensual" else "Trimestre"
-        fig_stacked_sede.update_layout(
-            height=600,
-            xaxis_title=period_label,
-            yaxis_title=f"Valor {chart_value_type} (COP)",
-            legend_title="Sede",
-            xaxis={'categoryorder': 'array', 'categoryarray': x_order}
+        fig_stacked_sede = get_cached_figure(
+            view_key, chart_key,
+            lambda: build_period_sede_figure(get_period_sede_rollup(), period_type, chart_value_type, value_column)
         )
-        
         st.plotly_chart(fig_stacked_sede, use_container_width=True)
         
         # Download button for stacked chart data
-        if st.button(f"📥 Descargar Datos {period_type} por Sede", key=f"download_stacked_{period_type.lower()}_{chart_value_type.lower()}"):
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                df_period_sede.to_excel(writer, index=False, sheet_name=f'Datos_{period_type}_Sede')
-            buffer.seek(0)
-            st.download_button(
-                label="💾 Descargar Excel",
-                data=buffer.getvalue(),
-                file_name=f"datos_sede_{period_type.lower()}_{chart_value_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        render_excel_download(
+            f"📥 Descargar Datos {period_type} por Sede",
+            view_key + chart_key,
+            get_period_sede_rollup,
+            sheet_name=f'Datos_{period_type}_Sede',
+            file_prefix=f"datos_sede_{period_type.lower()}_{chart_value_type.replace(' ', '_').lower()}",
+            key=f"download_stacked_{period_type.lower()}_{chart_value_type.lower()}"
+        )
         
         # Summary table for the chart
         with st.expander(f"📋 Tabla Resumen - {period_type}"):
             # Pivot table for better visualization
-            pivot_table = df_period_sede.pivot(
+            pivot_table = get_period_sede_rollup().pivot(
                 index='Sede', 
                 columns=x_col, 
                 values=value_column
@@ -629,29 +802,37 @@ def render_period_stacked_bar_chart_by_sede(df):
             # Format currency in the table
             formatted_table = pivot_table.copy()
             for col in formatted_table.columns:
-                formatted_table[col] = formatted_table[col].apply(lambda x: f"${format_currency(x)}")
+                formatted_table[col] = format_currency_series(formatted_table[col], prefix='$')
             
             st.dataframe(formatted_table, use_container_width=True)
             
             # Download button for summary table
-            if st.button(f"📥 Descargar Tabla Resumen {period_type}", key=f"download_table_{period_type.lower()}_{chart_value_type.lower()}"):
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    pivot_table.to_excel(writer, sheet_name=f'Resumen_{period_type}')
-                buffer.seek(0)
-                st.download_button(
-                    label="💾 Descargar Excel",
-                    data=buffer.getvalue(),
-                    file_name=f"tabla_resumen_{period_type.lower()}_{chart_value_type.replace(' ', '_').lower()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            render_excel_download(
+                f"📥 Descargar Tabla Resumen {period_type}",
+                view_key + ('period_sede_table', period_type, chart_value_type),
+                lambda: pivot_table,
+                sheet_name=f'Resumen_{period_type}',
+                file_prefix=f"tabla_resumen_{period_type.lower()}_{chart_value_type.replace(' ', '_').lower()}",
+                key=f"download_table_{period_type.lower()}_{chart_value_type.lower()}",
+                index=True
+            )
         
     except Exception as e:
         st.warning(f"No se pudo generar gráfico de barras apiladas: {str(e)}")
 
 
-def render_data_tables(df):
-    """Render data tables section with Excel exports"""
+def get_display_columns(df):
+    """Return the columns of the processed data that are meant to be displayed"""
+    return [
+        col for col in df.columns
+        if 'Año_Mes' not in col and 'Trimestre' not in col and 'Fecha_Analisis' not in col
+        and col != SEARCH_NAME_COLUMN
+    ]
+
+
+@st.fragment
+def render_data_tables(df, cube, view_key):
+    """Render data tables section with Excel exports (fragment: search reruns only this section)"""
     st.markdown('<div class="section-title">📋 Exploración de Datos</div>', unsafe_allow_html=True)
     
     tab1, tab2, tab3 = st.tabs(["📊 Registros Recientes", "🔍 Buscar Funcionario", "📈 Resumen por Sede"])
@@ -661,70 +842,59 @@ def render_data_tables(df):
         recent_data = df.tail(10).copy()
         if len(recent_data) > 0:
             # Remove problematic columns for display
-            display_columns = [col for col in recent_data.columns if 'Año_Mes' not in col and 'Trimestre' not in col and 'Fecha_Analisis' not in col]
-            recent_display = recent_data[display_columns]
+            display_columns = get_display_columns(recent_data)
+            recent_display = format_orders_for_display(recent_data[display_columns])
             
             # Format currency columns for display
             if 'Valor Viáticos Orden' in recent_display.columns:
-                recent_display = recent_display.copy()
-                recent_display['Valor Viáticos (Formatted)'] = recent_display['Valor Viáticos Orden'].apply(lambda x: f"${format_currency(x)}")
+                recent_display['Valor Viáticos (Formatted)'] = format_currency_series(recent_display['Valor Viáticos Orden'], prefix='$')
             
             st.dataframe(recent_display, use_container_width=True, height=400)
             
             # Download button for recent records (Excel format)
-            if st.button("📥 Descargar Registros Recientes", key="download_recent"):
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    recent_display.to_excel(writer, index=False, sheet_name='Registros_Recientes')
-                buffer.seek(0)
-                st.download_button(
-                    label="💾 Descargar Excel",
-                    data=buffer.getvalue(),
-                    file_name=f"registros_recientes_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            render_excel_download(
+                "📥 Descargar Registros Recientes",
+                view_key + ('recent_records',),
+                lambda: recent_display,
+                sheet_name='Registros_Recientes',
+                file_prefix="registros_recientes",
+                key="download_recent"
+            )
         else:
             st.info("No hay datos para mostrar")
     
     with tab2:
         st.subheader("Buscar por Funcionario")
-        if 'Primer Nombre' in df.columns and 'Primer Apellido' in df.columns:
+        if SEARCH_NAME_COLUMN in df.columns:
             search_term = st.text_input("Ingrese nombre o apellido del funcionario:", "")
+            # A term of only whitespace or non-ASCII symbols normalizes to '', which matches every name
+            search_key = normalize_search_text(search_term)
             
-            if search_term:
-                # Filter data based on search term
-                mask = (
-                    df['Primer Nombre'].str.contains(search_term, case=False, na=False) |
-                    df['Primer Apellido'].str.contains(search_term, case=False, na=False)
-                )
-                
-                if 'Otros Nombres' in df.columns:
-                    mask |= df['Otros Nombres'].str.contains(search_term, case=False, na=False)
-                
-                if 'Segundo Apellido' in df.columns:
-                    mask |= df['Segundo Apellido'].str.contains(search_term, case=False, na=False)
+            if search_key:
+                # Match against the unique normalized names, then select their rows
+                names = df[SEARCH_NAME_COLUMN]
+                name_index = names.cat.categories
+                matching_names = name_index[name_index.str.contains(search_key, regex=False)]
+                mask = names.isin(matching_names)
                 
                 filtered_df = df[mask]
                 
                 if len(filtered_df) > 0:
                     st.success(f"Se encontraron {len(filtered_df)} registros")
                     # Remove problematic columns for display
-                    display_columns = [col for col in filtered_df.columns if 'Año_Mes' not in col and 'Trimestre' not in col and 'Fecha_Analisis' not in col]
-                    search_results = filtered_df[display_columns]
+                    display_columns = get_display_columns(filtered_df)
+                    search_results = format_orders_for_display(filtered_df[display_columns])
                     st.dataframe(search_results, use_container_width=True)
                     
                     # Download button for search results (Excel format)
-                    if st.button("📥 Descargar Resultados Búsqueda", key="download_search"):
-                        buffer = BytesIO()
-                        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                            search_results.to_excel(writer, index=False, sheet_name='Resultados_Busqueda')
-                        buffer.seek(0)
-                        st.download_button(
-                            label="💾 Descargar Excel",
-                            data=buffer.getvalue(),
-                            file_name=f"busqueda_funcionario_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                        )
+                    render_excel_download(
+                        "📥 Descargar Resultados Búsqueda",
+                        view_key + ('search_results', search_key),
+                        lambda: search_results,
+                        sheet_name='Resultados_Busqueda',
+                        file_prefix="busqueda_funcionario",
+                        key="download_search"
+                    )
                 else:
                     st.warning("No se encontraron registros que coincidan con la búsqueda")
         else:
@@ -733,21 +903,17 @@ def render_data_tables(df):
     with tab3:
         st.subheader("Resumen Estadístico por Sede")
         if 'Sede' in df.columns and 'Valor Viáticos Orden' in df.columns:
-            summary_stats = df.groupby('Sede').agg({
-                'Número de Orden': 'count',
-                'Total_Comision': ['sum', 'mean'],
-                'Valor Viáticos Orden': ['sum', 'mean'],
-                'Valor Gastos Orden': ['sum', 'mean'],
-                'Número de Días': 'mean'
-            }).round(2)
-            
-            # Flatten column names
-            summary_stats.columns = [
-                'Total_Ordenes', 'Total_Comision_Sum', 'Total_Comision_Mean',
+            summary_stats = aggregate_cube(cube, ['Sede']).rename(columns={
+                'Cantidad_Registros': 'Total_Ordenes',
+                'Total_Comision': 'Total_Comision_Sum', 'Promedio_Comision': 'Total_Comision_Mean',
+                'Total_Viaticos': 'Total_Viaticos_Sum', 'Promedio_Viaticos': 'Total_Viaticos_Mean',
+                'Total_Gastos': 'Total_Gastos_Sum', 'Promedio_Gastos': 'Total_Gastos_Mean'
+            })
+            summary_stats = summary_stats[[
+                'Sede', 'Total_Ordenes', 'Total_Comision_Sum', 'Total_Comision_Mean',
                 'Total_Viaticos_Sum', 'Total_Viaticos_Mean',
                 'Total_Gastos_Sum', 'Total_Gastos_Mean', 'Promedio_Dias'
-            ]
-            summary_stats = summary_stats.reset_index()
+            ]].round(2)
             
             # Format currency columns
             currency_columns = [
@@ -757,21 +923,18 @@ def render_data_tables(df):
             ]
             
             for col in currency_columns:
-                summary_stats[f'{col}_Formatted'] = summary_stats[col].apply(lambda x: f"${format_currency(x)}")
+                summary_stats[f'{col}_Formatted'] = format_currency_series(summary_stats[col], prefix='$')
             
             st.dataframe(summary_stats, use_container_width=True)
             
             # Download button for summary by sede (Excel format)
-            if st.button("📥 Descargar Resumen por Sede", key="download_sede_summary"):
-                buffer = BytesIO()
-                with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                    summary_stats.to_excel(writer, index=False, sheet_name='Resumen_Por_Sede')
-                buffer.seek(0)
-                st.download_button(
-                    label="💾 Descargar Excel",
-                    data=buffer.getvalue(),
-                    file_name=f"resumen_por_sede_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            render_excel_download(
+                "📥 Descargar Resumen por Sede",
+                view_key + ('sede_summary',),
+                lambda: summary_stats,
+                sheet_name='Resumen_Por_Sede',
+                file_prefix="resumen_por_sede",
+                key="download_sede_summary"
+            )
         else:
             st.warning("Datos insuficientes para generar resumen por sede")
\ No newline at end of file
@@ -3,7 +3,7 @@ from datetime import datetime, date
 import pandas as pd
 from utils import get_sede_options
 from data_manager import (
-    init_database_session, search_orders, save_commission_order
+    init_database_session, search_orders, save_commission_order, reload_orders
 )
 
 
@@ -21,9 +21,8 @@ def render_edit_order_tab():
     with col_refresh2:
         if st.button("🔄 Actualizar datos desde Supabase", key="refresh_edit_order", use_container_width=True):
             with st.spinner("Actualizando datos desde Supabase..."):
-                success, message = st.session_state.database_manager.refresh_data()
+                success, message = reload_orders()
                 if success:
-                    st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
                     st.success(message)
                     st.rerun()
                 else:
@@ -83,8 +82,6 @@ def render_edit_success():
                 st.session_state.edit_selected_record = None
             if 'edit_selected_record_index' in st.session_state:
                 st.session_state.edit_selected_record_index = None
-            # Refresh data
-            st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
             st.rerun()
 
     st.markdown('</div>', unsafe_allow_html=True)
@@ -452,15 +449,15 @@ def process_edit_submission(num_orden, sede, fecha_elaboracion, radicado, fecha_
 
                 # Delete the old order and insert the updated one
                 try:
-                    db_manager.client.table('ordenes').delete().eq('numero_orden', num_orden).execute()
+                    delete_success, delete_message = db_manager.delete_order(num_orden)
+                    if not delete_success:
+                        raise Exception(delete_message)
 
                     # Save as new order (which recalculates formulated fields)
-                    save_success, save_message = save_commission_order(commission_data)
+                    # Both writes patch the session orders DataFrame, so no reload is needed
+                    save_success, save_message, _ = save_commission_order(commission_data)
 
                     if save_success:
-                        # Update session state DataFrame for display purposes
-                        st.session_state.excel_data = db_manager.get_all_orders_df()
-
                         # Set success state
                         st.session_state.edit_success_state = {
                             'show_success': True,
@@ -3,7 +3,7 @@ from datetime import datetime, date
 import pandas as pd
 from utils import format_currency
 from data_manager import (
-    init_database_session, search_orders, update_legalization
+    init_database_session, search_orders, update_legalization, reload_orders
 )
 
 
@@ -21,9 +21,8 @@ def render_additional_form_tab():
     with col_refresh2:
         if st.button("🔄 Actualizar datos desde Supabase", key="refresh_legalization_form", use_container_width=True):
             with st.spinner("Actualizando datos desde Supabase..."):
-                success, message = st.session_state.database_manager.refresh_data()
+                success, message = reload_orders()
                 if success:
-                    st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
                     st.success(message)
                     st.rerun()
                 else:
@@ -83,8 +82,6 @@ def render_legalization_success():
                 st.session_state.selected_record = None
             if 'selected_record_index' in st.session_state:
                 st.session_state.selected_record_index = None
-            # Refresh data
-            st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
             st.rerun()
 
     st.markdown('</div>', unsafe_allow_html=True)
@@ -462,14 +459,12 @@ def process_legalization_submission(record, record_order_number, num_legalizacio
                 "valor_gastos_legalizado": valor_gastos_legalizado
             }
 
-            save_success, save_message = update_legalization(
+            save_success, save_message, _ = update_legalization(
                 record_order_number, legalization_data
             )
 
             if save_success:
-                # Update local session state
-                st.session_state.excel_data = st.session_state.database_manager.get_all_orders_df()
-
+                # The session orders DataFrame was already patched with the updated row
                 # Set success state
                 st.session_state.legalization_success_state = {
                     'show_success': True,
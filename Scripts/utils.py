@@ -2,11 +2,125 @@ import streamlit as st
 import pandas as pd
 import os
 import shutil
-from datetime import datetime
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import re
 import locale
+import unicodedata
 from typing import Optional
 
+import numpy as np
+
+# Distinct date strings remembered by the date parser
+DATE_PARSE_CACHE_SIZE = 8192
+
+# Excel stores dates as days since 1899-12-30; serials in this range are read as dates
+EXCEL_EPOCH = datetime(1899, 12, 30)
+EXCEL_SERIAL_RANGE = (1, 2958465)  # 1900-01-01 .. 9999-12-31
+
+
+def _is_missing(value) -> bool:
+    """None, NaN/NaT or an empty string (scalars only)"""
+    if value is None or (isinstance(value, str) and value == ""):
+        return True
+    try:
+        return bool(pd.isna(value))
+    except (TypeError, ValueError):
+        return False
+
+
+def _parse_fixed_format(text: str, dayfirst: bool) -> Optional[datetime]:
+    """DD/MM/YYYY, YYYY-MM-DD and ISO datetimes with slicing; None for any other shape"""
+    length = len(text)
+    if length == 10 and text[2] == '/' and text[5] == '/':
+        first, second, year = text[:2], text[3:5], text[6:]
+        if first.isdigit() and second.isdigit() and year.isdigit():
+            day, month = (first, second) if dayfirst else (second, first)
+            return datetime(int(year), int(month), int(day))
+        return None
+    if length >= 10 and text[4] == '-' and text[7] == '-':
+        if length == 10:
+            return datetime.combine(date.fromisoformat(text), datetime.min.time())
+        if text[10] in 'T ':
+            return datetime.fromisoformat(text)
+    return None
+
+
+def _excel_serial_from_text(text: str) -> Optional[float]:
+    """Excel serial written as text ('45658' or '45658.5'), None for anything else"""
+    integer, _, fraction = text.partition('.')
+    if not (integer.isdigit() and (not fraction or fraction.isdigit())) or len(integer) > 7:
+        return None
+    serial = float(text)
+    return serial if EXCEL_SERIAL_RANGE[0] <= serial <= EXCEL_SERIAL_RANGE[1] else None
+
+
+def _excel_serials_to_datetime(numbers: pd.Series) -> pd.Series:
+    """Numeric Series of Excel serials as datetime64 (NaT outside the Excel date range)"""
+    numbers = numbers.where(numbers.between(*EXCEL_SERIAL_RANGE))
+    return pd.Timestamp(EXCEL_EPOCH) + pd.to_timedelta(numbers, unit='D')
+
+
+@lru_cache(maxsize=DATE_PARSE_CACHE_SIZE)
+def _parse_date_text(text: str, dayfirst: bool) -> Optional[datetime]:
+    """Parse a stripped date string (memoized); pandas only handles unusual formats"""
+    try:
+        parsed = _parse_fixed_format(text, dayfirst)
+        if parsed is not None:
+            return parsed
+    except ValueError:
+        pass  # e.g. 31/02/2025: let pandas decide, as before
+
+    serial = _excel_serial_from_text(text)
+    if serial is not None:
+        return EXCEL_EPOCH + timedelta(days=serial)
+
+    try:
+        timestamp = pd.to_datetime(text, dayfirst=dayfirst)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return None if pd.isna(timestamp) else timestamp.to_pydatetime()
+
+
+def parse_date_value(date_value, dayfirst: bool = True) -> Optional[datetime]:
+    """
+    Parse a single date value with fast paths for the formats the app stores
+
+    Strings in DD/MM/YYYY or ISO format are parsed by slicing and memoized, datetime and date
+    objects pass through, numbers in the Excel serial range are read as Excel dates, and
+    anything else falls back to pandas.
+
+    Args:
+        date_value: Date in any format (string, datetime, date, Timestamp, Excel serial...)
+        dayfirst: Read ambiguous NN/NN/YYYY strings as day first
+
+    Returns:
+        datetime (timezone-aware when the input carries an offset) or None if it cannot be parsed
+    """
+    if _is_missing(date_value):
+        return None
+
+    if isinstance(date_value, str):
+        text = date_value.strip()
+        return _parse_date_text(text, dayfirst) if text else None
+    if isinstance(date_value, pd.Timestamp):
+        return date_value.to_pydatetime()
+    if isinstance(date_value, datetime):
+        return date_value
+    if isinstance(date_value, date):
+        return datetime(date_value.year, date_value.month, date_value.day)
+    if isinstance(date_value, (int, float, np.integer, np.floating)) and not isinstance(date_value, bool):
+        if EXCEL_SERIAL_RANGE[0] <= date_value <= EXCEL_SERIAL_RANGE[1]:
+            return EXCEL_EPOCH + timedelta(days=float(date_value))
+        return None
+
+    try:
+        timestamp = pd.to_datetime(date_value, dayfirst=dayfirst)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    return None if pd.isna(timestamp) else timestamp.to_pydatetime()
+
+
 # Colombian date/time formatting functions
 def format_colombian_date(date_value) -> str:
     """
@@ -14,28 +128,20 @@ def format_colombian_date(date_value) -> str:
     Accepts: datetime objects, date objects, or date strings in various formats
     Returns: String in DD/MM/YYYY format
     """
-    if pd.isna(date_value) or date_value == "" or date_value is None:
+    if _is_missing(date_value):
         return ""
 
-    try:
-        # If it's already a string
-        if isinstance(date_value, str):
-            # Check if it already looks like DD/MM/YYYY
-            if len(date_value) == 10 and date_value[2] == '/' and date_value[5] == '/':
-                # Already in correct format
-                return date_value.strip()
-
-            # Try to parse the string
-            date_obj = pd.to_datetime(date_value)
-        else:
-            # Convert to datetime if it's not already
-            date_obj = pd.to_datetime(date_value)
+    # Check if it already looks like DD/MM/YYYY
+    if isinstance(date_value, str) and len(date_value) == 10 and date_value[2] == '/' and date_value[5] == '/':
+        return date_value.strip()
 
-        # Return in DD/MM/YYYY format
-        return date_obj.strftime('%d/%m/%Y')
-    except (ValueError, TypeError, AttributeError):
+    date_obj = parse_date_value(date_value, dayfirst=False)
+    if date_obj is None:
         return str(date_value).strip()
 
+    # Return in DD/MM/YYYY format
+    return date_obj.strftime('%d/%m/%Y')
+
 
 def format_colombian_datetime(datetime_value) -> str:
     """
@@ -43,19 +149,15 @@ def format_colombian_datetime(datetime_value) -> str:
     Accepts: datetime objects or datetime strings
     Returns: String in DD/MM/YYYY HH:MM:SS format
     """
-    if pd.isna(datetime_value) or datetime_value == "" or datetime_value is None:
+    if _is_missing(datetime_value):
         return ""
 
-    try:
-        if isinstance(datetime_value, str):
-            datetime_obj = pd.to_datetime(datetime_value)
-        else:
-            datetime_obj = pd.to_datetime(datetime_value)
-
-        return datetime_obj.strftime('%d/%m/%Y %H:%M:%S')
-    except (ValueError, TypeError, AttributeError):
+    datetime_obj = parse_date_value(datetime_value, dayfirst=False)
+    if datetime_obj is None:
         return str(datetime_value).strip()
 
+    return datetime_obj.strftime('%d/%m/%Y %H:%M:%S')
+
 
 def get_colombian_date_now() -> str:
     """
@@ -84,15 +186,9 @@ def parse_colombian_date(date_str: str) -> Optional[str]:
     Returns:
         ISO format date string (YYYY-MM-DD) or None if cannot parse
     """
-    if pd.isna(date_str) or date_str == "" or date_str is None:
-        return None
-
-    try:
-        date_obj = pd.to_datetime(date_str, dayfirst=True)
-        # Return as ISO format for database storage
-        return date_obj.strftime('%Y-%m-%d')
-    except (ValueError, TypeError):
-        return None
+    date_obj = parse_date_value(date_str, dayfirst=True)
+    # Return as ISO format for database storage
+    return date_obj.strftime('%Y-%m-%d') if date_obj is not None else None
 
 
 def parse_date_for_database(date_value) -> Optional[str]:
@@ -106,16 +202,98 @@ def parse_date_for_database(date_value) -> Optional[str]:
     Returns:
         ISO format date string (YYYY-MM-DD) or None
     """
-    if pd.isna(date_value) or date_value == "" or date_value is None:
-        return None
+    # Parse the date with day-first preference
+    date_obj = parse_date_value(date_value, dayfirst=True)
+    # Return as ISO format for database
+    return date_obj.strftime('%Y-%m-%d') if date_obj is not None else None
+
+
+def parse_date_series(series: pd.Series) -> pd.Series:
+    """
+    Column-wise date parsing for values coming from the database or Excel
+    Handles ISO (YYYY-MM-DD) and Colombian (DD/MM/YYYY) strings, datetime values and Excel serials
+
+    Args:
+        series: Series with date values in any of the supported formats
 
+    Returns:
+        Naive datetime64 Series (NaT for empty or unparseable values); values with a UTC offset
+        keep their own wall-clock time, as parse_date_value does
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return _excel_serials_to_datetime(series.astype(float))
+
+    text = series.astype('string').str.strip()
     try:
-        # Parse the date with day-first preference
-        date_obj = pd.to_datetime(date_value, dayfirst=True)
-        # Return as ISO format for database
-        return date_obj.strftime('%Y-%m-%d')
-    except (ValueError, TypeError):
-        return None
+        parsed = pd.to_datetime(text, format='ISO8601', errors='coerce')
+    except ValueError:
+        # Mixed offsets, or offsets mixed with naive values: parse value by value
+        return pd.to_datetime(text.map(_parse_date_wall_clock, na_action='ignore').astype(object))
+    if parsed.dt.tz is not None:
+        parsed = parsed.dt.tz_localize(None)
+
+    # Values that are not ISO are parsed as Colombian dates, then with pandas inference
+    pending = parsed.isna() & text.notna() & (text != '')
+    if pending.any():
+        parsed[pending] = pd.to_datetime(text[pending], format='%d/%m/%Y', errors='coerce')
+        pending = parsed.isna() & text.notna() & (text != '')
+    if pending.any():
+        serials = _excel_serials_to_datetime(pd.to_numeric(text[pending], errors='coerce'))
+        parsed[pending] = serials
+        pending = parsed.isna() & text.notna() & (text != '')
+    if pending.any():
+        parsed[pending] = pd.to_datetime(text[pending], dayfirst=True, errors='coerce')
+
+    return parsed
+
+
+def _parse_date_wall_clock(text: str) -> Optional[datetime]:
+    parsed = parse_date_value(text, dayfirst=True)
+    return parsed.replace(tzinfo=None) if parsed is not None else None
+
+
+def format_colombian_date_series(series: pd.Series) -> pd.Series:
+    """
+    Column-wise format_colombian_date: DD/MM/YYYY strings, '' for empty values
+
+    Values that cannot be parsed are kept as their stripped text, like the scalar version.
+    ISO and DD/MM/YYYY strings, numbers and datetimes are converted column-wise; other text
+    (e.g. 1/12/2024, which the scalar version reads month first) goes through the scalar version.
+    """
+    parsed = parse_date_series(series)
+    formatted = parsed.dt.strftime('%d/%m/%Y').astype(object)
+
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        unparsed = parsed.isna() & series.notna()
+        if unparsed.any():
+            formatted[unparsed] = series[unparsed].astype(str).str.strip()
+
+        is_text = series.map(lambda value: isinstance(value, str)).to_numpy(dtype=bool)
+        if is_text.any():
+            text = series[is_text].astype(str)
+            stripped = text.str.strip()
+            column_wise = (
+                stripped.str.match(r'\d{4}-\d{2}-\d{2}')
+                | (text.str.len().eq(10) & text.str[2].eq('/') & text.str[5].eq('/'))
+                | stripped.str.fullmatch(r'\d+(?:\.\d+)?')
+                | stripped.eq('')
+            ).to_numpy(dtype=bool)
+            other = is_text.copy()
+            other[is_text] = ~column_wise
+            if other.any():
+                formatted[other] = series[other].map(format_colombian_date).to_numpy()
+
+    return formatted.where(formatted.notna(), '')
+
+
+def parse_date_for_database_series(series: pd.Series) -> pd.Series:
+    """
+    Column-wise parse_date_for_database: ISO (YYYY-MM-DD) strings, None for empty or unparseable values
+    """
+    iso = parse_date_series(series).dt.strftime('%Y-%m-%d').astype(object)
+    return iso.where(iso.notna(), None)
 
 
 def colombian_day_names():
@@ -139,17 +317,17 @@ def format_colombian_date_verbose(date_value) -> str:
     Returns:
         Verbose formatted date string in Colombian Spanish
     """
-    if pd.isna(date_value) or date_value == "" or date_value is None:
+    if _is_missing(date_value):
         return ""
 
-    try:
-        date_obj = pd.to_datetime(date_value)
-        day_name = colombian_day_names()[date_obj.weekday()]
-        month_name = colombian_month_names()[date_obj.month]
-        return f"{day_name}, {date_obj.day} de {month_name} de {date_obj.year}"
-    except (ValueError, TypeError, IndexError):
+    date_obj = parse_date_value(date_value, dayfirst=False)
+    if date_obj is None:
         return str(date_value).strip()
 
+    day_name = colombian_day_names()[date_obj.weekday()]
+    month_name = colombian_month_names()[date_obj.month]
+    return f"{day_name}, {date_obj.day} de {month_name} de {date_obj.year}"
+
 
 def format_currency(value):
     """Format currency with Colombian format: 1.234.567,89"""
@@ -170,10 +348,41 @@ def format_currency(value):
     
     return formatted
 
+_CURRENCY_SEPARATORS = str.maketrans({',': '.', '.': ','})
+
+
+def format_currency_series(values, prefix: str = "") -> pd.Series:
+    """
+    Column-wise format_currency, e.g. format_currency_series(df['Valor'], prefix='$')
+
+    Args:
+        values: Series (or array) of numbers
+        prefix: Text put before every value, such as the currency symbol
+
+    Returns:
+        Series of strings in Colombian format (1.234.567,89) with the index of the input
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    numbers = series.to_numpy(dtype=float, na_value=np.nan)
+    formatted = [
+        prefix + ("0,00" if number == 0 else f"{number:,.2f}".translate(_CURRENCY_SEPARATORS))
+        for number in numbers.tolist()
+    ]
+    return pd.Series(formatted, index=series.index, dtype=object)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
 def parse_colombian_currency(value):
     """Parse Colombian currency format to float"""
     if pd.isna(value) or value == "" or value is None:
         return 0.0
+
+    # Numbers (e.g. numeric Excel cells) are already values, not text to re-parse
+    if _is_number(value):
+        return float(value)
     
     # Convert to string and clean
     value_str = str(value).strip()
@@ -208,6 +417,70 @@ def parse_colombian_currency(value):
     except ValueError:
         return 0.0
 
+
+def parse_colombian_currency_series(values) -> pd.Series:
+    """
+    Column-wise parse_colombian_currency, with string-array operations instead of a loop
+
+    Same rules as the scalar version: currency symbols and spaces are dropped, dots are
+    thousands separators, a single comma is the decimal separator, and empty or invalid
+    values become 0.0. Numbers pass through unchanged.
+
+    Args:
+        values: Series (or array) of text and/or numbers, e.g. a column read from Excel
+
+    Returns:
+        float64 Series with the index of the input
+    """
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype('float64').fillna(0.0)
+
+    result = pd.Series(0.0, index=series.index)
+    missing = series.isna()
+    if pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+        numbers = pd.Series(False, index=series.index)
+    else:
+        numbers = series.map(_is_number) & ~missing
+        if numbers.any():
+            result[numbers] = series[numbers].astype('float64')
+
+    text_mask = ~missing & ~numbers
+    if not text_mask.any():
+        return result
+
+    text = series[text_mask].astype(str).str.strip().str.replace(r'[₡$\s]', '', regex=True)
+
+    # One comma: the integer part loses its dots and the comma becomes the decimal point
+    # (a dot after that comma leaves an invalid number, as in the scalar version)
+    # No comma or several commas: every dot and comma is a separator
+    one_comma = text.str.contains(',', regex=False) & ~text.str.contains(',.*,', regex=True)
+    invalid = one_comma & text.str.contains(r',.*\.', regex=True)
+    without_dots = text.str.replace('.', '', regex=False)
+    cleaned = without_dots.str.replace(',', '.', regex=False).where(
+        one_comma, without_dots.str.replace(',', '', regex=False))
+
+    # Plain decimals are converted in one go (numpy applies float() to each string, the same
+    # conversion as the scalar version); anything else (exponents, 'nan', invalid) one by one
+    text_values = cleaned.to_numpy(dtype=object)
+    plain = cleaned.str.fullmatch(r'[+-]?(?:\d+\.?\d*|\.\d+)').to_numpy(dtype=bool)
+    parsed = np.zeros(len(text_values), dtype='float64')
+    parsed[plain] = np.array(text_values[plain], dtype='float64')
+    others = ~plain & (cleaned != '').to_numpy(dtype=bool)
+    if others.any():
+        parsed[others] = [_float_or_zero(value) for value in text_values[others]]
+    parsed[invalid.to_numpy(dtype=bool)] = 0.0
+
+    result[text_mask] = parsed
+    return result
+
+
+def _float_or_zero(text: str) -> float:
+    try:
+        return float(text)
+    except ValueError:
+        return 0.0
+
 def parse_date_flexible(date_value):
     """
     Parse date with multiple format support and return in DD/MM/YYYY format
@@ -241,14 +514,7 @@ def parse_date_to_datetime(date_value, dayfirst: bool = True):
     Returns:
         datetime object or None if parsing fails
     """
-    if pd.isna(date_value) or date_value == "" or date_value is None:
-        return None
-
-    try:
-        # Try to parse using pandas (handles most formats)
-        return pd.to_datetime(date_value, dayfirst=dayfirst).to_pydatetime()
-    except (ValueError, TypeError):
-        return None
+    return parse_date_value(date_value, dayfirst=dayfirst)
 
 
 def parse_date_to_date(date_value, dayfirst: bool = True) -> Optional:
@@ -327,12 +593,53 @@ def safe_str(value, default: str = "") -> str:
         return default
 
 
+def normalize_search_text(value) -> str:
+    """
+    Normalize text for accent and case insensitive searches
+
+    Args:
+        value: Text to normalize (any type)
+
+    Returns:
+        Uppercase string without accents and with single spaces
+    """
+    text = safe_str(value)
+    if not text:
+        return ""
+
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return " ".join(text.upper().split())
+
+
+def normalize_search_text_series(series: pd.Series) -> pd.Series:
+    """
+    Column-wise version of normalize_search_text
+
+    Args:
+        series: Series with text values
+
+    Returns:
+        Series of normalized strings (empty string for missing values)
+    """
+    return (
+        series.fillna('').astype(str)
+        .str.normalize('NFKD')
+        .str.encode('ascii', 'ignore')
+        .str.decode('ascii')
+        .str.upper()
+        .str.split()
+        .str.join(' ')
+    )
+
+
 def calculate_days_between_dates(start_date_str, end_date_str):
     """Calculate number of days between two date strings"""
     try:
         # Parse dates
-        start_date = pd.to_datetime(start_date_str, dayfirst=True)
-        end_date = pd.to_datetime(end_date_str, dayfirst=True)
+        start_date = parse_date_to_date(start_date_str)
+        end_date = parse_date_to_date(end_date_str)
+        if start_date is None or end_date is None:
+            return 0
 
         # Calculate difference
         delta = end_date - start_date
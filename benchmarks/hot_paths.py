@@ -0,0 +1,255 @@
+"""
+Hot path benchmarks
+Times the data paths of the app on synthetic orders at several sizes, against the local
+SQLite storage backend (no Supabase project needed), and writes the results as JSON
+
+Usage:
+    python benchmarks/hot_paths.py [--sizes 1000 10000 100000 1000000] [--repeat N]
+                                   [--only NAME ...] [--max-rows-row-wise N] [--json FILE]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from datetime import datetime
+from io import BytesIO
+from typing import Callable, Dict, List, Optional
+
+# Keep the benchmark away from the on-disk snapshot and the analytics replica
+os.environ['ORDERS_SNAPSHOT_PATH'] = ''
+os.environ.pop('ANALYTICS_REPLICA_PATH', None)
+
+from synthetic_data import (  # noqa: E402  (also puts Scripts/ on sys.path)
+    generate_orders, holiday_rows, orders_to_import_frame, write_regional_workbook
+)
+
+import pandas as pd  # noqa: E402
+from storage_backend import LocalStorageClient  # noqa: E402
+from data_manager import SupabaseDBManager  # noqa: E402
+from orders_schema import orders_records_to_df  # noqa: E402
+from orders_cache import stamp_data_version  # noqa: E402
+from deadline_index import DeadlineIndex  # noqa: E402
+import tab_dashboard  # noqa: E402
+import data_migration  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+
+# Paths that go order by order through the storage backend or openpyxl; above this size
+# they are skipped unless --max-rows-row-wise is raised
+DEFAULT_MAX_ROWS_ROW_WISE = 10_000
+
+
+class BenchmarkContext:
+    """Synthetic data of one size, built once and shared by the benchmarks"""
+
+    def __init__(self, rows: int, seed: int) -> None:
+        self.rows = rows
+        self.records = generate_orders(rows, seed=seed)
+        self.holidays = holiday_rows()
+        self._orders_df: Optional[pd.DataFrame] = None
+        self._processed: Optional[pd.DataFrame] = None
+
+    def new_manager(self, seed_orders: bool = True) -> SupabaseDBManager:
+        """Manager over a fresh in-memory database with the holidays (and optionally the orders)"""
+        client = LocalStorageClient(':memory:')
+        client.table('festivos').insert(self.holidays).execute()
+        if seed_orders:
+            client.table('ordenes').insert([dict(record) for record in self.records]).execute()
+        return SupabaseDBManager(client=client)
+
+    @property
+    def orders_df(self) -> pd.DataFrame:
+        if self._orders_df is None:
+            self._orders_df = stamp_data_version(orders_records_to_df(self.records))
+        return self._orders_df
+
+    @property
+    def processed(self) -> pd.DataFrame:
+        if self._processed is None:
+            self._processed = tab_dashboard.process_data_for_dashboard(self.orders_df)
+        return self._processed
+
+
+def bench_calculate_formulated_fields(ctx: BenchmarkContext) -> Callable[[], None]:
+    manager = ctx.new_manager(seed_orders=False)
+    manager.get_holidays()
+
+    def run():
+        for record in ctx.records:
+            manager.calculate_formulated_fields(record)
+    return run
+
+
+def bench_recalculate_all_formulated_fields(ctx: BenchmarkContext) -> Callable[[], None]:
+    manager = ctx.new_manager()
+    return lambda: manager.recalculate_all_formulated_fields()
+
+
+def bench_import_from_excel(ctx: BenchmarkContext) -> Callable[[], None]:
+    buffer = BytesIO()
+    orders_to_import_frame(ctx.records).to_excel(buffer, sheet_name='Data', index=False)
+    workbook = buffer.getvalue()
+
+    def run():
+        manager = ctx.new_manager(seed_orders=False)
+        manager.import_from_excel(BytesIO(workbook))
+    return run
+
+
+def bench_get_all_orders_df(ctx: BenchmarkContext) -> Callable[[], None]:
+    """Post-processing of the fetched rows: typed frame and data version"""
+    return lambda: stamp_data_version(orders_records_to_df(ctx.records))
+
+
+def bench_process_data_for_dashboard(ctx: BenchmarkContext) -> Callable[[], None]:
+    df = ctx.orders_df
+    return lambda: tab_dashboard.process_data_for_dashboard(df)
+
+
+def bench_dashboard_aggregations(ctx: BenchmarkContext) -> Callable[[], None]:
+    """Cube build plus the roll-ups, filter and alert counts of one dashboard render"""
+    processed = ctx.processed
+    holidays = [pd.Timestamp(row['fecha']).date() for row in ctx.holidays]
+    today = datetime.now().date()
+
+    def run():
+        cube = tab_dashboard.build_dashboard_cube(processed)
+        tab_dashboard.get_monthly_rollup(cube)
+        tab_dashboard.get_period_rollup(cube, 'Trimestral')
+        tab_dashboard.aggregate_cube(cube, ['Sede'])
+        years = sorted(cube['Año'].unique())[-1:]
+        tab_dashboard.build_filter_mask(processed, years, [], [])
+        index = DeadlineIndex.from_orders(ctx.orders_df)
+        index.alert_counts(today, holidays)
+        index.critical_orders(today, holidays, limit=tab_dashboard.CRITICAL_ORDERS_LIMIT)
+    return run
+
+
+def bench_consolidate_excel_sheets(ctx: BenchmarkContext) -> Callable[[], None]:
+    directory = tempfile.mkdtemp(prefix='viaticos_bench_')
+    input_file = write_regional_workbook(ctx.records, os.path.join(directory, 'regional.xlsx'))
+    output_file = os.path.join(directory, 'consolidado.xlsx')
+    return lambda: data_migration.consolidate_excel_sheets(input_file, output_file)
+
+
+# name: (setup returning the timed function, goes row by row)
+BENCHMARKS: Dict[str, tuple] = {
+    'calculate_formulated_fields': (bench_calculate_formulated_fields, True),
+    'recalculate_all_formulated_fields': (bench_recalculate_all_formulated_fields, True),
+    'import_from_excel': (bench_import_from_excel, True),
+    'get_all_orders_df': (bench_get_all_orders_df, False),
+    'process_data_for_dashboard': (bench_process_data_for_dashboard, False),
+    'dashboard_aggregations': (bench_dashboard_aggregations, False),
+    'consolidate_excel_sheets': (bench_consolidate_excel_sheets, True),
+}
+
+
+def time_function(function: Callable[[], None], repeat: int) -> List[float]:
+    """Wall time of each of `repeat` runs, with the garbage collector paused while timing"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return timings
+
+
+def run_benchmarks(sizes: List[int], names: List[str], repeat: int, max_rows_row_wise: int, seed: int) -> List[Dict]:
+    """
+    Run every selected benchmark at every size
+
+    Returns:
+        One result dictionary per (benchmark, size)
+    """
+    results = []
+    for rows in sizes:
+        ctx = BenchmarkContext(rows, seed)
+        for name in names:
+            setup, row_wise = BENCHMARKS[name]
+            result = {'benchmark': name, 'rows': rows}
+
+            if row_wise and rows > max_rows_row_wise:
+                result['skipped'] = f"row-wise path, more than {max_rows_row_wise} rows"
+            else:
+                timings = time_function(setup(ctx), repeat)
+                result.update({
+                    'repeat': repeat,
+                    'min_s': min(timings),
+                    'median_s': statistics.median(timings),
+                    'max_s': max(timings),
+                    'rows_per_s': rows / min(timings) if min(timings) else None,
+                })
+
+            results.append(result)
+            print_result(result)
+    return results
+
+
+def print_result(result: Dict) -> None:
+    """Print one result line"""
+    label = f"{result['benchmark']:<36}{result['rows']:>10,}"
+    if 'skipped' in result:
+        print(f"{label}  omitido ({result['skipped']})")
+    else:
+        print(f"{label}  min {result['min_s'] * 1000:>10.1f}ms  mediana {result['median_s'] * 1000:>10.1f}ms  "
+              f"{result['rows_per_s']:>12,.0f} filas/s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks of the app data paths on synthetic orders")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help="Numbers of orders")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="Benchmarks to run")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per benchmark and size")
+    parser.add_argument('--max-rows-row-wise', type=int, default=DEFAULT_MAX_ROWS_ROW_WISE,
+                        help="Largest size at which the row-by-row paths are run")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the synthetic data")
+    parser.add_argument('--json', dest='json_path', help="Output file (default: benchmarks/results/hot_paths_<fecha>.json)")
+    args = parser.parse_args()
+
+    # Per-row and per-sheet log lines would dominate the timings
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings('ignore')
+
+    started = datetime.now()
+    results = run_benchmarks(sorted(args.sizes), args.only, args.repeat, args.max_rows_row_wise, args.seed)
+
+    report = {
+        'meta': {
+            'timestamp': started.isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'sizes': sorted(args.sizes),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+
+    json_path = args.json_path or os.path.join(RESULTS_DIR, f"hot_paths_{started.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {json_path}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
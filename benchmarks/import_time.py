@@ -0,0 +1,148 @@
+"""
+Import time report
+Measures the cold import cost of the app entry points with `python -X importtime`
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [--top N] [--json FILE] [--max-app-ms MS]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Scripts')
+
+# Modules imported when the app starts and when each tab is first selected
+ENTRY_MODULES = [
+    'streamlit',
+    'app',
+    'tab_commission_form',
+    'tab_legalization_form',
+    'tab_edit_order',
+    'tab_dashboard',
+    'download_service',
+]
+
+# Heavy libraries that should only load with the tab that needs them
+HEAVY_PACKAGES = ['pandas', 'numpy', 'plotly.express', 'plotly.graph_objects', 'supabase', 'openpyxl']
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse `-X importtime` output
+
+    Args:
+        stderr: Standard error of the Python process
+
+    Returns:
+        List of (module, self_us, cumulative_us, depth)
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def measure_module(module: str) -> Dict:
+    """
+    Import a module in a fresh interpreter and summarize its import time
+
+    Args:
+        module: Module name importable from Scripts/
+
+    Returns:
+        Dictionary with total milliseconds and the heavy packages that were loaded
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = parse_importtime(result.stderr)
+    total_us = sum(self_us for _, self_us, _, _ in rows)
+    loaded = {name for name, _, _, _ in rows}
+    heavy = {
+        package: next(cumulative for name, _, cumulative, _ in rows if name == package) / 1000
+        for package in HEAVY_PACKAGES if package in loaded
+    }
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)
+
+    return {
+        'module': module,
+        'total_ms': total_us / 1000,
+        'heavy_packages_ms': heavy,
+        'slowest_modules': [(name, self_us / 1000) for name, self_us, _, _ in slowest],
+    }
+
+
+def run_report(modules: List[str], repeat: int, top: int) -> List[Dict]:
+    """
+    Measure every module, keeping the fastest of `repeat` runs
+
+    Heavy packages that streamlit itself already imports are not attributed to the app modules.
+    """
+    baseline = set(measure_module('streamlit')['heavy_packages_ms'])
+    report = []
+    for module in modules:
+        runs = [measure_module(module) for _ in range(repeat)]
+        best = min(runs, key=lambda run: run['total_ms'])
+        best['slowest_modules'] = best['slowest_modules'][:top]
+        if module != 'streamlit':
+            best['heavy_packages_ms'] = {
+                package: ms for package, ms in best['heavy_packages_ms'].items() if package not in baseline
+            }
+        report.append(best)
+    return report
+
+
+def print_report(report: List[Dict]) -> None:
+    """Print a human-readable summary"""
+    print(f"{'Módulo':<24}{'Total (ms)':>12}  Librerías pesadas cargadas (además de las de streamlit)")
+    for entry in report:
+        heavy = ', '.join(f"{name} {ms:.0f}ms" for name, ms in entry['heavy_packages_ms'].items()) or '-'
+        print(f"{entry['module']:<24}{entry['total_ms']:>12.1f}  {heavy}")
+
+    print()
+    for entry in report:
+        slowest = ', '.join(f"{name} {ms:.1f}ms" for name, ms in entry['slowest_modules'])
+        print(f"{entry['module']}: {slowest}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Cold import time of the app modules")
+    parser.add_argument('--modules', nargs='+', default=ENTRY_MODULES, help="Modules to measure")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per module (best is kept)")
+    parser.add_argument('--top', type=int, default=5, help="Slowest modules listed per entry")
+    parser.add_argument('--json', dest='json_path', help="Write the report as JSON to this file")
+    parser.add_argument('--max-app-ms', type=float, help="Fail if importing app takes longer than this")
+    args = parser.parse_args()
+
+    report = run_report(args.modules, args.repeat, args.top)
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    app_entry = next((entry for entry in report if entry['module'] == 'app'), None)
+    if app_entry is not None:
+        if app_entry['heavy_packages_ms']:
+            print(f"\n⚠️ app importa librerías pesadas al inicio: {', '.join(app_entry['heavy_packages_ms'])}")
+        if args.max_app_ms is not None and app_entry['total_ms'] > args.max_app_ms:
+            print(f"\n❌ Importar app tomó {app_entry['total_ms']:.1f}ms (máximo {args.max_app_ms:.1f}ms)")
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""
+Multi-session load test
+Runs N concurrent simulated users through login, order search, legalization save and
+dashboard view with Streamlit's AppTest, against the local SQLite storage backend, and
+reports rerun latency percentiles, memory per session and backend calls per action
+
+AppTest is not thread-safe, so every session runs in its own process. Process-wide caches
+(st.cache_data, figure caches) are therefore warmed per session, not shared as they are
+between the sessions of one Streamlit server; cached paths come out pessimistic.
+
+Usage:
+    python benchmarks/load_test.py [--sessions N] [--orders N] [--json FILE]
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import queue
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from synthetic_data import SCRIPTS_DIR, generate_orders, holiday_rows
+
+APP_FILE = os.path.join(SCRIPTS_DIR, 'app.py')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+LOAD_TEST_USER = 'carga'
+LOAD_TEST_PASSWORD = 'carga'
+
+NAV_LEGALIZATION = "📝 Legalización"
+NAV_DASHBOARD = "📊 Dashboard"
+LOGIN_LABEL = "🔓 Iniciar Sesión"
+SAVE_LEGALIZATION_LABEL = "💾 Guardar Legalización en Supabase"
+
+# Actions of one simulated user, in order
+ACTIONS = ['open_app', 'login', 'open_legalization', 'search', 'select_order', 'save_legalization', 'open_dashboard']
+
+APP_TIMEOUT_SECONDS = 300
+
+# Sessions wait for each other after start-up; a process that never gets there breaks the barrier
+START_BARRIER_TIMEOUT_SECONDS = 120
+
+# Imported by each session process before the barrier, as a running server would already have them
+WARM_MODULES = ['data_manager', 'tab_legalization_form', 'tab_dashboard']
+
+PERCENTILES = [50, 95, 99]
+
+
+def configure_environment(orders: int, seed: int) -> List[Dict]:
+    """
+    Point the app at a fresh local SQLite database seeded with synthetic orders
+
+    Returns:
+        The seeded orders
+    """
+    directory = tempfile.mkdtemp(prefix='viaticos_load_')
+    os.environ['STORAGE_BACKEND'] = 'sqlite'
+    os.environ['LOCAL_STORAGE_PATH'] = os.path.join(directory, 'storage.sqlite')
+    os.environ['ORDERS_SNAPSHOT_PATH'] = ''
+    os.environ.pop('ANALYTICS_REPLICA_PATH', None)
+
+    records = generate_orders(orders, seed=seed)
+    client = get_backend()
+    client.table('festivos').insert(holiday_rows()).execute()
+    client.table('ordenes').insert([dict(record) for record in records]).execute()
+    return records
+
+
+def get_backend():
+    """Local storage client shared with the app sessions (same process, same database file)"""
+    from storage_backend import get_local_client
+
+    return get_local_client()
+
+
+def _click(app, label: str) -> None:
+    next(button for button in app.button if button.label == label).click()
+
+
+class SimulatedSession:
+    """One browser session driven through AppTest"""
+
+    def __init__(self, numero_orden: int, numero_legalizacion: int) -> None:
+        from streamlit.testing.v1 import AppTest
+
+        self.numero_orden = numero_orden
+        self.numero_legalizacion = numero_legalizacion
+        self.app = AppTest.from_file(APP_FILE, default_timeout=APP_TIMEOUT_SECONDS)
+        self.app.secrets['users'] = {LOAD_TEST_USER: {'password': LOAD_TEST_PASSWORD}}
+        self.latencies: Dict[str, float] = {}
+        self.errors: List[str] = []
+
+    # Widget interactions; the rerun that follows each one is what gets timed
+
+    def open_app(self) -> None:
+        pass
+
+    def login(self) -> None:
+        self.app.text_input[0].input(LOAD_TEST_USER)
+        self.app.text_input[1].input(LOAD_TEST_PASSWORD)
+        _click(self.app, LOGIN_LABEL)
+
+    def open_legalization(self) -> None:
+        self.app.segmented_control[0].set_value(NAV_LEGALIZATION)
+
+    def search(self) -> None:
+        self.app.text_input(key='search_order').input(str(self.numero_orden))
+        self.app.button(key='search_btn').click()
+
+    def select_order(self) -> None:
+        self.app.button(key='select_0').click()
+
+    def save_legalization(self) -> None:
+        self.app.number_input(key='num_legalizacion').set_value(self.numero_legalizacion)
+        _click(self.app, SAVE_LEGALIZATION_LABEL)
+
+    def open_dashboard(self) -> None:
+        self.app.segmented_control[0].set_value(NAV_DASHBOARD)
+
+    def run_action(self, action: str) -> float:
+        """Apply one interaction and time the rerun it triggers"""
+        getattr(self, action)()
+        start = time.perf_counter()
+        self.app.run()
+        elapsed = time.perf_counter() - start
+
+        self.latencies[action] = elapsed
+        self.errors += [f"{action}: {exception.value}" for exception in self.app.exception]
+        return elapsed
+
+    def run_all(self, on_action: Callable[[str], None] = None) -> None:
+        """Run every action in order, stopping at the first one that fails"""
+        for action in ACTIONS:
+            try:
+                self.run_action(action)
+            except Exception as e:
+                self.errors.append(f"{action}: {type(e).__name__}: {str(e)}")
+                return
+            if on_action is not None:
+                on_action(action)
+
+
+def pending_orders(records: List[Dict], count: int) -> List[int]:
+    """Order numbers of unlegalized orders, one per session"""
+    numbers = [record['numero_orden'] for record in records if not record.get('fecha_legalizacion')]
+    if len(numbers) < count:
+        raise ValueError(f"Only {len(numbers)} unlegalized orders for {count} sessions; use more --orders")
+    return numbers[:count]
+
+
+def measure_backend_calls(session: SimulatedSession) -> Dict[str, Dict]:
+    """
+    Run a session and count the backend requests made by each action
+
+    Returns:
+        {action: {'total': n, 'by_table': {'table.action': n}}}
+    """
+    backend = get_backend()
+    calls = {}
+    before = dict(backend.call_counts)
+
+    def record(action: str) -> None:
+        nonlocal before
+        after = dict(backend.call_counts)
+        delta = {key: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)}
+        calls[action] = {
+            'total': sum(delta.values()),
+            'by_table': {f"{table}.{kind}": count for (table, kind), count in sorted(delta.items())},
+        }
+        before = after
+
+    session.run_all(on_action=record)
+    return calls
+
+
+def _session_worker(index: int, numero_orden: int, numero_legalizacion: int, count_calls: bool,
+                    start_barrier, results) -> None:
+    """
+    Body of one session process: warm up, wait for the others, run every action
+
+    Puts (index, {'latencies', 'errors', 'memory', 'backend_calls'}) on the results queue;
+    backend calls are only counted when count_calls is set.
+    """
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings('ignore')
+    result = {'latencies': {}, 'errors': [], 'memory': None, 'backend_calls': None}
+
+    try:
+        for module in WARM_MODULES:
+            importlib.import_module(module)
+
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        session = SimulatedSession(numero_orden, numero_legalizacion)
+
+        start_barrier.wait(START_BARRIER_TIMEOUT_SECONDS)
+        if count_calls:
+            result['backend_calls'] = measure_backend_calls(session)
+        else:
+            session.run_all()
+
+        # The session is still alive here, so what is left above the baseline is what it retains
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.update(latencies=session.latencies, errors=session.errors,
+                      memory={'retained': current - baseline, 'peak': peak - baseline})
+    except Exception as e:
+        result['errors'].append(f"setup: {type(e).__name__}: {str(e)}")
+
+    results.put((index, result))
+
+
+def run_concurrent_sessions(order_numbers: List[int], count_calls: bool = False) -> Tuple[List[Dict], Dict]:
+    """
+    Run one session per order number concurrently, each in its own process
+
+    Args:
+        order_numbers: Order searched and legalized by each session
+        count_calls: Count the backend requests of each action (meaningful for a lone session)
+
+    Returns:
+        Tuple of (one result per session with 'latencies' and 'errors', memory statistics in bytes)
+    """
+    context = multiprocessing.get_context('spawn')
+    start_barrier = context.Barrier(len(order_numbers))
+    results = context.Queue()
+
+    processes = [
+        context.Process(target=_session_worker, args=(i, numero, 1_000_000 + i, count_calls, start_barrier, results))
+        for i, numero in enumerate(order_numbers)
+    ]
+    for process in processes:
+        process.start()
+
+    # Read the queue before joining so no process blocks on a full pipe
+    deadline = time.monotonic() + START_BARRIER_TIMEOUT_SECONDS + APP_TIMEOUT_SECONDS * len(ACTIONS)
+    collected: Dict[int, Dict] = {}
+    while len(collected) < len(processes) and time.monotonic() < deadline:
+        if not any(process.is_alive() for process in processes) and results.empty():
+            break
+        try:
+            index, result = results.get(timeout=1)
+        except queue.Empty:
+            continue
+        collected[index] = result
+
+    sessions = []
+    for i, process in enumerate(processes):
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        sessions.append(collected.get(i) or {
+            'latencies': {}, 'memory': None, 'backend_calls': None,
+            'errors': [f"session {i}: process ended without a result (exit code {process.exitcode})"],
+        })
+
+    measured = [session['memory'] for session in sessions if session['memory'] is not None]
+    memory = {}
+    if measured:
+        retained = [item['retained'] for item in measured]
+        peak = [item['peak'] for item in measured]
+        memory = {
+            'retained_per_session': float(np.mean(retained)),
+            'retained_max': max(retained),
+            'peak_per_session': float(np.mean(peak)),
+            'peak_max': max(peak),
+        }
+    return sessions, memory
+
+
+def latency_summary(sessions: List[Dict]) -> Dict[str, Dict]:
+    """p50/p95/p99 rerun latency (ms) for each action and for all of them, over the sessions that completed"""
+    completed = [session for session in sessions if not session['errors']]
+    summary = {}
+    for action in ACTIONS + ['all']:
+        values = [
+            latency * 1000
+            for session in completed
+            for name, latency in session['latencies'].items()
+            if action in ('all', name)
+        ]
+        if not values:
+            continue
+        summary[action] = {'count': len(values), 'mean_ms': float(np.mean(values))}
+        summary[action].update({f"p{p}_ms": float(np.percentile(values, p)) for p in PERCENTILES})
+    return summary
+
+
+def print_report(report: Dict) -> None:
+    """Print a human-readable summary"""
+    meta = report['meta']
+    print(f"\n{meta['sessions']} sesiones concurrentes ({meta['completed_sessions']} completas), {meta['orders']:,} órdenes\n")
+    print(f"{'Acción':<20}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'Llamadas':>10}")
+    for action, stats in report['latency'].items():
+        calls = report['backend_calls'].get(action, {}).get('total', '')
+        print(f"{action:<20}{stats['p50_ms']:>10.0f}{stats['p95_ms']:>10.0f}{stats['p99_ms']:>10.0f}{calls:>10}")
+
+    memory = report['memory']
+    if memory:
+        print(f"\nMemoria retenida por sesión: {memory['retained_per_session'] / 1024 / 1024:.1f} MB "
+              f"(pico {memory['peak_per_session'] / 1024 / 1024:.1f} MB)")
+    if report['errors']:
+        print(f"\n⚠️ {len(report['errors'])} errores; las sesiones fallidas no cuentan en los percentiles. "
+              f"P. ej. {report['errors'][0]}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent simulated sessions against the local backend")
+    parser.add_argument('--sessions', type=int, default=10, help="Concurrent sessions")
+    parser.add_argument('--orders', type=int, default=5_000, help="Synthetic orders in the database")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the synthetic data")
+    parser.add_argument('--json', dest='json_path', help="Output file (default: benchmarks/results/load_test_<fecha>.json)")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    warnings.filterwarnings('ignore')
+
+    started = datetime.now()
+    records = configure_environment(args.orders, args.seed)
+    order_numbers = pending_orders(records, args.sessions + 1)
+
+    # Backend calls are counted on a lone session so concurrent requests are not mixed up
+    calibration, _ = run_concurrent_sessions(order_numbers[:1], count_calls=True)
+    if calibration[0]['errors']:
+        print(f"La sesión de calibración falló: {calibration[0]['errors']}")
+        return 1
+    backend_calls = calibration[0]['backend_calls']
+    sessions, memory = run_concurrent_sessions(order_numbers[1:])
+
+    report = {
+        'meta': {
+            'timestamp': started.isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'sessions': args.sessions,
+            'completed_sessions': sum(1 for session in sessions if not session['errors']),
+            'orders': args.orders,
+            'seed': args.seed,
+        },
+        'latency': latency_summary(sessions),
+        'memory': memory,
+        'backend_calls': backend_calls,
+        'errors': [error for session in sessions for error in session['errors']],
+    }
+    print_report(report)
+
+    json_path = args.json_path or os.path.join(RESULTS_DIR, f"load_test_{started.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {json_path}")
+
+    return 1 if report['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
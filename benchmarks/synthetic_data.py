@@ -0,0 +1,227 @@
+"""
+Synthetic data generator
+Deterministic, realistic orders (sedes, Colombian holidays, business-day deadlines, COP values)
+for the benchmarks and load tests, in the shapes the app reads them: Supabase rows, the
+Excel import sheet and the regional workbook consolidated by data_migration
+"""
+
+import os
+import random
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
+
+from utils import get_sede_options  # noqa: E402
+from orders_schema import ORDERS_COLUMN_MAPPING  # noqa: E402
+
+FIRST_NAMES = ['JUAN', 'MARÍA', 'CARLOS', 'ANA', 'LUIS', 'SANDRA', 'JOSÉ', 'DIANA', 'ANDRÉS', 'PAOLA',
+               'JORGE', 'CLAUDIA', 'FERNANDO', 'LILIANA', 'RICARDO', 'ÁNGELA']
+LAST_NAMES = ['GARCÍA', 'RODRÍGUEZ', 'MARTÍNEZ', 'LÓPEZ', 'GONZÁLEZ', 'PÉREZ', 'SÁNCHEZ', 'RAMÍREZ',
+              'TORRES', 'DÍAZ', 'VARGAS', 'MORENO', 'CASTRO', 'ROJAS', 'MUÑOZ', 'OSPINA']
+
+# Daily allowance range (COP) and extra expenses range per order
+DAILY_ALLOWANCE_RANGE = (90_000, 420_000)
+EXPENSES_RANGE = (0, 600_000)
+
+# Share of orders already legalized, and of those legalized after the deadline
+LEGALIZED_SHARE = 0.7
+LATE_SHARE = 0.15
+
+
+def _easter(year: int) -> date:
+    """Easter Sunday (anonymous Gregorian algorithm)"""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _next_monday(day: date) -> date:
+    """Holidays moved to the following Monday (Ley Emiliani)"""
+    return day + timedelta(days=(7 - day.weekday()) % 7)
+
+
+def colombian_holidays(years) -> List[date]:
+    """
+    Colombian public holidays
+
+    Args:
+        years: Iterable of years
+
+    Returns:
+        Sorted list of holiday dates
+    """
+    holidays = []
+    for year in years:
+        easter = _easter(year)
+        holidays += [
+            date(year, 1, 1), date(year, 5, 1), date(year, 7, 20), date(year, 8, 7),
+            date(year, 12, 8), date(year, 12, 25),
+            easter - timedelta(days=3), easter - timedelta(days=2),
+        ]
+        holidays += [_next_monday(date(year, month, day)) for month, day in
+                     [(1, 6), (3, 19), (6, 29), (8, 15), (10, 12), (11, 1), (11, 11)]]
+        holidays += [_next_monday(easter + timedelta(days=offset)) for offset in (39, 60, 68)]
+    return sorted(set(holidays))
+
+
+def _workday(start: date, days: int, holidays: np.ndarray) -> date:
+    return np.busday_offset(np.datetime64(start, 'D'), days, roll='forward', holidays=holidays).astype(date)
+
+
+def generate_orders(n: int, seed: int = 42, years=(2024, 2025)) -> List[Dict]:
+    """
+    Generate orders as Supabase rows (ISO dates), newest first
+
+    Args:
+        n: Number of orders
+        seed: Random seed (the same seed always yields the same orders)
+        years: Years the commissions are spread over
+
+    Returns:
+        List of order dictionaries with the columns of the ordenes table
+    """
+    rng = random.Random(seed)
+    sedes = [sede.upper() for sede in get_sede_options()]
+    holidays = np.array(colombian_holidays(range(min(years), max(years) + 2)), dtype='datetime64[D]')
+    first_day = date(min(years), 1, 1)
+    span_days = (date(max(years), 12, 31) - first_day).days
+
+    # Each funcionario travels several times a year
+    funcionarios = [
+        (
+            rng.randint(10_000_000, 1_199_999_999),
+            rng.choice(FIRST_NAMES), rng.choice(FIRST_NAMES + [None] * 8),
+            rng.choice(LAST_NAMES), rng.choice(LAST_NAMES + [None] * 4),
+            rng.choice(sedes),
+        )
+        for _ in range(max(1, n // 12))
+    ]
+
+    records = []
+    for i in range(n):
+        identificacion, nombre, otro_nombre, apellido, segundo_apellido, sede = rng.choice(funcionarios)
+        elaboracion = first_day + timedelta(days=rng.randint(0, span_days))
+        inicial = _workday(elaboracion + timedelta(days=rng.randint(1, 20)), 0, holidays)
+        numero_dias = rng.choice([1, 1, 2, 2, 3, 3, 4, 5, 7, 10])
+        final = inicial + timedelta(days=numero_dias - 1)
+        diario = round(rng.uniform(*DAILY_ALLOWANCE_RANGE), -3)
+        viaticos = diario * (numero_dias - 0.5 if numero_dias > 1 else 0.5)
+        gastos = float(rng.choice([0, 0, round(rng.uniform(*EXPENSES_RANGE), -3)]))
+
+        limite = _workday(final, 5, holidays)
+        legalized = rng.random() < LEGALIZED_SHARE
+        legalizacion = None
+        if legalized:
+            delay = rng.randint(6, 15) if rng.random() < LATE_SHARE else rng.randint(1, 5)
+            legalizacion = _workday(final, delay, holidays)
+
+        timestamp = f"{elaboracion.isoformat()}T{rng.randint(7, 18):02d}:{rng.randint(0, 59):02d}:{i % 60:02d}+00:00"
+        records.append({
+            'id': i + 1,
+            'numero_orden': i + 1,
+            'sede': sede,
+            'fecha_elaboracion': elaboracion.isoformat(),
+            'fecha_memorando': elaboracion.isoformat(),
+            'radicado_memorando': f"{elaboracion.year}-IE-{rng.randint(1, 99999):05d}",
+            'rec': rng.randint(1, 6),
+            'id_rubro': rng.choice([None, 'A-02-02-02-010-002', 'C-0402-1003-4']),
+            'fecha_inicial': inicial.isoformat(),
+            'fecha_final': final.isoformat(),
+            'numero_dias': numero_dias,
+            'valor_viaticos_diario': diario,
+            'valor_viaticos_orden': viaticos,
+            'valor_gastos_orden': gastos,
+            'numero_identificacion': identificacion,
+            'primer_nombre': nombre,
+            'otros_nombres': otro_nombre,
+            'primer_apellido': apellido,
+            'segundo_apellido': segundo_apellido,
+            'fecha_reintegro': _workday(final, 1, holidays).strftime('%d/%m/%Y'),
+            'fecha_limite_legalizacion': limite.strftime('%d/%m/%Y'),
+            'plazo_restante_legalizacion': None if legalized else rng.randint(-20, 5),
+            'alerta': '' if legalized else rng.choice(['Plazo Vencido', 'Plazo Próximo', 'Tiempo Suficiente']),
+            'fecha_legalizacion': legalizacion.isoformat() if legalizacion else None,
+            'estado_legalizacion': 'Atrasado' if legalizacion and legalizacion > limite else 'A tiempo',
+            'numero_legalizacion': i + 1 if legalized else None,
+            'dias_legalizados': numero_dias if legalized else None,
+            'valor_viaticos_legalizado': viaticos if legalized else None,
+            'valor_gastos_legalizado': gastos if legalized and gastos else None,
+            'valor_orden_legalizado': viaticos + gastos if legalized else None,
+            'created_at': timestamp,
+            'updated_at': timestamp,
+        })
+
+    records.sort(key=lambda record: record['created_at'], reverse=True)
+    return records
+
+
+def holiday_rows(years=(2024, 2025, 2026)) -> List[Dict]:
+    """Rows of the festivos table"""
+    return [{'fecha': day.isoformat(), 'descripcion': 'Festivo'} for day in colombian_holidays(years)]
+
+
+def orders_to_import_frame(records: List[Dict]) -> pd.DataFrame:
+    """Orders as the 'Data' sheet read by import_from_excel (original Excel column names)"""
+    df = pd.DataFrame(records).reindex(columns=list(ORDERS_COLUMN_MAPPING))
+    return df.rename(columns=ORDERS_COLUMN_MAPPING)
+
+
+def write_regional_workbook(records: List[Dict], path: str, sedes: Optional[List[str]] = None) -> str:
+    """
+    Write a report with one sheet per sede, as consolidated by data_migration.consolidate_excel_sheets
+
+    Each sheet has two title rows above the header row, like the regional reports.
+
+    Args:
+        records: Orders from generate_orders
+        path: Output .xlsx path
+        sedes: Sheets to write (defaults to every sede present in the records)
+
+    Returns:
+        The path written
+    """
+    df = pd.DataFrame(records)
+    sheet = pd.DataFrame({
+        'REC': df['rec'],
+        'VIGENCIA': pd.to_datetime(df['fecha_elaboracion']).dt.year,
+        'No. ORDEN': df['numero_orden'],
+        'No DE IDENTIFICACIÓN': df['numero_identificacion'],
+        'NOMBRES Y APELLIDOS': df['primer_nombre'].fillna('') + ' ' + df['primer_apellido'].fillna(''),
+        'FECHA INICIAL': df['fecha_inicial'],
+        'FECHA FINAL': df['fecha_final'],
+        'DIAS OC': df['numero_dias'],
+        'VALOR VIÁTICO DIARIO': df['valor_viaticos_diario'],
+        'VALOR VIATICOS ORDEN': df['valor_viaticos_orden'],
+        'GASTOS ORDEN': df['valor_gastos_orden'],
+        'TOTAL GIRADO ORDEN': df['valor_viaticos_orden'] + df['valor_gastos_orden'],
+        'DIAS LEG.': df['dias_legalizados'],
+        'VIATICOS LEG.': df['valor_viaticos_legalizado'],
+        'GASTOS LEG.': df['valor_gastos_legalizado'],
+        'TOTAL LEG.': df['valor_orden_legalizado'],
+    })
+    sheet['SEDE_ORIGEN'] = df['sede']
+
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for sede in sedes or sorted(sheet['SEDE_ORIGEN'].unique()):
+            rows = sheet[sheet['SEDE_ORIGEN'] == sede].drop(columns='SEDE_ORIGEN')
+            title = pd.DataFrame([['REPORTE DE VIÁTICOS'], [f'DIRECCIÓN TERRITORIAL {sede}']])
+            title.to_excel(writer, sheet_name=sede[:31], index=False, header=False)
+            rows.to_excel(writer, sheet_name=sede[:31], index=False, startrow=len(title))
+        pd.DataFrame({'SEDES': sorted(sheet['SEDE_ORIGEN'].unique())}).to_excel(writer, sheet_name='LIST', index=False)
+
+    return path
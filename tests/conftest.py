@@ -0,0 +1,18 @@
+"""
+Shared test setup
+Puts Scripts/ and benchmarks/ on sys.path and keeps the tests away from the on-disk
+orders snapshot, the analytics replica and the metrics server
+"""
+
+import os
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+for path in (os.path.join(ROOT_DIR, 'Scripts'), os.path.join(ROOT_DIR, 'benchmarks')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+os.environ['ORDERS_SNAPSHOT_PATH'] = ''
+os.environ.pop('ANALYTICS_REPLICA_PATH', None)
+os.environ.pop('METRICS_PORT', None)
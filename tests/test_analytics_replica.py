@@ -0,0 +1,66 @@
+"""Tests for the analytics replica sync against a backend that caps its responses like Supabase"""
+
+import pandas as pd
+import pytest
+
+import tab_dashboard
+from analytics_replica import AnalyticsReplica
+from orders_schema import orders_records_to_df
+from storage_backend import LocalStorageClient
+from synthetic_data import generate_orders
+
+
+@pytest.fixture
+def replica(tmp_path):
+    replica = AnalyticsReplica(str(tmp_path / 'replica.sqlite'))
+    yield replica
+    replica.stop_background_sync()
+
+
+def test_sync_pages_past_max_rows_and_removes_deleted_orders(replica):
+    client = LocalStorageClient(':memory:', max_rows=40)
+    records = generate_orders(150, seed=5)
+    client.table('ordenes').insert(records).execute()
+
+    assert replica.sync(client)
+    assert replica.orders_cube()['Cantidad_Registros'].sum() == 150
+
+    deleted = records[20]['numero_orden']
+    client.table('ordenes').delete().eq('numero_orden', deleted).execute()
+    version = replica.version
+
+    assert replica.sync(client)
+    assert replica.version != version
+    assert replica.orders_cube()['Cantidad_Registros'].sum() == 149
+    assert deleted not in {order['numero_orden'] for order in replica.search_orders(str(deleted))}
+
+
+def test_replica_cube_matches_pandas_cube(replica):
+    client = LocalStorageClient(':memory:')
+    records = generate_orders(300, seed=6)
+    client.table('ordenes').insert(records).execute()
+    replica.sync(client)
+
+    processed = tab_dashboard.process_data_for_dashboard(orders_records_to_df(records), notices=[])
+    expected = tab_dashboard.build_dashboard_cube(processed)
+    actual = tab_dashboard.build_cube_from_replica(replica.orders_cube())
+
+    keys = tab_dashboard.CUBE_KEYS
+    measures = ['Cantidad_Registros'] + list(tab_dashboard.CUBE_SOURCE_COLUMNS)
+    expected = expected.sort_values(keys).reset_index(drop=True)
+    actual = actual.sort_values(keys).reset_index(drop=True)
+    for key in keys:
+        assert expected[key].astype(str).tolist() == actual[key].astype(str).tolist()
+    pd.testing.assert_frame_equal(expected[measures], actual[measures], check_dtype=False)
+
+
+def test_background_sync_runs_outside_the_caller(replica):
+    client = LocalStorageClient(':memory:')
+    client.table('ordenes').insert(generate_orders(30, seed=7)).execute()
+
+    replica.start_background_sync(client, interval_seconds=3600)
+    replica.start_background_sync(client, interval_seconds=3600)
+    replica.stop_background_sync()
+
+    assert replica.is_synced
+    assert replica.orders_cube()['Cantidad_Registros'].sum() == 30
@@ -0,0 +1,42 @@
+"""Tests for the process-wide LRU caches"""
+
+from cache_utils import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache('test', max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+
+    assert cache.get('b') is None
+    assert (cache.get('a'), cache.get('c')) == (1, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_byte_bound_and_oversized_values():
+    cache = LRUCache('test', max_entries=10, max_bytes=10)
+    cache.put('a', b'12345')
+    cache.put('b', b'123456')
+
+    assert cache.get('a') is None
+    assert cache.stats()['bytes'] == 6
+
+    cache.put('big', b'x' * 11)
+    assert cache.get('big') is None
+    assert cache.get('b') == b'123456'
+
+
+def test_get_or_create_builds_once():
+    cache = LRUCache('test')
+    calls = []
+
+    def build():
+        calls.append(1)
+        return 'value'
+
+    assert cache.get_or_create('key', build) == 'value'
+    assert cache.get_or_create('key', build) == 'value'
+    assert len(calls) == 1
+    assert cache.stats()['hits'] == 1
@@ -0,0 +1,71 @@
+"""Tests for the deadline index against the formulated fields it replaces"""
+
+from collections import Counter
+from datetime import date
+
+import pytest
+
+from data_manager import SupabaseDBManager
+from deadline_index import ALERT_PROXIMO, ALERT_SUFICIENTE, ALERT_VENCIDO, DeadlineIndex
+from orders_schema import orders_records_to_df
+from storage_backend import LocalStorageClient
+from synthetic_data import generate_orders, holiday_rows
+
+
+@pytest.fixture(scope='module')
+def manager():
+    year = date.today().year
+    client = LocalStorageClient(':memory:')
+    client.table('festivos').insert(holiday_rows(years=range(year - 1, year + 2))).execute()
+    return SupabaseDBManager(client=client)
+
+
+@pytest.fixture(scope='module')
+def formulated_records(manager):
+    # Orders around today, so every alert level is present
+    year = date.today().year
+    records = generate_orders(400, seed=11, years=(year, year))
+    return [dict(record, **manager.calculate_formulated_fields(record)) for record in records]
+
+
+def test_alert_counts_match_formulated_fields(manager, formulated_records):
+    index = DeadlineIndex.from_orders(orders_records_to_df(formulated_records))
+
+    expected = Counter(record['alerta'] for record in formulated_records if record['alerta'])
+    counts = index.alert_counts(date.today(), manager.get_holidays())
+
+    assert counts == {label: expected.get(label, 0) for label in (ALERT_VENCIDO, ALERT_PROXIMO, ALERT_SUFICIENTE)}
+
+
+def test_critical_orders_match_formulated_fields(manager, formulated_records):
+    index = DeadlineIndex.from_orders(orders_records_to_df(formulated_records))
+
+    critical = index.critical_orders(date.today(), manager.get_holidays(), limit=len(formulated_records))
+
+    expected = {
+        record['numero_orden']: (record['plazo_restante_legalizacion'], record['alerta'])
+        for record in formulated_records
+        if record['alerta'] in (ALERT_VENCIDO, ALERT_PROXIMO)
+    }
+    actual = {
+        int(row['Número de Orden']): (int(row['Plazo Restante Legalización']), row['Alerta'])
+        for _, row in critical.iterrows()
+    }
+    assert actual == expected
+    assert list(critical['Fecha Límite Legalización']) == sorted(critical['Fecha Límite Legalización'])
+
+
+def test_update_orders_moves_single_orders(manager, formulated_records):
+    index = DeadlineIndex.from_orders(orders_records_to_df(formulated_records))
+    pending = next(record for record in formulated_records if record['alerta'])
+    legalized = dict(pending, fecha_legalizacion=date.today().isoformat())
+
+    index.update_orders(orders_records_to_df([legalized]))
+    assert len(index) == sum(1 for record in formulated_records if record['alerta']) - 1
+
+    index.update_orders(orders_records_to_df([pending]))
+    rebuilt = DeadlineIndex.from_orders(orders_records_to_df(formulated_records))
+    assert index.alert_counts(date.today()) == rebuilt.alert_counts(date.today())
+
+    index.remove(pending['numero_orden'])
+    assert len(index) == len(rebuilt) - 1
@@ -0,0 +1,26 @@
+"""Tests for the method and request instrumentation of the data manager"""
+
+from data_manager import SupabaseDBManager
+from instrumentation import REGISTRY
+from storage_backend import LocalStorageClient
+from synthetic_data import holiday_rows
+
+
+def timed_methods():
+    return {dict(labels)['method'] for labels in REGISTRY.histograms('viaticos_method_seconds')}
+
+
+def test_pure_helpers_are_not_timed():
+    client = LocalStorageClient(':memory:')
+    client.table('festivos').insert(holiday_rows()).execute()
+    manager = SupabaseDBManager(client=client)
+    REGISTRY.reset()
+
+    manager.calculate_workday('2024-03-01', 5)
+    manager.calculate_business_days('2024-03-01', '2024-03-08')
+    manager.search_orders('1')
+
+    methods = timed_methods()
+    assert 'SupabaseDBManager.search_orders' in methods
+    assert 'SupabaseDBManager._get_holidays_from_db' in methods
+    assert not any('calculate_' in method or 'holidays_cached' in method for method in methods)
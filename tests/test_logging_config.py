@@ -0,0 +1,43 @@
+"""Tests for the queued JSON logging pipeline"""
+
+import json
+import logging
+
+import pytest
+
+import logging_config
+from instrumentation import instrument_client
+from storage_backend import LocalStorageClient
+from synthetic_data import generate_orders
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    path = tmp_path / 'viaticos.log'
+    logging_config.configure_logging(level='INFO', log_path=str(path))
+    yield path
+    logging_config._stop_listener()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+
+
+def read_entries(path):
+    # Stopping the listener flushes the queued records to the file
+    logging_config._stop_listener()
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+def test_database_requests_are_logged_with_structured_fields_at_info(log_path):
+    client = instrument_client(LocalStorageClient(':memory:'))
+    client.table('ordenes').insert(generate_orders(3, seed=8)).execute()
+    client.table('ordenes').select('*').execute()
+
+    entries = read_entries(log_path)
+    select = next(entry for entry in entries if entry.get('operation') == 'ordenes.select')
+
+    assert select['level'] == 'INFO'
+    assert select['rows'] == 3
+    assert select['latency_ms'] >= 0
+    assert select['logger'] == 'instrumentation'
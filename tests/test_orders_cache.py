@@ -0,0 +1,69 @@
+"""Tests for the data version and the write-through updates of the orders cache"""
+
+import pytest
+
+from orders_cache import compute_data_version, delete_order, stamp_data_version, upsert_order
+from orders_schema import orders_records_to_df
+from synthetic_data import generate_orders
+
+
+@pytest.fixture
+def records():
+    return generate_orders(300, seed=7)
+
+
+@pytest.fixture
+def orders_df(records):
+    return stamp_data_version(orders_records_to_df(records))
+
+
+def test_upsert_existing_order_updates_version_in_place(records, orders_df):
+    original_version = orders_df.attrs['data_version']
+    changed = dict(records[10], valor_gastos_orden=987_000.0, sede='SEDE NUEVA')
+
+    updated = upsert_order(orders_df, orders_records_to_df([changed]))
+
+    assert len(updated) == len(records)
+    assert updated.loc[10, 'Valor Gastos Orden'] == 987_000.0
+    assert updated.loc[10, 'Sede'] == 'SEDE NUEVA'
+    assert updated.attrs['data_version'] != original_version
+    assert updated.attrs['data_version'] == compute_data_version(updated)
+
+    # Writing the original row back restores the original version
+    restored = upsert_order(updated, orders_records_to_df([records[10]]))
+    assert restored.attrs['data_version'] == original_version
+
+
+def test_upsert_new_order_is_prepended(records, orders_df):
+    new_order = dict(records[0], numero_orden=99_999)
+
+    updated = upsert_order(orders_df, orders_records_to_df([new_order]))
+
+    assert len(updated) == len(records) + 1
+    assert updated.loc[0, 'Número de Orden'] == 99_999
+    assert updated.attrs['data_version'] == compute_data_version(updated)
+
+
+def test_delete_order_updates_version(records, orders_df):
+    original_version = orders_df.attrs['data_version']
+    numero_orden = records[25]['numero_orden']
+
+    updated = delete_order(orders_df, numero_orden)
+
+    assert len(updated) == len(records) - 1
+    assert numero_orden not in set(updated['Número de Orden'])
+    assert updated.attrs['data_version'] != original_version
+    assert updated.attrs['data_version'] == compute_data_version(updated)
+
+
+def test_delete_unknown_order_keeps_version(orders_df):
+    version = orders_df.attrs['data_version']
+
+    assert delete_order(orders_df, 123_456_789).attrs['data_version'] == version
+
+
+def test_version_is_shared_by_equal_frames(records, orders_df):
+    # Two sessions that loaded the same rows share dashboard caches through the version
+    other = stamp_data_version(orders_records_to_df(records))
+
+    assert other.attrs['data_version'] == orders_df.attrs['data_version']
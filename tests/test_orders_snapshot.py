@@ -0,0 +1,85 @@
+"""Tests for the snapshot catch-up against a backend that caps its responses like Supabase"""
+
+import pytest
+
+import data_manager
+from data_manager import SupabaseDBManager
+from orders_cache import compute_data_version, stamp_data_version
+from orders_schema import orders_records_to_df
+from orders_snapshot import get_sync_watermark, load_orders_snapshot, save_orders_snapshot
+from storage_backend import LocalStorageClient, fetch_all_rows, fetch_order_numbers
+from synthetic_data import generate_orders
+
+# Far below the number of orders, so every full read has to be paged
+MAX_ROWS = 50
+
+
+@pytest.fixture
+def client():
+    client = LocalStorageClient(':memory:', max_rows=MAX_ROWS)
+    client.table('ordenes').insert(generate_orders(180, seed=3)).execute()
+    return client
+
+
+def load_snapshot(client):
+    rows = fetch_all_rows(lambda: client.table('ordenes').select('*').order('created_at', desc=True).order('numero_orden'))
+    return stamp_data_version(orders_records_to_df(rows)), get_sync_watermark(rows)
+
+
+def test_fetch_order_numbers_pages_past_max_rows(client):
+    assert len(client.table('ordenes').select('numero_orden').execute().data) == MAX_ROWS
+    assert len(fetch_order_numbers(client)) == 180
+
+
+def test_fetch_order_numbers_of_empty_table_is_none():
+    assert fetch_order_numbers(LocalStorageClient(':memory:')) is None
+
+
+def test_cold_start_loads_every_order(client):
+    df = SupabaseDBManager(client=client).get_all_orders_df()
+
+    assert len(df) == 180
+    assert df['Número de Orden'].is_unique
+
+
+def test_catch_up_applies_changes_and_deletions(client):
+    df, watermark = load_snapshot(client)
+    manager = SupabaseDBManager(client=client)
+    numbers = list(df['Número de Orden'])
+
+    client.table('ordenes').update({'valor_gastos_orden': 55_000.0}).eq('numero_orden', int(numbers[100])).execute()
+    new_order = {key: value for key, value in generate_orders(1, seed=4)[0].items() if key not in ('id', 'created_at', 'updated_at')}
+    client.table('ordenes').insert(dict(new_order, numero_orden=5_000)).execute()
+    for numero_orden in (numbers[5], numbers[150]):
+        client.table('ordenes').delete().eq('numero_orden', int(numero_orden)).execute()
+
+    merged = manager._catch_up_orders(df, watermark)
+
+    remaining = set(merged['Número de Orden'])
+    assert len(merged) == 180 + 1 - 2
+    assert 5_000 in remaining
+    assert numbers[5] not in remaining and numbers[150] not in remaining
+    assert merged.loc[merged['Número de Orden'] == numbers[100], 'Valor Gastos Orden'].iloc[0] == 55_000.0
+    assert merged.attrs['data_version'] == compute_data_version(merged)
+
+
+def test_catch_up_keeps_orders_when_listing_is_incomplete(client, monkeypatch):
+    df, watermark = load_snapshot(client)
+    client.table('ordenes').delete().eq('numero_orden', int(df['Número de Orden'].iloc[0])).execute()
+    monkeypatch.setattr(data_manager, 'fetch_order_numbers', lambda client: None)
+
+    merged = SupabaseDBManager(client=client)._catch_up_orders(df, watermark)
+
+    assert len(merged) == len(df)
+
+
+def test_snapshot_round_trip(tmp_path, monkeypatch, client):
+    monkeypatch.setenv('ORDERS_SNAPSHOT_PATH', str(tmp_path / 'orders.parquet'))
+    df, watermark = load_snapshot(client)
+
+    save_orders_snapshot(df, watermark)
+    loaded, loaded_watermark = load_orders_snapshot()
+
+    assert loaded_watermark == watermark
+    assert compute_data_version(loaded) == df.attrs['data_version']
+    assert [path.name for path in tmp_path.iterdir()] == ['orders.parquet']
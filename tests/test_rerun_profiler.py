@@ -0,0 +1,29 @@
+"""Tests for the per-session arming of the rerun profiler"""
+
+import time
+
+from rerun_profiler import arm_profiler, armed_reruns, list_profiles, run_profiled, set_rerun_tab
+
+
+def slow_rerun():
+    set_rerun_tab('Dashboard')
+    time.sleep(0.03)
+
+
+def test_only_the_armed_session_is_profiled(tmp_path, monkeypatch):
+    monkeypatch.setenv('RERUN_PROFILES_PATH', str(tmp_path))
+    admin_session, other_session = {}, {}
+
+    arm_profiler(admin_session, 2)
+    run_profiled(slow_rerun, other_session)
+    assert list_profiles() == []
+
+    run_profiled(slow_rerun, admin_session, lambda: 'admin')
+    run_profiled(slow_rerun, admin_session, lambda: 'admin')
+    run_profiled(slow_rerun, admin_session, lambda: 'admin')
+
+    profiles = list_profiles()
+    assert len(profiles) == 2
+    assert {profile['user'] for profile in profiles} == {'admin'}
+    assert {profile['tab'] for profile in profiles} == {'Dashboard'}
+    assert armed_reruns(admin_session) == 0
@@ -0,0 +1,53 @@
+"""Tests for the SQLite stand-in of the Supabase query builder"""
+
+import pytest
+
+from storage_backend import LocalStorageClient, StorageError, fetch_all_rows
+
+
+@pytest.fixture
+def client():
+    client = LocalStorageClient(':memory:', max_rows=3)
+    client.table('ordenes').insert([
+        {'numero_orden': numero, 'sede': sede, 'valor_gastos_orden': valor}
+        for numero, sede, valor in [(1, 'CUNDINAMARCA', 10.0), (2, 'VALLE', None), (3, 'VALLE', 30.0),
+                                    (4, 'ANTIOQUIA', 40.0), (5, 'VALLE', 50.0)]
+    ]).execute()
+    return client
+
+
+def test_filters_order_and_range(client):
+    rows = client.table('ordenes').select('numero_orden').eq('sede', 'VALLE').order('numero_orden', desc=True).execute().data
+    assert [row['numero_orden'] for row in rows] == [5, 3, 2]
+
+    page = client.table('ordenes').select('numero_orden').order('numero_orden').range(1, 2).execute().data
+    assert [row['numero_orden'] for row in page] == [2, 3]
+
+    rows = client.table('ordenes').select('numero_orden').or_('numero_orden.eq.1,sede.ilike.*ANTIO*').execute().data
+    assert sorted(row['numero_orden'] for row in rows) == [1, 4]
+
+
+def test_nulls_sort_like_postgres(client):
+    def numbers(desc):
+        query = lambda: client.table('ordenes').select('numero_orden').order('valor_gastos_orden', desc=desc)
+        return [row['numero_orden'] for row in fetch_all_rows(query)]
+
+    assert numbers(desc=False) == [1, 3, 4, 5, 2]
+    assert numbers(desc=True) == [2, 5, 4, 3, 1]
+
+
+def test_max_rows_cap_and_exact_count(client):
+    response = client.table('ordenes').select('numero_orden', count='exact').execute()
+
+    assert len(response.data) == 3
+    assert response.count == 5
+    assert len(fetch_all_rows(lambda: client.table('ordenes').select('*').order('numero_orden'), page_size=2)) == 5
+
+
+def test_duplicate_key_and_upsert(client):
+    with pytest.raises(StorageError, match='duplicate key'):
+        client.table('ordenes').insert({'numero_orden': 1}).execute()
+
+    client.table('ordenes').upsert({'numero_orden': 1, 'sede': 'BOYACÁ'}).execute()
+    row = client.table('ordenes').select('*').eq('numero_orden', 1).execute().data[0]
+    assert (row['sede'], row['valor_gastos_orden']) == ('BOYACÁ', 10.0)
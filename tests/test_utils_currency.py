@@ -0,0 +1,47 @@
+"""Tests for the Colombian currency parsers in utils"""
+
+import random
+
+import numpy as np
+import pandas as pd
+
+from utils import parse_colombian_currency, parse_colombian_currency_series
+
+EDGE_CASES = [
+    '$ 1.234.567,89', '1.234.567', '1.234', '12,5', '  $1.000  ', '-1.000,50', '+250', '₡ 3.000',
+    '1,2,3', '1.000,00,5', '1,000.5', '.5', ',5', '5,', '1e5', '1,5e3', 'nan', 'inf', 'abc', '$', '',
+    ' ', None, np.nan, 0, 1234, 1234.5, -7.25, np.int64(42), np.float64(0.1), True,
+]
+
+
+def assert_parity(values):
+    expected = [parse_colombian_currency(value) for value in values]
+    parsed = parse_colombian_currency_series(pd.Series(values, dtype=object))
+    np.testing.assert_array_equal(parsed.to_numpy(), np.array(expected, dtype=float))
+
+
+def test_series_matches_scalar_on_edge_cases():
+    assert_parity(EDGE_CASES)
+
+
+def test_series_matches_scalar_on_random_text():
+    rng = random.Random(17)
+    alphabet = '0123456789' * 3 + '..,,$ -e'
+    values = [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 14))) for _ in range(5000)]
+    assert_parity(values)
+
+
+def test_series_matches_scalar_on_formatted_amounts():
+    rng = random.Random(23)
+    amounts = [round(rng.uniform(0, 50_000_000), rng.choice([0, 2])) for _ in range(2000)]
+    values = [f"$ {amount:,.2f}".replace(',', '_').replace('.', ',').replace('_', '.') for amount in amounts]
+    assert_parity(values)
+    assert parse_colombian_currency_series(pd.Series(values)).tolist() == amounts
+
+
+def test_numeric_column_passes_through():
+    values = pd.Series([1.5, None, 3.0], index=['a', 'b', 'c'])
+
+    parsed = parse_colombian_currency_series(values)
+
+    assert parsed.to_dict() == {'a': 1.5, 'b': 0.0, 'c': 3.0}
@@ -0,0 +1,63 @@
+"""Tests for the date parsers in utils"""
+
+from datetime import datetime
+
+import pandas as pd
+
+from utils import (
+    format_colombian_date, format_colombian_date_series, parse_date_for_database,
+    parse_date_for_database_series, parse_date_series, parse_date_value
+)
+
+
+def test_parse_date_series_mixed_timezones():
+    values = pd.Series(['2025-01-31T23:00:00-05:00', '2025-02-01', '2025-02-03T08:30:00+00:00', None, ''], dtype=object)
+
+    parsed = parse_date_series(values)
+
+    assert parsed.dt.tz is None
+    assert list(parsed[:3]) == [
+        pd.Timestamp('2025-01-31 23:00:00'), pd.Timestamp('2025-02-01'), pd.Timestamp('2025-02-03 08:30:00')
+    ]
+    assert parsed[3:].isna().all()
+    assert list(format_colombian_date_series(values)) == ['31/01/2025', '01/02/2025', '03/02/2025', '', '']
+
+
+def test_parse_date_series_single_offset_is_naive():
+    values = pd.Series(['2025-01-31T23:00:00-05:00', '2025-02-01T01:00:00-05:00'], dtype=object)
+
+    parsed = parse_date_series(values)
+
+    assert parsed.dt.tz is None
+    assert list(parsed) == [pd.Timestamp('2025-01-31 23:00:00'), pd.Timestamp('2025-02-01 01:00:00')]
+
+
+def test_parse_date_value_keeps_wall_clock():
+    assert parse_date_value('2025-01-31T23:00:00-05:00').replace(tzinfo=None) == datetime(2025, 1, 31, 23)
+
+
+DATE_VALUES = [
+    '2025-01-31', '31/01/2025', '05/03/2025', '2025-03-05', '2025-03-05 14:30:00', '2025-03-05T14:30:00',
+    '29/02/2024', '31/02/2025', '45658', '45658.5', ' 01/12/2024 ', 'March 5, 2025', 'basura', '',
+    None, '2024-12-31T23:59:59+00:00',
+]
+
+
+def test_parse_date_series_matches_scalar():
+    values = pd.Series(DATE_VALUES, dtype=object)
+
+    parsed = parse_date_series(values)
+
+    for value, timestamp in zip(DATE_VALUES, parsed):
+        expected = parse_date_value(value, dayfirst=True)
+        if expected is None:
+            assert pd.isna(timestamp), value
+        else:
+            assert timestamp == pd.Timestamp(expected.replace(tzinfo=None)), value
+
+
+def test_database_and_display_series_match_scalar():
+    values = pd.Series(DATE_VALUES, dtype=object)
+
+    assert list(parse_date_for_database_series(values)) == [parse_date_for_database(value) for value in DATE_VALUES]
+    assert list(format_colombian_date_series(values)) == [format_colombian_date(value) for value in DATE_VALUES]